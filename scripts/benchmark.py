@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for agents, workflows and signal processing.
+
+Every benchmark runs in a fresh interpreter so that its peak RSS is its
+own, performs a few warm-up iterations and then records the latency of each
+timed iteration. Results report throughput, p50/p99 latency and peak RSS,
+and can be saved as a baseline that later runs are compared against:
+
+    python scripts/benchmark.py --save-baseline
+    python scripts/benchmark.py --compare
+
+A run that is slower, or uses more memory, than the baseline by more than
+the tolerance exits with status 1.
+"""
+
+import argparse
+import asyncio
+import atexit
+import json
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from loguru import logger
+
+PROJECT_ROOT = Path(__file__).parent.parent
+BASELINE_PATH = PROJECT_ROOT / "benchmarks" / "baseline.json"
+
+# Add the project root to the Python path
+sys.path.insert(0, str(PROJECT_ROOT))
+
+Operation = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class Benchmark:
+    """A named benchmark.
+
+    Attributes:
+        name: Unique benchmark name
+        setup: Coroutine function building the timed operation from the
+            command-line parameters
+        items: Function of the parameters giving the units of work done
+            by one operation, for throughput
+    """
+
+    name: str
+    setup: Callable[[argparse.Namespace], Awaitable[Operation]]
+    items: Callable[[argparse.Namespace], int] = lambda params: 1
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, items: Optional[Callable] = None) -> Callable:
+    """Register a benchmark setup function under ``name``."""
+    def register(setup: Callable) -> Callable:
+        BENCHMARKS[name] = Benchmark(name, setup, items or (lambda p: 1))
+        return setup
+    return register
+
+
+def synthetic_eeg(
+    n_channels: int,
+    n_samples: int,
+    sampling_rate: float,
+    seed: int = 0
+) -> Any:
+    """Reproducible EEG-like signal: noise plus per-channel alpha rhythm."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    time_axis = np.arange(n_samples) / sampling_rate
+    gains = 20 * (0.5 + 0.5 * rng.random((n_channels, 1)))
+    data = rng.standard_normal((n_channels, n_samples)) * 50
+    data += gains * np.sin(2 * np.pi * 10 * time_axis)
+    return data
+
+
+def _sleep_agent(name: str, latency: float, **kwargs: Any) -> Any:
+    from src.agents.base_agent import BaseAgent
+
+    class SleepExecutor:
+        async def arun(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+            await asyncio.sleep(latency)
+            return {"echo": input_data}
+
+    class SleepAgent(BaseAgent):
+        # Measure the agent itself, not the configured request rate.
+        rate_limited = False
+
+        def _create_executor(self) -> Any:
+            return SleepExecutor()
+
+        def _format_output(self, result: Any) -> Dict[str, Any]:
+            return {"status": "success", "agent": self.name, **result}
+
+    return SleepAgent(None, [], name, **kwargs)
+
+
+@benchmark("agent_run")
+async def agent_run(params: argparse.Namespace) -> Operation:
+    """BaseAgent.run overhead around an executor of fixed latency."""
+    agent = _sleep_agent("bench", params.agent_latency / 1000)
+    counter = iter(range(10 ** 9))
+
+    async def op() -> Any:
+        return await agent.run({"request": next(counter)})
+    return op
+
+
+@benchmark("agent_run_cached")
+async def agent_run_cached(params: argparse.Namespace) -> Operation:
+    """BaseAgent.run served from the in-process result cache."""
+    from src.utils.cache import LRUCache
+
+    agent = _sleep_agent(
+        "bench", params.agent_latency / 1000, cache=LRUCache(1024)
+    )
+    await agent.run({"request": 0})
+
+    async def op() -> Any:
+        return await agent.run({"request": 0})
+    return op
+
+
+def _fanout(concurrency: int) -> Callable:
+    async def setup(params: argparse.Namespace) -> Operation:
+        from src.agents.coordinator_agent import CoordinatorAgent
+
+        agents = [
+            _sleep_agent(f"agent{i}", params.agent_latency / 1000)
+            for i in range(params.agents)
+        ]
+        coordinator = CoordinatorAgent(
+            None, [], agents=agents, max_concurrency=concurrency
+        )
+        counter = iter(range(10 ** 9))
+
+        async def op() -> Any:
+            return await coordinator.run({"task": f"task {next(counter)}"})
+        return op
+    return setup
+
+
+for _concurrency in (1, 4, 16):
+    benchmark(
+        f"coordinator_fanout[c={_concurrency}]", lambda p: p.agents
+    )(_fanout(_concurrency))
+
+
+@benchmark("signal_quality")
+async def signal_quality(params: argparse.Namespace) -> Operation:
+    """Signal quality assessment of a synthetic recording."""
+    from src.processing.quality import assess_signal_quality
+
+    data = synthetic_eeg(
+        params.channels,
+        int(params.duration * params.sampling_rate),
+        params.sampling_rate,
+    )
+
+    async def op() -> Any:
+        return assess_signal_quality(data, params.sampling_rate)
+    return op
+
+
+@benchmark("band_powers", lambda p: int(p.duration // 2))
+async def band_powers(params: argparse.Namespace) -> Operation:
+    """Band powers of two-second epochs of a synthetic recording."""
+    from src.processing.features import band_powers as compute_band_powers
+
+    epoch = int(2 * params.sampling_rate)
+    n_epochs = int(params.duration // 2)
+    data = synthetic_eeg(
+        params.channels, n_epochs * epoch, params.sampling_rate
+    )
+    epochs = data.reshape(params.channels, n_epochs, epoch).swapaxes(0, 1)
+
+    async def op() -> Any:
+        return compute_band_powers(epochs, params.sampling_rate)
+    return op
+
+
+@benchmark("analysis_agent")
+async def analysis_agent(params: argparse.Namespace) -> Operation:
+    """AnalysisAgent signal quality on a memory-mapped recording."""
+    from src.agents.analysis_agent import AnalysisAgent
+    from src.processing.streaming import RecordingWriter
+
+    directory = Path(tempfile.mkdtemp(prefix="bci-bench-"))
+    atexit.register(shutil.rmtree, directory, True)
+    path = directory / "eeg_data.npy"
+    n_samples = int(params.duration * params.sampling_rate)
+    with RecordingWriter(path, params.channels, n_samples) as writer:
+        writer.write(
+            synthetic_eeg(params.channels, n_samples, params.sampling_rate)
+        )
+    agent = AnalysisAgent(None, [])
+    request = {
+        "data_path": str(path),
+        "sampling_rate": params.sampling_rate,
+        "analysis_type": "signal_quality",
+    }
+
+    async def op() -> Any:
+        return await agent.run(request)
+    return op
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def _measure(
+    case: Benchmark,
+    params: argparse.Namespace
+) -> Dict[str, Any]:
+    from src.utils.cache import set_default_cache
+
+    # Every iteration must do real work; cached benchmarks pass their own.
+    set_default_cache(None)
+    op = await case.setup(params)
+    for _ in range(params.warmup):
+        await op()
+
+    latencies = []
+    started = time.perf_counter()
+    deadline = started + params.max_seconds
+    for _ in range(params.repeat):
+        call_started = time.perf_counter()
+        await op()
+        latencies.append(time.perf_counter() - call_started)
+        if time.perf_counter() > deadline:
+            break
+    total = time.perf_counter() - started
+
+    return {
+        "name": case.name,
+        "iterations": len(latencies),
+        "throughput": case.items(params) * len(latencies) / total,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def run_isolated(name: str, argv: List[str]) -> Dict[str, Any]:
+    """Run one benchmark in a fresh interpreter and return its result."""
+    result = subprocess.run(
+        [sys.executable, __file__, "--run-one", name, *argv],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark {name} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float
+) -> List[str]:
+    """Describe every benchmark that regressed beyond ``tolerance``."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        checks = [
+            ("p50 latency", result["p50_ms"], base["p50_ms"], True),
+            ("p99 latency", result["p99_ms"], base["p99_ms"], True),
+            ("throughput", result["throughput"], base["throughput"], False),
+            ("peak RSS", result["peak_rss_mb"], base["peak_rss_mb"], True),
+        ]
+        for label, value, reference, lower_is_better in checks:
+            if reference <= 0:
+                continue
+            if value <= 0:
+                continue
+            change = value / reference - 1
+            slowdown = value / reference if lower_is_better else (
+                reference / value
+            )
+            if slowdown - 1 > tolerance:
+                regressions.append(
+                    f"{name}: {label} {value:.3g} vs baseline "
+                    f"{reference:.3g} ({change:+.0%})"
+                )
+    return regressions
+
+
+def _forwarded_args(args: argparse.Namespace) -> List[str]:
+    return [
+        "--channels", str(args.channels),
+        "--duration", str(args.duration),
+        "--sampling-rate", str(args.sampling_rate),
+        "--agents", str(args.agents),
+        "--agent-latency", str(args.agent_latency),
+        "--repeat", str(args.repeat),
+        "--warmup", str(args.warmup),
+        "--max-seconds", str(args.max_seconds),
+    ]
+
+
+def _params(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        key: getattr(args, key) for key in (
+            "channels", "duration", "sampling_rate", "agents", "agent_latency"
+        )
+    }
+
+
+def main():
+    """Main entry point for the benchmark suite."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark agents, workflows and signal processing"
+    )
+    parser.add_argument(
+        "benchmarks", nargs="*", metavar="BENCHMARK",
+        help=f"Benchmarks to run, all by default: {', '.join(BENCHMARKS)}"
+    )
+    parser.add_argument("--channels", type=int, default=64,
+                        help="Channels of the synthetic recording")
+    parser.add_argument("--duration", type=float, default=60.0,
+                        help="Duration of the synthetic recording in seconds")
+    parser.add_argument("--sampling-rate", type=float, default=256.0,
+                        help="Sampling rate of the synthetic recording")
+    parser.add_argument("--agents", type=int, default=16,
+                        help="Mock agents in coordinator fan-out benchmarks")
+    parser.add_argument("--agent-latency", type=float, default=5.0,
+                        help="Latency of a mock agent call in milliseconds")
+    parser.add_argument("--repeat", type=int, default=50,
+                        help="Timed iterations per benchmark")
+    parser.add_argument("--warmup", type=int, default=3,
+                        help="Untimed iterations per benchmark")
+    parser.add_argument("--max-seconds", type=float, default=30.0,
+                        help="Stop timing a benchmark after this long")
+    parser.add_argument("--output", type=Path,
+                        help="Write results as JSON to this file")
+    parser.add_argument("--save-baseline", nargs="?", type=Path,
+                        const=BASELINE_PATH,
+                        help=f"Store results as baseline ({BASELINE_PATH})")
+    parser.add_argument("--compare", nargs="?", type=Path,
+                        const=BASELINE_PATH,
+                        help=f"Compare with a baseline ({BASELINE_PATH})")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Relative change tolerated before a regression")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.run_one:
+        result = asyncio.run(_measure(BENCHMARKS[args.run_one], args))
+        print(json.dumps(result))
+        return
+
+    names = args.benchmarks or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results = {}
+    print(
+        f"{'benchmark':<26} {'iter':>5} {'items/s':>10} {'p50 ms':>9} "
+        f"{'p99 ms':>9} {'RSS MB':>8}"
+    )
+    for name in names:
+        result = run_isolated(name, _forwarded_args(args))
+        results[name] = result
+        print(
+            f"{name:<26} {result['iterations']:>5} "
+            f"{result['throughput']:>10.1f} {result['p50_ms']:>9.2f} "
+            f"{result['p99_ms']:>9.2f} {result['peak_rss_mb']:>8.1f}"
+        )
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": _params(args),
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+        logger.info(f"Baseline saved to {args.save_baseline}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline.get("params") != report["params"]:
+            logger.warning(
+                "Baseline was recorded with different parameters: "
+                f"{baseline.get('params')}"
+            )
+        regressions = compare(results, baseline["results"], args.tolerance)
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        logger.info("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the command-line entry points.
+
+Every command runs in a fresh interpreter with ``-X importtime``; the
+report lists the wall-clock time of each command and the modules with the
+highest cumulative import cost, so that a heavy dependency creeping back
+into a module-level import is easy to spot.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from loguru import logger
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Non-server commands expected to start within the budget.
+COMMANDS: Dict[str, List[str]] = {
+    "run_app --help": ["scripts/run_app.py", "--help"],
+    "data_manager --help": ["scripts/data_manager.py", "--help"],
+    "import src.agents": ["-c", "import src.agents"],
+    "import src.processing": ["-c", "import src.processing"],
+    "import src.agents.planning_agent": [
+        "-c", "import src.agents.planning_agent"
+    ],
+}
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Parse ``-X importtime`` output.
+
+    Returns:
+        ``(module, self_us, cumulative_us)`` for every imported module
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure(
+    args: Sequence[str],
+    repeat: int = 5
+) -> Tuple[float, List[Tuple[str, int, int]]]:
+    """Run a command ``repeat`` times in fresh interpreters.
+
+    Returns:
+        Median wall-clock time in milliseconds and the import timings of
+        the last run
+    """
+    timings = []
+    modules: List[Tuple[str, int, int]] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", *args],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"{' '.join(args)} exited with {result.returncode}:\n"
+                f"{result.stderr[-2000:]}"
+            )
+        modules = parse_importtime(result.stderr)
+    return statistics.median(timings), modules
+
+
+def main():
+    """Main entry point for the startup benchmark."""
+    parser = argparse.ArgumentParser(
+        description="Measure CLI startup and per-module import time"
+    )
+    parser.add_argument(
+        "--budget-ms", type=float, default=200.0,
+        help="Startup budget per command in milliseconds"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Runs per command"
+    )
+    parser.add_argument(
+        "--top", type=int, default=10,
+        help="Slowest modules to list per command"
+    )
+    parser.add_argument(
+        "commands", nargs="*", metavar="COMMAND",
+        help=f"Commands to measure, all by default: {', '.join(COMMANDS)}"
+    )
+
+    args = parser.parse_args()
+    names = args.commands or list(COMMANDS)
+    unknown = [name for name in names if name not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown commands: {', '.join(unknown)}")
+
+    over_budget = []
+    for name in names:
+        wall_ms, modules = measure(COMMANDS[name], args.repeat)
+        status = "ok" if wall_ms <= args.budget_ms else "OVER BUDGET"
+        print(f"\n{name}: {wall_ms:.0f} ms ({status})")
+        slowest = sorted(modules, key=lambda m: m[2], reverse=True)
+        for module, self_us, cumulative_us in slowest[:args.top]:
+            print(
+                f"  {cumulative_us / 1000:8.1f} ms cumulative"
+                f"  {self_us / 1000:7.1f} ms self  {module}"
+            )
+        if wall_ms > args.budget_ms:
+            over_budget.append(name)
+
+    if over_budget:
+        logger.error(
+            f"Over the {args.budget_ms:.0f} ms budget: {', '.join(over_budget)}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
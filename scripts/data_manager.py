@@ -5,12 +5,15 @@ Data download and management script for BCI datasets.
 
 import argparse
 import asyncio
+import sys
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 
-import requests
 from loguru import logger
 
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
 
 class DatasetDownloader:
     """Download and manage BCI datasets from various sources."""
@@ -21,20 +24,23 @@ class DatasetDownloader:
         )
         self.data_dir.mkdir(parents=True, exist_ok=True)
     
-    def list_openneuro_datasets(self, limit: int = 10) -> List[dict]:
-        """List available datasets from OpenNeuro."""
-        logger.info("Fetching OpenNeuro datasets...")
+    async def list_remote_datasets(
+        self,
+        sources: Iterable[str] = ("openneuro", "physionet"),
+        limit: Optional[int] = None
+    ) -> Dict[str, List[dict]]:
+        """List datasets from remote catalogs, fetching sources concurrently."""
+        from src.config import get_settings
+        from src.services.catalog import CatalogClient
         
-        try:
-            response = requests.get(
-                "https://openneuro.org/crn/api/datasets",
-                params={"limit": limit}
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error(f"Failed to fetch OpenNeuro datasets: {e}")
-            return []
+        logger.info(f"Fetching catalogs: {', '.join(sources)}...")
+        async with CatalogClient.from_settings(get_settings()) as client:
+            return await client.fetch_catalog(sources, limit)
+    
+    async def list_openneuro_datasets(self, limit: int = 10) -> List[dict]:
+        """List available datasets from OpenNeuro."""
+        catalog = await self.list_remote_datasets(["openneuro"], limit)
+        return catalog["openneuro"]
     
     def list_physionet_datasets(self) -> List[dict]:
         """List relevant BCI datasets from PhysioNet."""
@@ -46,7 +52,12 @@ class DatasetDownloader:
                 "description": (
                     "64-channel EEG recordings of motor movement "
                     "and imagery tasks"
-                )
+                ),
+                "modality": "EEG",
+                "subjects": 109,
+                "channels": 64,
+                "sampling_rate": 160,
+                "tasks": ["motor_movement", "motor_imagery"]
             },
             {
                 "id": "chbmit",
@@ -54,67 +65,154 @@ class DatasetDownloader:
                 "description": (
                     "Continuous scalp EEG from pediatric subjects "
                     "with intractable seizures"
-                )
+                ),
+                "modality": "EEG",
+                "sampling_rate": 256,
+                "tasks": ["seizure"]
             },
             {
                 "id": "sleep-edfx",
                 "name": "Sleep-EDF Database Expanded",
-                "description": "Sleep recordings with annotations"
+                "description": "Sleep recordings with annotations",
+                "modality": "EEG",
+                "tasks": ["sleep"]
             }
         ]
         return bci_datasets
     
-    async def download_sample_dataset(self, dataset_id: str) -> bool:
-        """Download a sample dataset for testing."""
-        logger.info(f"Downloading sample data for {dataset_id}...")
+    async def build_index(self, limit: Optional[int] = None) -> int:
+        """Populate the local dataset index from every catalog.
         
-        # This is a placeholder - implement actual download logic
-        # based on the specific dataset API
+        The semantic vector index, when available, is synchronized
+        afterwards, embedding only new or changed datasets.
         
-        sample_dir = self.data_dir / dataset_id
-        sample_dir.mkdir(exist_ok=True)
+        Returns:
+            Number of datasets indexed
+        """
+        from src.services.dataset_index import get_dataset_index
+        
+        catalog = await self.list_remote_datasets(limit=limit)
+        catalog["physionet"] = (
+            catalog.get("physionet", []) + self.list_physionet_datasets()
+        )
+        index = get_dataset_index()
+        count = index.upsert_catalog(catalog)
+        logger.info(f"Indexed {count} datasets")
+        
+        from src.services.semantic_search import get_semantic_search
+        
+        semantic = get_semantic_search()
+        if semantic is not None:
+            semantic.sync(index.texts())
+        return count
+    
+    async def download_dataset(
+        self,
+        dataset_id: str,
+        include: Optional[List[str]] = None,
+        manifest: Optional[Path] = None,
+        concurrency: Optional[int] = None
+    ) -> bool:
+        """Download a dataset's files into the data directory.
+        
+        OpenNeuro datasets (``ds...``) are listed from the public bucket;
+        other sources need a JSON manifest of ``url``, ``path`` and
+        optional ``size``, ``checksum`` and ``algorithm`` entries. Re-running
+        the command resumes an interrupted download.
+        
+        Args:
+            dataset_id: Dataset identifier, also the target directory name
+            include: Glob patterns of files to fetch, e.g. ``sub-01/*``
+            manifest: JSON file listing the files to download
+            concurrency: Files downloaded in parallel
+            
+        Returns:
+            Whether every file was downloaded
+        """
+        import json
+        from datetime import datetime, timezone
+        
+        from src.config import get_settings
+        from src.services.downloader import (
+            DownloadError,
+            FileDownloader,
+            RemoteFile,
+            list_openneuro_files,
+        )
+        
+        settings = get_settings()
+        if manifest is not None:
+            with open(manifest) as f:
+                files = [RemoteFile(**entry) for entry in json.load(f)]
+        elif dataset_id.startswith("ds"):
+            files = await list_openneuro_files(
+                dataset_id, settings.openneuro_bucket_url, include
+            )
+        else:
+            logger.error(
+                f"Cannot list files of {dataset_id}; pass --manifest"
+            )
+            return False
+        if not files:
+            logger.error(f"No files found for {dataset_id}")
+            return False
+        
+        dataset_dir = self.data_dir / dataset_id
+        total = sum(f.size or 0 for f in files)
+        logger.info(
+            f"Downloading {len(files)} files ({total / 1e9:.2f} GB) "
+            f"of {dataset_id}..."
+        )
+        kwargs = {"max_concurrency": concurrency} if concurrency else {}
+        async with FileDownloader.from_settings(settings, **kwargs) as client:
+            try:
+                await client.download(files, dataset_dir)
+            except DownloadError as e:
+                logger.error(f"{e}; re-run the command to resume")
+                return False
         
-        # Create a sample metadata file
         metadata = {
             "dataset_id": dataset_id,
-            "download_date": "2025-01-09",
-            "description": f"Sample data for {dataset_id}",
-            "files": []
+            "download_date": datetime.now(timezone.utc).isoformat(),
+            "files": [
+                {"path": f.path, "size": f.size, "url": f.url} for f in files
+            ]
         }
-        
-        import json
-        with open(sample_dir / "metadata.json", "w") as f:
+        with open(dataset_dir / "metadata.json", "w") as f:
             json.dump(metadata, f, indent=2)
         
-        logger.info(f"Sample dataset {dataset_id} prepared in {sample_dir}")
+        logger.info(f"Dataset {dataset_id} downloaded to {dataset_dir}")
         return True
     
-    def create_sample_eeg_data(self):
-        """Create synthetic EEG data for development and testing."""
+    def create_sample_eeg_data(
+        self,
+        n_channels: int = 64,
+        n_samples: int = 1000,
+        sampling_rate: int = 256,
+        chunk_size: int = 65536
+    ):
+        """Create synthetic EEG data for development and testing.
+        
+        Samples are generated and written in chunks into a memory-mapped
+        file, so arbitrarily long recordings use bounded memory.
+        """
         logger.info("Creating synthetic EEG data...")
         
-        import numpy as np
-
-        # Generate synthetic EEG data
-        n_channels = 64
-        n_samples = 1000
-        sampling_rate = 256
-        
-        # Create synthetic data with some basic patterns
-        time = np.linspace(0, n_samples / sampling_rate, n_samples)
-        data = np.random.randn(n_channels, n_samples) * 50  # Base noise
-        
-        # Add some alpha rhythm (8-12 Hz)
-        alpha_freq = 10
-        for ch in range(n_channels):
-            alpha_component = 20 * np.sin(2 * np.pi * alpha_freq * time)
-            data[ch] += alpha_component * (0.5 + 0.5 * np.random.rand())
-        
-        # Save as numpy array
+        from src.processing.online import SyntheticEEG
+        from src.processing.streaming import RecordingWriter
+        
         sample_dir = self.data_dir / "synthetic_eeg"
         sample_dir.mkdir(exist_ok=True)
         
-        np.save(sample_dir / "eeg_data.npy", data)
+        # White noise plus a per-channel alpha rhythm (10 Hz)
+        generator = SyntheticEEG(n_channels, sampling_rate)
+        
+        with RecordingWriter(
+            sample_dir / "eeg_data.npy", n_channels, n_samples
+        ) as writer:
+            for start in range(0, n_samples, chunk_size):
+                stop = min(start + chunk_size, n_samples)
+                writer.write(generator.generate(start, stop))
         
         # Create channel information
         channels = [f"Ch{i+1:02d}" for i in range(n_channels)]
@@ -132,6 +230,25 @@ class DatasetDownloader:
             json.dump(metadata, f, indent=2)
         
         logger.info(f"Synthetic EEG data created in {sample_dir}")
+    
+    def convert_recording(
+        self,
+        source: Path,
+        dtype: str = "float32",
+        destination: Optional[Path] = None
+    ) -> Path:
+        """Convert an ``.npy`` recording to chunked, compressed HDF5."""
+        from src.processing.storage import convert_recording
+        
+        source = Path(source)
+        npy = source / "eeg_data.npy" if source.is_dir() else source
+        output = convert_recording(source, destination, dtype)
+        before, after = npy.stat().st_size, output.stat().st_size
+        logger.info(
+            f"Wrote {output} ({dtype}): {after / 1e6:.1f} MB, "
+            f"{before / after:.1f}x smaller than {npy.name}"
+        )
+        return output
 
 
 def main():
@@ -151,6 +268,14 @@ def main():
         help="Dataset source"
     )
     
+    # Index command
+    index_parser = subparsers.add_parser(
+        "index", help="Build the local dataset search index"
+    )
+    index_parser.add_argument(
+        "--limit", type=int, help="Maximum datasets per source"
+    )
+    
     # Download command
     download_parser = subparsers.add_parser(
         "download", help="Download dataset"
@@ -159,11 +284,47 @@ def main():
     download_parser.add_argument(
         "--data-dir", type=Path, help="Data directory"
     )
+    download_parser.add_argument(
+        "--include", action="append",
+        help="Glob pattern of files to fetch (repeatable)"
+    )
+    download_parser.add_argument(
+        "--manifest", type=Path,
+        help="JSON list of files (url, path, size, checksum) to download"
+    )
+    download_parser.add_argument(
+        "--concurrency", type=int, help="Files downloaded in parallel"
+    )
     
     # Create synthetic data command
-    subparsers.add_parser(
+    synthetic_parser = subparsers.add_parser(
         "create-synthetic", help="Create synthetic EEG data"
     )
+    synthetic_parser.add_argument(
+        "--channels", type=int, default=64, help="Number of channels"
+    )
+    synthetic_parser.add_argument(
+        "--samples", type=int, default=1000, help="Samples per channel"
+    )
+    synthetic_parser.add_argument(
+        "--sampling-rate", type=int, default=256, help="Sampling rate in Hz"
+    )
+    
+    # Convert command
+    convert_parser = subparsers.add_parser(
+        "convert", help="Convert an .npy recording to compressed HDF5"
+    )
+    convert_parser.add_argument(
+        "source", type=Path,
+        help="Recording directory (eeg_data.npy + metadata.json) or .npy file"
+    )
+    convert_parser.add_argument(
+        "--dtype", choices=["float64", "float32", "int16"], default="float32",
+        help="Storage type; int16 quantizes each channel over its range"
+    )
+    convert_parser.add_argument(
+        "--output", type=Path, help="Output .h5 file"
+    )
     
     args = parser.parse_args()
     
@@ -172,7 +333,7 @@ def main():
     
     if args.command == "list":
         if args.source in ["openneuro", "all"]:
-            datasets = downloader.list_openneuro_datasets()
+            datasets = asyncio.run(downloader.list_openneuro_datasets())
             print("\nOpenNeuro Datasets:")
             for ds in datasets[:5]:  # Show first 5
                 label = ds.get('label', 'Unknown')
@@ -185,11 +346,25 @@ def main():
             for ds in datasets:
                 print(f"- {ds['name']}: {ds['description']}")
     
+    elif args.command == "index":
+        asyncio.run(downloader.build_index(args.limit))
+    
     elif args.command == "download":
-        asyncio.run(downloader.download_sample_dataset(args.dataset_id))
+        ok = asyncio.run(downloader.download_dataset(
+            args.dataset_id, args.include, args.manifest, args.concurrency
+        ))
+        if not ok:
+            sys.exit(1)
     
     elif args.command == "create-synthetic":
-        downloader.create_sample_eeg_data()
+        downloader.create_sample_eeg_data(
+            n_channels=args.channels,
+            n_samples=args.samples,
+            sampling_rate=args.sampling_rate
+        )
+    
+    elif args.command == "convert":
+        downloader.convert_recording(args.source, args.dtype, args.output)
     
     else:
         parser.print_help()
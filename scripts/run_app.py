@@ -5,17 +5,15 @@ This script provides a unified entry point for starting the application.
 """
 
 import argparse
-import asyncio
 import subprocess
 import sys
 from pathlib import Path
 from typing import Optional
 
-import uvicorn
 from loguru import logger
 
-# Add src to Python path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# Add the project root to the Python path so that ``src`` is importable
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 
 def run_streamlit():
@@ -31,6 +29,9 @@ def run_streamlit():
 
 def run_fastapi(host: str = "0.0.0.0", port: int = 8000, reload: bool = False):
     """Run the FastAPI backend server."""
+    # Imported here so that other subcommands do not pay for the server stack.
+    import uvicorn
+    
     logger.info(f"Starting FastAPI server on {host}:{port}")
     uvicorn.run(
         "src.api.main:app",
@@ -41,10 +42,55 @@ def run_fastapi(host: str = "0.0.0.0", port: int = 8000, reload: bool = False):
     )
 
 
+def run_workers(processes: Optional[int] = None):
+    """Run background job workers until interrupted."""
+    from src.services.jobs import start_workers, stop_workers
+
+    workers = start_workers(processes)
+    try:
+        for process in workers:
+            process.join()
+    except KeyboardInterrupt:
+        logger.info("Stopping job workers...")
+    finally:
+        stop_workers(workers)
+
+
+def run_online_demo(
+    duration: float = 10.0,
+    channels: int = 8,
+    sampling_rate: float = 256.0,
+    block_size: int = 16
+):
+    """Decode a simulated EEG stream online and report latencies."""
+    from src.processing.online import OnlineDecoder, SimulatedStream, run_online
+
+    stream = SimulatedStream(channels, sampling_rate, block_size)
+    decoder = OnlineDecoder(sampling_rate, channels, max_block_size=block_size)
+    alpha = decoder.band_power.band_names.index("alpha")
+
+    def report(output):
+        logger.debug(
+            f"t={output.samples / sampling_rate:.2f}s "
+            f"alpha={output.prediction[alpha].mean():.2f} "
+            f"latency={output.latency * 1000:.2f}ms"
+        )
+
+    logger.info(
+        f"Decoding {duration}s of {channels}-channel EEG in blocks of "
+        f"{block_size} samples..."
+    )
+    stats = run_online(stream, decoder, duration, report)
+    logger.info(f"Processing per block: {stats['processing']}")
+    logger.info(f"End-to-end latency: {stats['latency']}")
+
+
 def run_full_stack():
-    """Run both FastAPI backend and Streamlit frontend."""
+    """Run the FastAPI backend, job workers and Streamlit frontend."""
     import threading
 
+    from src.services.jobs import start_workers, stop_workers
+
     # Start FastAPI in a separate thread
     api_thread = threading.Thread(
         target=run_fastapi,
@@ -57,8 +103,12 @@ def run_full_stack():
     import time
     time.sleep(3)
     
-    # Start Streamlit in the main thread
-    run_streamlit()
+    workers = start_workers()
+    try:
+        # Start Streamlit in the main thread
+        run_streamlit()
+    finally:
+        stop_workers(workers)
 
 
 def setup_environment():
@@ -98,8 +148,34 @@ def main():
     # Streamlit dashboard command
     subparsers.add_parser("dashboard", help="Run Streamlit dashboard")
     
+    # Job worker command
+    worker_parser = subparsers.add_parser(
+        "worker", help="Run background job workers"
+    )
+    worker_parser.add_argument(
+        "--processes", type=int, default=None,
+        help="Worker processes (default: JOB_WORKERS)"
+    )
+    
+    # Online decoding demo
+    online_parser = subparsers.add_parser(
+        "online", help="Decode a simulated EEG stream in real time"
+    )
+    online_parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds to stream"
+    )
+    online_parser.add_argument(
+        "--channels", type=int, default=8, help="Number of channels"
+    )
+    online_parser.add_argument(
+        "--rate", type=float, default=256.0, help="Sampling rate in Hz"
+    )
+    online_parser.add_argument(
+        "--block-size", type=int, default=16, help="Samples per block"
+    )
+    
     # Full stack command
-    subparsers.add_parser("serve", help="Run both API and dashboard")
+    subparsers.add_parser("serve", help="Run API, job workers and dashboard")
     
     # Setup command
     subparsers.add_parser("setup", help="Set up development environment")
@@ -110,6 +186,10 @@ def main():
         run_fastapi(host=args.host, port=args.port, reload=args.reload)
     elif args.command == "dashboard":
         run_streamlit()
+    elif args.command == "worker":
+        run_workers(args.processes)
+    elif args.command == "online":
+        run_online_demo(args.duration, args.channels, args.rate, args.block_size)
     elif args.command == "serve":
         run_full_stack()
     elif args.command == "setup":
@@ -1,17 +1,77 @@
 """
 Core agents package for the BCI Research Assistant.
+
+Agents are imported on first access (PEP 562) so that importing one agent,
+or the package itself, does not pay for the numeric and model dependencies
+of every other agent.
 """
 
-from .analysis_agent import AnalysisAgent
-from .base_agent import BaseAgent
-from .coordinator_agent import CoordinatorAgent
-from .data_query_agent import DataQueryAgent
-from .planning_agent import PlanningAgent
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from .analysis_agent import AnalysisAgent
+    from .base_agent import BaseAgent
+    from .coordinator_agent import CoordinatorAgent
+    from .data_query_agent import DataQueryAgent
+    from .planning_agent import PlanningAgent
+    from .results import (
+        AgentResult,
+        AnalysisResult,
+        CoordinatorResult,
+        DataQueryResult,
+        PlanningResult,
+    )
+    from .router import RoutingDecision, TaskRouter
+    from .workflow import NodeResult, WorkflowEngine, WorkflowError, WorkflowNode
+
+_LAZY_ATTRIBUTES: Dict[str, str] = {
+    "BaseAgent": ".base_agent",
+    "DataQueryAgent": ".data_query_agent",
+    "AnalysisAgent": ".analysis_agent",
+    "PlanningAgent": ".planning_agent",
+    "CoordinatorAgent": ".coordinator_agent",
+    "TaskRouter": ".router",
+    "RoutingDecision": ".router",
+    "AgentResult": ".results",
+    "AnalysisResult": ".results",
+    "DataQueryResult": ".results",
+    "PlanningResult": ".results",
+    "CoordinatorResult": ".results",
+    "WorkflowEngine": ".workflow",
+    "WorkflowNode": ".workflow",
+    "NodeResult": ".workflow",
+    "WorkflowError": ".workflow",
+}
 
 __all__ = [
     "BaseAgent",
     "DataQueryAgent", 
     "AnalysisAgent",
     "PlanningAgent",
-    "CoordinatorAgent"
+    "CoordinatorAgent",
+    "TaskRouter",
+    "RoutingDecision",
+    "AgentResult",
+    "AnalysisResult",
+    "DataQueryResult",
+    "PlanningResult",
+    "CoordinatorResult",
+    "WorkflowEngine",
+    "WorkflowNode",
+    "NodeResult",
+    "WorkflowError"
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
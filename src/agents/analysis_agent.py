@@ -2,47 +2,397 @@
 Analysis Agent for neural signal processing and analysis.
 """
 
-from typing import Any, Dict, List
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
+
+from ..processing.quality import (
+    SignalQualityReport,
+    assess_signal_quality,
+    assess_signal_quality_batch,
+    assess_window_quality,
+)
+from ..processing.preprocessing import preprocess
+from ..processing.storage import (
+    HDF5RecordingReader,
+    is_hdf5_recording,
+    read_recording,
+    resolve_recording_path,
+)
+from ..utils.compute import ComputePool, get_compute_pool
 from .base_agent import BaseAgent
+from .results import AnalysisResult
 
 
 class AnalysisAgent(BaseAgent):
     """Agent specialized in neural signal analysis."""
     
-    def __init__(self, llm, tools: List[Any]):
+    route_keywords = (
+        "analy", "signal quality", "band power", "spectr", "psd", "artifact",
+        "noise", "snr", "channel", "alpha", "beta", "theta", "filter",
+    )
+    
+    # Analyses are bounded by the compute pool, not the model rate limit.
+    rate_limited = False
+    
+    def __init__(self, llm, tools: List[Any], **kwargs: Any):
         """Initialize the Analysis Agent."""
-        super().__init__(llm, tools, "AnalysisAgent")
+        super().__init__(llm, tools, "AnalysisAgent", **kwargs)
     
     def _create_executor(self) -> Any:
         """Create the agent executor for analysis tasks."""
-        return MockAnalysisExecutor()
+        return SignalAnalysisExecutor(self.tools, get_compute_pool())
     
-    def _format_output(self, result: Any) -> Dict[str, Any]:
+    def _format_output(self, result: Any) -> AnalysisResult:
         """Format the analysis results."""
-        return {
-            "status": "success",
-            "agent": self.name,
-            "analysis_type": result.get("analysis_type", ""),
-            "results": result.get("results", {}),
-            "recommendations": result.get("recommendations", [])
-        }
+        return AnalysisResult(
+            self.name,
+            analysis_type=result.get("analysis_type", ""),
+            results=result.get("results", {}),
+            recommendations=result.get("recommendations", [])
+        )
+
+
+def load_recording(
+    input_data: Dict[str, Any]
+) -> Tuple[np.ndarray, float, Optional[Sequence[str]]]:
+    """Resolve the recording referenced by an analysis request.
+    
+    Requests either carry the samples inline under ``data`` together with
+    ``sampling_rate``, or point at a recording on disk under ``data_path``:
+    a ``.npy`` file, an HDF5 recording (``.h5``) or a directory holding
+    ``recording.h5`` or ``eeg_data.npy`` and ``metadata.json``. ``.npy``
+    files are memory-mapped, not loaded; of HDF5 recordings only the time
+    range between the optional ``start`` and ``stop`` seconds is
+    decompressed. Inline data may also be a
+    ``(n_epochs, n_channels, n_samples)`` batch of epochs.
+    
+    Args:
+        input_data: Analysis request
+        
+    Returns:
+        Tuple of recording data, sampling rate in Hz and channel names when
+        known
+        
+    Raises:
+        ValueError: If the request does not reference a usable recording
+    """
+    if input_data.get("data") is not None:
+        data = np.asarray(input_data["data"])
+        sampling_rate = input_data.get("sampling_rate")
+        channel_names = input_data.get("channel_names")
+    elif input_data.get("data_path"):
+        data, sampling_rate, channel_names = read_recording(
+            input_data["data_path"],
+            input_data.get("start"),
+            input_data.get("stop"),
+            sampling_rate=input_data.get("sampling_rate"),
+        )
+    else:
+        raise ValueError("Analysis requires either 'data' or 'data_path'")
+    
+    if data.ndim < 2:
+        raise ValueError(
+            "Recording must be a (n_channels, n_samples) array or a batch "
+            "of such epochs"
+        )
+    if not sampling_rate:
+        raise ValueError("Analysis requires the recording's 'sampling_rate'")
+    return data, float(sampling_rate), channel_names
+
+
+def _quality_recommendations(
+    report: SignalQualityReport,
+    line_freq: float,
+    channel_names: Optional[Sequence[str]]
+) -> List[str]:
+    """Derive preprocessing recommendations from a quality report."""
+    recommendations = []
+    if report.bad_channels:
+        names = [
+            channel_names[i] if channel_names else str(i)
+            for i in report.bad_channels
+        ]
+        recommendations.append(
+            f"Consider excluding or interpolating channels {', '.join(names)}"
+        )
+    if (report.line_noise_ratio > 0.05).any():
+        recommendations.append(
+            f"Apply a notch filter at {line_freq:g} Hz for line noise"
+        )
+    if report.reasons.get("clipping", np.zeros(0, bool)).any():
+        recommendations.append(
+            "Check amplifier gain; some channels are saturating"
+        )
+    if not recommendations:
+        recommendations.append("Signal quality is good; apply a bandpass filter")
+    return recommendations
+
+
+def _quality_result(
+    report: SignalQualityReport,
+    line_freq: float,
+    channel_names: Optional[Sequence[str]]
+) -> Dict[str, Any]:
+    """Executor result for a signal-quality report."""
+    return {
+        "analysis_type": "signal_quality",
+        "results": report.to_dict(channel_names),
+        "recommendations": _quality_recommendations(
+            report, line_freq, channel_names
+        )
+    }
 
 
-class MockAnalysisExecutor:
-    """Mock analysis executor for development."""
+def _quality_batch_results(
+    recordings: np.ndarray,
+    sampling_rate: float,
+    line_freq: float,
+    clip_level: Optional[float],
+    channel_names: List[Optional[Sequence[str]]]
+) -> List[Dict[str, Any]]:
+    """Assess and summarize a stack of recordings inside a pool worker."""
+    reports = assess_signal_quality_batch(
+        recordings, sampling_rate, line_freq=line_freq, clip_level=clip_level
+    )
+    return [
+        _quality_result(report, line_freq, names)
+        for report, names in zip(reports, channel_names)
+    ]
+
+
+def _hdf5_quality_result(
+    path: str,
+    sampling_rate: Optional[float],
+    line_freq: float,
+    clip_level: Optional[float],
+    channels: Optional[Sequence[int]],
+    channel_names: Optional[Sequence[str]],
+    start: Optional[float] = None,
+    stop: Optional[float] = None,
+    window_seconds: float = 60.0
+) -> Dict[str, Any]:
+    """Assess an HDF5 recording window by window inside a pool worker.
+    
+    Only one window of the selected channels is decompressed at a time, so
+    memory use does not grow with the recording length.
+    """
+    with HDF5RecordingReader(path) as reader:
+        rate = float(sampling_rate or reader.sampling_rate)
+        windows = reader.windows(
+            max(int(window_seconds * rate), 1),
+            channels=channels,
+            drop_last=False,
+            first=int(round((start or 0.0) * rate)),
+            last=None if stop is None else int(round(stop * rate)),
+        )
+        report = assess_window_quality(
+            (window.data for window in windows), rate, line_freq, clip_level
+        )
+        names = list(channel_names or reader.channel_names)
+    if channels is not None:
+        names = [names[i] for i in channels]
+    return _quality_result(report, line_freq, names)
+
+
+class SignalAnalysisExecutor:
+    """Executor computing analyses from recording data.
+    
+    Signal quality is built in; other analysis types are dispatched to the
+    agent tool whose ``name`` matches the requested ``analysis_type``. The
+    numeric work runs in the compute pool so the event loop stays free.
+    """
+    
+    #: Upper bound on the samples stacked into one vectorized batch job
+    MAX_BATCH_SAMPLES = 1 << 24
+    
+    def __init__(
+        self,
+        tools: Optional[List[Any]] = None,
+        pool: Optional[ComputePool] = None
+    ):
+        """Initialize with the agent's tools and the compute pool."""
+        self.pool = pool or ComputePool(max_workers=0)
+        self.tools: Dict[str, Any] = {
+            tool.name: tool for tool in tools or []
+            if hasattr(tool, "run") and getattr(tool, "name", None)
+        }
     
     async def arun(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Mock analysis execution."""
+        """Run the requested analysis on the referenced recording."""
+        analysis_type = input_data.get("analysis_type", "signal_quality")
+        if analysis_type == "signal_quality":
+            return await self._signal_quality(input_data)
+        
+        tool = self.tools.get(analysis_type)
+        if tool is None:
+            available = ["signal_quality", *sorted(self.tools)]
+            raise ValueError(
+                f"Unsupported analysis type '{analysis_type}', "
+                f"available: {available}"
+            )
+        data, sampling_rate, _ = await self._load(input_data)
+        params = input_data.get("analysis_params") or {}
         return {
-            "analysis_type": input_data.get("analysis_type", "signal_quality"),
-            "results": {
-                "quality_score": 0.85,
-                "good_channels": 58,
-                "bad_channels": 6
-            },
-            "recommendations": [
-                "Consider excluding bad channels",
-                "Apply bandpass filter"
-            ]
+            "analysis_type": analysis_type,
+            "results": await self.pool.run(
+                tool.run, data, sampling_rate, **params
+            ),
+            "recommendations": []
         }
+    
+    async def abatch(
+        self,
+        inputs: List[Dict[str, Any]]
+    ) -> List[Union[Dict[str, Any], BaseException]]:
+        """Run many analyses, vectorizing compatible quality requests.
+        
+        Signal-quality requests for in-memory recordings of the same shape
+        and parameters are stacked and assessed in one vectorized job per
+        group, so a batch of short recordings costs a few pool round-trips
+        instead of one per recording. Every other request runs on its own.
+        
+        Returns:
+            One result or exception per input, in input order
+        """
+        outputs: List[Any] = [None] * len(inputs)
+        groups: Dict[Tuple, List[Tuple[int, np.ndarray]]] = {}
+        singles = []
+        for index, input_data in enumerate(inputs):
+            key = None
+            if (
+                input_data.get("analysis_type", "signal_quality")
+                == "signal_quality"
+                and input_data.get("data") is not None
+                and input_data.get("channels") is None
+                and not input_data.get("preprocessing")
+            ):
+                try:
+                    data, sampling_rate, _ = load_recording(input_data)
+                except ValueError as e:
+                    outputs[index] = e
+                    continue
+                if data.ndim == 2:
+                    key = (
+                        data.shape,
+                        sampling_rate,
+                        float(input_data.get("line_freq", 50.0)),
+                        input_data.get("clip_level"),
+                    )
+                    groups.setdefault(key, []).append((index, data))
+            if key is None:
+                singles.append(index)
+        
+        jobs = []
+        for key, members in groups.items():
+            if len(members) == 1:
+                singles.append(members[0][0])
+                continue
+            shape, sampling_rate, line_freq, clip_level = key
+            size = max(self.MAX_BATCH_SAMPLES // max(shape[0] * shape[1], 1), 1)
+            for start in range(0, len(members), size):
+                jobs.append(self._quality_group(
+                    inputs, members[start:start + size],
+                    sampling_rate, line_freq, clip_level, outputs
+                ))
+        
+        async def single(index: int) -> None:
+            try:
+                outputs[index] = await self.arun(inputs[index])
+            except Exception as e:
+                outputs[index] = e
+        
+        await asyncio.gather(*jobs, *(single(index) for index in singles))
+        return outputs
+    
+    async def _quality_group(
+        self,
+        inputs: List[Dict[str, Any]],
+        members: List[Tuple[int, np.ndarray]],
+        sampling_rate: float,
+        line_freq: float,
+        clip_level: Optional[float],
+        outputs: List[Any]
+    ) -> None:
+        """Assess a group of equally shaped recordings in one pool job."""
+        try:
+            results = await self.pool.run(
+                _quality_batch_results,
+                np.stack([data for _, data in members]),
+                sampling_rate,
+                line_freq,
+                clip_level,
+                [inputs[index].get("channel_names") for index, _ in members]
+            )
+        except Exception as e:
+            results = [e] * len(members)
+        for (index, _), result in zip(members, results):
+            outputs[index] = result
+    
+    async def _load(
+        self,
+        input_data: Dict[str, Any]
+    ) -> Tuple[np.ndarray, float, Optional[Sequence[str]]]:
+        """Load the recording, applying the requested preprocessing.
+        
+        ``preprocessing`` lists stage specifications such as
+        ``{"stage": "bandpass", "low": 1, "high": 40}``. Stage outputs are
+        cached, so repeated analyses of a recording reuse them.
+        """
+        stages = input_data.get("preprocessing")
+        if not stages:
+            return load_recording(input_data)
+        source: Union[np.ndarray, str]
+        if input_data.get("data") is not None:
+            source = np.asarray(input_data["data"], dtype=float)
+        elif input_data.get("data_path"):
+            source = str(input_data["data_path"])
+        else:
+            raise ValueError("Analysis requires either 'data' or 'data_path'")
+        result = await self.pool.run(
+            preprocess,
+            source,
+            stages,
+            input_data.get("sampling_rate"),
+            input_data.get("channel_names")
+        )
+        return result.data, result.sampling_rate, result.channel_names
+    
+    async def _signal_quality(
+        self,
+        input_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        line_freq = float(input_data.get("line_freq", 50.0))
+        channels = input_data.get("channels")
+        path = input_data.get("data_path")
+        if (
+            path
+            and input_data.get("data") is None
+            and not input_data.get("preprocessing")
+            and is_hdf5_recording(resolve_recording_path(path))
+        ):
+            return await self.pool.run(
+                _hdf5_quality_result,
+                str(resolve_recording_path(path)),
+                input_data.get("sampling_rate"),
+                line_freq,
+                input_data.get("clip_level"),
+                channels,
+                input_data.get("channel_names"),
+                input_data.get("start"),
+                input_data.get("stop"),
+            )
+        data, sampling_rate, channel_names = await self._load(input_data)
+        report = await self.pool.run(
+            assess_signal_quality,
+            data,
+            sampling_rate,
+            line_freq=line_freq,
+            clip_level=input_data.get("clip_level"),
+            channels=channels
+        )
+        if channels is not None and channel_names is not None:
+            channel_names = [channel_names[i] for i in channels]
+        return _quality_result(report, line_freq, channel_names)
+    
@@ -2,24 +2,124 @@
 Base agent class for all BCI research agents.
 """
 
+import asyncio
+import math
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from loguru import logger
+
+from ..utils.cache import ResultCache, get_default_cache, make_cache_key
+from ..utils.metrics import MetricsRegistry, get_metrics
+from ..utils.rate_limit import (
+    DEFAULT_TENANT,
+    AdmissionController,
+    Priority,
+    RateLimitExceeded,
+    get_admission_controller,
+)
+from ..utils.singleflight import SingleFlight
+from .results import AgentResult
+
+#: Request keys that steer execution without changing the result; they are
+#: left out of cache keys so that equivalent requests share cache entries
+CONTROL_KEYS = ("tenant", "priority", "deadline", "timeout", "hedge")
+
+#: Executor latencies observed before hedged requests are sent
+HEDGE_MIN_SAMPLES = 20
+
+
+def _default_timeout() -> Optional[float]:
+    from ..config import get_settings
+
+    return get_settings().agent_timeout
+
+
+def _token_usage(result: Any) -> Dict[str, int]:
+    """Extract input and output token counts reported by an executor.
+    
+    Both the Anthropic (``input_tokens``/``output_tokens``) and OpenAI
+    (``prompt_tokens``/``completion_tokens``) spellings are recognized.
+    """
+    usage = result.get("usage") if isinstance(result, Mapping) else None
+    if not isinstance(usage, Mapping):
+        return {}
+    counts = {
+        "input": usage.get("input_tokens", usage.get("prompt_tokens")),
+        "output": usage.get("output_tokens", usage.get("completion_tokens")),
+    }
+    return {kind: int(n) for kind, n in counts.items() if n}
 
 
 class BaseAgent(ABC):
     """Base class for all research agents."""
     
-    def __init__(self, llm, tools: List[Any], name: Optional[str] = None):
+    #: Whether successful results may be served from the result cache
+    cacheable: bool = True
+    #: Whether concurrent identical requests share one execution
+    coalesce: bool = True
+    #: Whether whole executions pass through the shared admission
+    #: controller; agents that do not call a language model opt out, and
+    #: agents that call it only on some paths admit those calls themselves
+    rate_limited: bool = True
+    #: Largest number of requests handed to one executor ``abatch`` call
+    max_batch_size: int = 256
+    #: Word prefixes that route coordinator tasks to this agent
+    route_keywords: Sequence[str] = ()
+    #: Whether slow executions are hedged with a duplicate request; only
+    #: enable for idempotent executors. Requests override it with ``hedge``
+    hedge: bool = False
+    
+    def __init__(
+        self,
+        llm,
+        tools: List[Any],
+        name: Optional[str] = None,
+        cache: Optional[ResultCache] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        admission: Optional[AdmissionController] = None,
+        timeout: Optional[float] = None
+    ):
         """Initialize the base agent.
         
         Args:
             llm: Language model instance
             tools: List of tools available to the agent
             name: Optional name for the agent
+            cache: Result cache, defaults to the shared process-wide cache
+            metrics: Metrics registry, defaults to the process-wide registry
+                (``None`` when metrics are disabled in settings)
+            admission: Admission controller, defaults to the process-wide
+                controller; it gates whole executions of rate-limited agents
+            timeout: Seconds a run may take when the request sets no
+                deadline or timeout, defaults to the ``agent_timeout``
+                setting
         """
         self.llm = llm
         self.tools = tools
         self.name = name or self.__class__.__name__
+        self.cache = cache if cache is not None else get_default_cache()
+        self.metrics = metrics if metrics is not None else get_metrics()
+        self.admission = (
+            admission if admission is not None else get_admission_controller()
+        )
+        self.timeout = timeout if timeout is not None else _default_timeout()
+        self._flights = SingleFlight()
+        self._latencies: Deque[float] = deque(maxlen=256)
         self.executor = self._create_executor()
     
     @abstractmethod
@@ -31,34 +131,548 @@ class BaseAgent(ABC):
         """
         raise NotImplementedError
     
-    async def run(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def run(self, input_data: Dict[str, Any]) -> Mapping[str, Any]:
         """Execute the agent with input data.
         
+        Identical requests are served from the result cache when possible,
+        and concurrent identical requests share a single execution. When
+        metrics are enabled, every call records its latency, status and
+        in-flight count. Rate-limited agents wait for admission before
+        executing; the optional ``tenant`` and ``priority`` (``"interactive"``
+        or ``"batch"``) request keys steer admission, and a shed request
+        returns status ``"rejected"`` with a ``retry_after`` hint.
+        
+        Runs end at the earlier of the request's ``deadline`` (epoch
+        seconds) and ``timeout`` (seconds from now); requests setting
+        neither get the agent timeout. The deadline is passed on to the
+        executor under ``deadline``; when it passes, the execution and
+        everything it started is cancelled and status ``"timeout"`` is
+        returned. A deadline or timeout that is not a number fails the
+        request.
+        
         Args:
             input_data: Dictionary containing input parameters
             
         Returns:
             Formatted results from the agent execution
         """
+        if self.metrics is None:
+            return await self._run(input_data)
+        
+        labels = {"agent": self.name}
+        in_flight = self.metrics.gauge(
+            "agent_in_flight", "Agent runs currently executing", ["agent"]
+        )
+        in_flight.inc(**labels)
+        started = time.perf_counter()
+        status = "cancelled"
+        try:
+            output = await self._run(input_data)
+            status = output.get("status", "success")
+            return output
+        finally:
+            in_flight.dec(**labels)
+            self.metrics.histogram(
+                "agent_run_duration_seconds",
+                "Wall-clock duration of agent runs",
+                ["agent"]
+            ).observe(time.perf_counter() - started, **labels)
+            self.metrics.counter(
+                "agent_requests_total",
+                "Agent runs by final status",
+                ["agent", "status"]
+            ).inc(status=status, **labels)
+    
+    def _cache_key(self, input_data: Dict[str, Any]) -> Optional[str]:
+        """Cache key of a request, ``None`` when its input has none.
+        
+        Such requests are neither cached nor coalesced.
+        """
+        try:
+            return make_cache_key(self.name, {
+                k: v for k, v in input_data.items() if k not in CONTROL_KEYS
+            })
+        except TypeError as e:
+            logger.debug(f"{self.name} request is not cacheable: {e}")
+            return None
+    
+    def _with_deadline(
+        self,
+        input_data: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Optional[float]]:
+        """Resolve the request deadline and the seconds remaining until it.
+        
+        A request ``deadline`` or ``timeout`` replaces the agent timeout, so
+        requests may also allow more time than the default.
+        
+        Raises:
+            ValueError: If ``deadline`` or ``timeout`` is not a number
+        """
+        now = time.time()
+        deadlines = []
+        for name, offset in (("deadline", 0.0), ("timeout", now)):
+            value = input_data.get(name)
+            if value is None:
+                continue
+            try:
+                seconds = float(value)
+            except (TypeError, ValueError):
+                seconds = math.nan
+            if isinstance(value, bool) or not math.isfinite(seconds):
+                raise ValueError(f"'{name}' must be a number")
+            deadlines.append(offset + seconds)
+        if not deadlines and self.timeout is not None:
+            deadlines.append(now + self.timeout)
+        if not deadlines:
+            return input_data, None
+        deadline = min(deadlines)
+        input_data = {k: v for k, v in input_data.items() if k != "timeout"}
+        input_data["deadline"] = deadline
+        return input_data, deadline - now
+    
+    def _invalid(self, error: ValueError) -> Dict[str, Any]:
+        return {
+            "error": str(error),
+            "agent": self.name,
+            "status": "failed"
+        }
+    
+    def _timeout(self) -> Dict[str, Any]:
+        return {
+            "error": "Deadline exceeded",
+            "agent": self.name,
+            "status": "timeout"
+        }
+    
+    async def _run(
+        self,
+        input_data: Dict[str, Any],
+        serve: Optional[
+            Callable[[Dict[str, Any]], Awaitable[Mapping[str, Any]]]
+        ] = None
+    ) -> Mapping[str, Any]:
+        """Serve a request within its deadline.
+        
+        Args:
+            input_data: Request as accepted by ``run``
+            serve: Coroutine function serving the request once its deadline
+                is resolved, defaults to ``_serve``
+        """
+        serve = serve or self._serve
+        try:
+            input_data, remaining = self._with_deadline(input_data)
+        except ValueError as e:
+            return self._invalid(e)
+        if remaining is None:
+            return await serve(input_data)
+        if remaining <= 0:
+            return self._timeout()
         try:
+            return await asyncio.wait_for(serve(input_data), remaining)
+        except asyncio.TimeoutError:
+            return self._timeout()
+    
+    async def _serve(self, input_data: Dict[str, Any]) -> Mapping[str, Any]:
+        """Serve a request from the cache or a (shared) execution."""
+        key = self._cache_key(input_data)
+        cache_key = key if self.cacheable and self.cache is not None else None
+        if cache_key is not None and self.cache is not None:
+            cached = await self.cache.get(cache_key)
+            self._record_cache(cached is not None)
+            if cached is not None:
+                return cached
+        
+        if not self.coalesce or key is None:
+            return await self._execute(input_data, cache_key)
+        return await self._flights.do(
+            key, lambda: self._execute(input_data, cache_key)
+        )
+    
+    async def _execute(
+        self,
+        input_data: Dict[str, Any],
+        cache_key: Optional[str]
+    ) -> Mapping[str, Any]:
+        """Invoke the executor and store successful results in the cache."""
+        try:
+            if self.rate_limited and self.admission is not None:
+                await self.admission.acquire(
+                    input_data.get("tenant", DEFAULT_TENANT),
+                    input_data.get("priority")
+                )
+            result = await self._call_executor(input_data)
+            output = self._format_output(result)
+        except RateLimitExceeded as e:
+            return self._rejection(e)
+        except Exception as e:
+            return self._failure(e)
+        
+        self._record_usage(result)
+        if (
+            cache_key is not None
+            and self.cache is not None
+            and output.get("status") == "success"
+        ):
+            await self.cache.set(cache_key, output)
+        return output
+    
+    async def _call_executor(self, input_data: Dict[str, Any]) -> Any:
+        """Run the executor, hedging slow calls when enabled."""
+        started = time.perf_counter()
+        delay = self._hedge_delay(input_data)
+        if delay is None:
             result = await self.executor.arun(input_data)
-            return self._format_output(result)
+        else:
+            result = await self._hedged(input_data, delay)
+        self._latencies.append(time.perf_counter() - started)
+        return result
+    
+    def _hedge_delay(self, input_data: Dict[str, Any]) -> Optional[float]:
+        """Seconds after which to send a duplicate, or ``None`` not to."""
+        if not input_data.get("hedge", self.hedge):
+            return None
+        if len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        delay = ordered[int(0.95 * (len(ordered) - 1))]
+        deadline = input_data.get("deadline")
+        if deadline is not None and deadline - time.time() <= delay:
+            return None
+        return delay
+    
+    async def _hedged(self, input_data: Dict[str, Any], delay: float) -> Any:
+        """Race the executor against a duplicate sent after ``delay``.
+        
+        The duplicate goes out only if the first call is still running after
+        the agent's p95 latency; the first successful call wins and the
+        other is cancelled.
+        """
+        pending = {asyncio.ensure_future(self.executor.arun(input_data))}
+        hedge = None
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if not done:
+                hedge = asyncio.ensure_future(self.executor.arun(input_data))
+                pending.add(hedge)
+                self._record_hedge("sent")
+            while True:
+                for future in done:
+                    if future.exception() is None:
+                        if future is hedge:
+                            self._record_hedge("won")
+                        return future.result()
+                if not pending:
+                    return next(iter(done)).result()
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+        finally:
+            for future in pending:
+                future.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+    
+    def _rejection(self, error: RateLimitExceeded) -> Dict[str, Any]:
+        return {
+            "error": str(error),
+            "agent": self.name,
+            "status": "rejected",
+            "retry_after": error.retry_after
+        }
+    
+    def _failure(self, error: BaseException) -> Dict[str, Any]:
+        self._record_error(error)
+        return {
+            "error": str(error),
+            "agent": self.name,
+            "status": "failed"
+        }
+    
+    async def run_batch(
+        self,
+        inputs: Sequence[Dict[str, Any]],
+        max_concurrency: int = 8
+    ) -> List[Mapping[str, Any]]:
+        """Execute many requests with amortized per-call overhead.
+        
+        Identical inputs are executed once and cached results are reused.
+        The remaining requests go to the executor's ``abatch`` method in
+        chunks of ``max_batch_size`` when it has one, so backends can
+        group compatible requests into one call; otherwise they run as
+        individual executions within their deadlines, as ``run`` would. A
+        failing item only fails its own result.
+        
+        Batches are admitted once per chunk, individual executions once
+        each; both default to ``"batch"`` priority.
+        
+        Args:
+            inputs: Requests, each as accepted by ``run``
+            max_concurrency: Chunks or individual executions in flight
+            
+        Returns:
+            One formatted result per input, in input order
+        """
+        started = time.perf_counter()
+        # Requests without a cache key are executed individually under a
+        # placeholder key that matches neither the cache nor another request.
+        keys = [
+            self._cache_key(input_data) or f"uncacheable:{index}"
+            for index, input_data in enumerate(inputs)
+        ]
+        uncacheable = {key for key in keys if key.startswith("uncacheable:")}
+        unique: Dict[str, Dict[str, Any]] = {}
+        for key, input_data in zip(keys, inputs):
+            unique.setdefault(key, {"priority": Priority.BATCH, **input_data})
+        
+        results: Dict[str, Mapping[str, Any]] = {}
+        cache = self.cache if self.cacheable else None
+        use_cache = cache is not None
+        if cache is not None:
+            lookups = [key for key in unique if key not in uncacheable]
+            cached = await asyncio.gather(*(cache.get(k) for k in lookups))
+            for key, value in zip(lookups, cached):
+                self._record_cache(value is not None)
+                if value is not None:
+                    results[key] = value
+        
+        pending = [key for key in unique if key not in results]
+        semaphore = asyncio.Semaphore(max_concurrency)
+        abatch = getattr(self.executor, "abatch", None)
+        
+        async def execute(chunk: List[str]) -> None:
+            async with semaphore:
+                chunk_inputs = [unique[key] for key in chunk]
+                cache_keys = [
+                    key if use_cache and key not in uncacheable else None
+                    for key in chunk
+                ]
+                if abatch is not None:
+                    outputs = await self._execute_batch(
+                        chunk_inputs, cache_keys
+                    )
+                else:
+                    outputs = [await self._run(
+                        chunk_inputs[0],
+                        lambda data: self._execute(data, cache_keys[0])
+                    )]
+                results.update(zip(chunk, outputs))
+        
+        size = self.max_batch_size if abatch is not None else 1
+        await asyncio.gather(*(
+            execute(pending[start:start + size])
+            for start in range(0, len(pending), size)
+        ))
+        
+        if self.metrics is not None:
+            counter = self.metrics.counter(
+                "agent_batch_items_total",
+                "Items submitted to run_batch by how they were served",
+                ["agent", "outcome"]
+            )
+            counter.inc(len(pending), agent=self.name, outcome="executed")
+            counter.inc(
+                len(unique) - len(pending), agent=self.name, outcome="cached"
+            )
+            counter.inc(
+                len(keys) - len(unique), agent=self.name, outcome="deduplicated"
+            )
+            self.metrics.histogram(
+                "agent_batch_duration_seconds",
+                "Wall-clock duration of run_batch calls",
+                ["agent"]
+            ).observe(time.perf_counter() - started, agent=self.name)
+        # Result objects are read-only and shared; error dictionaries are
+        # copied so that callers cannot alter each other's.
+        return [
+            results[key] if isinstance(results[key], AgentResult)
+            else dict(results[key])
+            for key in keys
+        ]
+    
+    async def _execute_batch(
+        self,
+        inputs: List[Dict[str, Any]],
+        cache_keys: List[Optional[str]]
+    ) -> List[Mapping[str, Any]]:
+        """Run one executor ``abatch`` call with per-item error isolation."""
+        try:
+            if self.rate_limited and self.admission is not None:
+                await self.admission.acquire(
+                    inputs[0].get("tenant", DEFAULT_TENANT),
+                    inputs[0].get("priority", Priority.BATCH)
+                )
+            raw = await self.executor.abatch(inputs)
+        except RateLimitExceeded as e:
+            return [self._rejection(e) for _ in inputs]
+        except Exception as e:
+            return [self._failure(e) for _ in inputs]
+        
+        outputs: List[Mapping[str, Any]] = []
+        for result, cache_key in zip(raw, cache_keys):
+            if isinstance(result, BaseException):
+                outputs.append(self._failure(result))
+                continue
+            try:
+                output = self._format_output(result)
+            except Exception as e:
+                outputs.append(self._failure(e))
+                continue
+            self._record_usage(result)
+            if (
+                cache_key is not None
+                and self.cache is not None
+                and output.get("status") == "success"
+            ):
+                await self.cache.set(cache_key, output)
+            outputs.append(output)
+        return outputs
+    
+    async def astream(
+        self,
+        input_data: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Execute the agent, yielding output as it becomes available.
+        
+        Events are dictionaries with ``event``, ``agent`` and ``data``
+        keys. ``"partial"`` events carry structured pieces of the result
+        (a plan section, a dataset hit), and the stream ends with a single
+        ``"result"`` event holding the same formatted output ``run``
+        returns.
+        
+        Executors opt in by providing an ``astream(input_data)`` async
+        generator of ``("partial", value)`` and, last,
+        ``("final", raw_result)`` tuples. Other executors, cache hits and
+        failures produce only the ``"result"`` event.
+        
+        Args:
+            input_data: Dictionary containing input parameters
+            
+        Yields:
+            Stream events in order
+        """
+        started = time.perf_counter()
+        first = True
+        
+        def event(name: str, data: Any) -> Dict[str, Any]:
+            nonlocal first
+            if first and self.metrics is not None:
+                self.metrics.histogram(
+                    "agent_time_to_first_event_seconds",
+                    "Delay before an agent stream yields its first event",
+                    ["agent"]
+                ).observe(time.perf_counter() - started, agent=self.name)
+            first = False
+            return {"event": name, "agent": self.name, "data": data}
+        
+        stream = getattr(self.executor, "astream", None)
+        if stream is None:
+            # Served as by ``run``: cached, coalesced and within the deadline.
+            yield event("result", await self._run(input_data))
+            return
+        try:
+            input_data, remaining = self._with_deadline(input_data)
+        except ValueError as e:
+            yield event("result", self._invalid(e))
+            return
+        if remaining is not None and remaining <= 0:
+            yield event("result", self._timeout())
+            return
+        deadline = input_data.get("deadline")
+        key = self._cache_key(input_data)
+        cache_key = key if self.cacheable and self.cache is not None else None
+        if cache_key is not None and self.cache is not None:
+            cached = await self.cache.get(cache_key)
+            self._record_cache(cached is not None)
+            if cached is not None:
+                yield event("result", cached)
+                return
+        
+        def left() -> Optional[float]:
+            return None if deadline is None else max(deadline - time.time(), 0)
+        
+        try:
+            if self.rate_limited and self.admission is not None:
+                await asyncio.wait_for(self.admission.acquire(
+                    input_data.get("tenant", DEFAULT_TENANT),
+                    input_data.get("priority")
+                ), left())
+            result = None
+            iterator = stream(input_data).__aiter__()
+            while True:
+                try:
+                    kind, value = await asyncio.wait_for(
+                        iterator.__anext__(), left()
+                    )
+                except StopAsyncIteration:
+                    break
+                if kind == "final":
+                    result = value
+                else:
+                    yield event(kind, value)
+            output = self._format_output(result or {})
+        except asyncio.TimeoutError:
+            yield event("result", self._timeout())
+            return
+        except RateLimitExceeded as e:
+            yield event("result", self._rejection(e))
+            return
         except Exception as e:
-            return {
-                "error": str(e),
-                "agent": self.name,
-                "status": "failed"
-            }
+            yield event("result", self._failure(e))
+            return
+        
+        self._record_usage(result)
+        if (
+            cache_key is not None
+            and self.cache is not None
+            and output.get("status") == "success"
+        ):
+            await self.cache.set(cache_key, output)
+        yield event("result", output)
+    
+    def _record_cache(self, hit: bool) -> None:
+        if self.metrics is not None:
+            self.metrics.counter(
+                "agent_cache_requests_total",
+                "Result cache lookups by outcome",
+                ["agent", "result"]
+            ).inc(agent=self.name, result="hit" if hit else "miss")
+    
+    def _record_hedge(self, outcome: str) -> None:
+        if self.metrics is not None:
+            self.metrics.counter(
+                "agent_hedged_requests_total",
+                "Duplicate executions sent for slow requests, and their wins",
+                ["agent", "outcome"]
+            ).inc(agent=self.name, outcome=outcome)
+    
+    def _record_error(self, error: BaseException) -> None:
+        if self.metrics is not None:
+            self.metrics.counter(
+                "agent_errors_total",
+                "Exceptions raised by agent executors by type",
+                ["agent", "error_type"]
+            ).inc(agent=self.name, error_type=type(error).__name__)
+    
+    def _record_usage(self, result: Any) -> None:
+        if self.metrics is None:
+            return
+        for kind, count in _token_usage(result).items():
+            self.metrics.counter(
+                "agent_tokens_total",
+                "Language model tokens consumed by agents",
+                ["agent", "kind"]
+            ).inc(count, agent=self.name, kind=kind)
     
     @abstractmethod
-    def _format_output(self, result: Any) -> Dict[str, Any]:
+    def _format_output(self, result: Any) -> Mapping[str, Any]:
         """Format the agent output.
         
         Args:
             result: Raw result from agent execution
             
         Returns:
-            Formatted output dictionary
+            Formatted output, an ``AgentResult`` holding the executor's
+            values by reference
         """
         raise NotImplementedError
     
@@ -69,3 +683,12 @@ class BaseAgent(ABC):
             List of capability descriptions
         """
         return [getattr(tool, 'name', str(tool)) for tool in self.tools]
+    
+    @property
+    def coalescing_stats(self) -> Dict[str, Any]:
+        """Counters describing coalesced concurrent requests.
+        
+        Returns:
+            Dictionary with total calls, executions and coalesced calls
+        """
+        return self._flights.stats.to_dict()
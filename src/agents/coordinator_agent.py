@@ -2,37 +2,81 @@
 Coordinator Agent for managing multi-agent interactions.
 """
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
+from ..utils.metrics import MetricsRegistry
 from .base_agent import BaseAgent
+from .results import CoordinatorResult
+from .router import TaskRouter
+from .workflow import NodeResult, NodeSpec, WorkflowEngine, WorkflowNode
+
+#: Share of a request's remaining time kept back from the sub-agents so the
+#: coordinator can still summarize their results, capped in seconds
+DEADLINE_RESERVE = 0.05
+MAX_DEADLINE_RESERVE = 1.0
+
+
+def _child_deadline(input_data: Dict[str, Any]) -> Optional[float]:
+    """Deadline for the sub-agents of a request, ahead of its own."""
+    deadline = input_data.get("deadline")
+    if deadline is None:
+        return None
+    reserve = min(
+        max(deadline - time.time(), 0.0) * DEADLINE_RESERVE,
+        MAX_DEADLINE_RESERVE
+    )
+    return deadline - reserve
 
 
 class CoordinatorAgent(BaseAgent):
     """Agent for coordinating multiple specialized agents."""
     
+    # Workflow results depend on the current agent pool; the sub-agents
+    # cache their own results instead.
+    cacheable = False
+    # Sub-agents are admitted individually.
+    rate_limited = False
+    
     def __init__(
         self,
         llm,
         tools: List[Any],
-        agents: Optional[List[BaseAgent]] = None
+        agents: Optional[List[BaseAgent]] = None,
+        max_concurrency: int = 4,
+        **kwargs: Any
     ):
-        """Initialize the Coordinator Agent."""
-        super().__init__(llm, tools, "CoordinatorAgent")
+        """Initialize the Coordinator Agent.
+        
+        Args:
+            llm: Language model instance
+            tools: List of tools available to the agent
+            agents: Agents available for coordination
+            max_concurrency: Default cap on concurrently running agents
+                per workflow
+            **kwargs: Additional options forwarded to ``BaseAgent``
+        """
         self.agents = agents or []
+        self.max_concurrency = max_concurrency
+        super().__init__(llm, tools, "CoordinatorAgent", **kwargs)
     
     def _create_executor(self) -> Any:
         """Create the agent executor for coordination tasks."""
-        return MockCoordinatorExecutor(self.agents)
+        return WorkflowExecutor(
+            WorkflowEngine(self.agents, self.max_concurrency),
+            TaskRouter(self.agents, self.llm),
+            self.metrics
+        )
     
-    def _format_output(self, result: Any) -> Dict[str, Any]:
+    def _format_output(self, result: Any) -> CoordinatorResult:
         """Format the coordination results."""
-        return {
-            "status": "success",
-            "agent": self.name,
-            "workflow": result.get("workflow", []),
-            "results": result.get("results", {}),
-            "agents_used": result.get("agents_used", [])
-        }
+        return CoordinatorResult(
+            self.name,
+            workflow=result.get("workflow", []),
+            results=result.get("results", {}),
+            agents_used=result.get("agents_used", [])
+        )
     
     def add_agent(self, agent: BaseAgent) -> None:
         """Add an agent to the coordination pool."""
@@ -43,27 +87,229 @@ class CoordinatorAgent(BaseAgent):
         """Remove an agent from the coordination pool."""
         if agent in self.agents:
             self.agents.remove(agent)
+    
+    async def stream_workflow(
+        self,
+        workflow: List[NodeSpec],
+        context: Optional[Dict[str, Any]] = None,
+        max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[NodeResult]:
+        """Execute a workflow and yield each node result as it finishes.
+        
+        Args:
+            workflow: Node objects or dictionary specifications
+            context: Input shared by every node
+            max_concurrency: Per-workflow override of the concurrency cap
+            
+        Yields:
+            Node results in completion order
+        """
+        async for result in self.executor.engine.astream(
+            workflow, context, max_concurrency
+        ):
+            yield result
 
 
-class MockCoordinatorExecutor:
-    """Mock coordinator executor for development."""
+class WorkflowExecutor:
+    """Executor that runs coordination requests as workflow DAGs.
     
-    def __init__(self, agents: List[BaseAgent]):
-        """Initialize with available agents."""
-        self.agents = agents
+    Requests carrying an explicit ``workflow`` run it as given. A bare
+    ``task`` is routed: only the agents the router picks are invoked. While
+    the language model settles an ambiguous task, the likeliest agents start
+    speculatively and those it does not pick are cancelled.
+    """
     
-    async def arun(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Mock coordination execution."""
+    def __init__(
+        self,
+        engine: WorkflowEngine,
+        router: Optional[TaskRouter] = None,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """Initialize with the workflow engine and the task router."""
+        self.engine = engine
+        self.router = router or TaskRouter(engine.agents)
+        self.metrics = metrics
+    
+    async def _results(
+        self,
+        input_data: Dict[str, Any],
+        routing: Dict[str, Any]
+    ) -> AsyncIterator[NodeResult]:
+        """Yield node results of a request, filling in routing details."""
+        if input_data.get("workflow"):
+            async for result in self.engine.astream(
+                input_data["workflow"],
+                input_data.get("context"),
+                input_data.get("max_concurrency"),
+                input_data.get("completed"),
+                _child_deadline(input_data)
+            ):
+                yield result
+            return
+        async for result in self._routed(input_data, routing):
+            yield result
+    
+    async def _routed(
+        self,
+        input_data: Dict[str, Any],
+        routing: Dict[str, Any]
+    ) -> AsyncIterator[NodeResult]:
+        """Run the agents a bare task is routed to."""
         task = input_data.get("task", "")
-        return {
+        context = input_data.get("context")
+        agents = {agent.name: agent for agent in self.engine.agents}
+        completed = {
+            name: output
+            for name, output in (input_data.get("completed") or {}).items()
+            if name in agents and output.get("status", "success") == "success"
+        }
+        limit = input_data.get("max_concurrency") or self.engine.max_concurrency
+        deadline = _child_deadline(input_data)
+        running: Dict["asyncio.Future[NodeResult]", str] = {}
+        
+        def start(name: str) -> None:
+            node = WorkflowNode(id=name, agent=name, input={"task": task})
+            running[asyncio.ensure_future(self.engine._execute(
+                node, agents[name], context, {}, deadline
+            ))] = name
+        
+        started = time.perf_counter()
+        decision = self.router.classify(task)
+        speculative: List[str] = []
+        try:
+            if not decision.confident and self.router.llm is not None:
+                speculative = [
+                    name for name in decision.candidates
+                    if name not in completed
+                ]
+                for name in speculative[:limit]:
+                    start(name)
+            decision = await self.router.resolve(task, decision)
+            routing.update({
+                "method": decision.method,
+                "agents": decision.agents,
+                "seconds": time.perf_counter() - started,
+            })
+            if speculative:
+                # Cancel the losing branches before starting the winners.
+                losers = [
+                    future for future, name in running.items()
+                    if name not in decision.agents
+                ]
+                for future in losers:
+                    future.cancel()
+                    running.pop(future)
+                routing["speculative"] = speculative
+                routing["cancelled"] = [
+                    name for name in speculative if name not in decision.agents
+                ]
+                self._count_speculation(routing)
+            self._count_route(decision.method)
+            
+            for name in decision.agents:
+                if name in completed:
+                    now = time.perf_counter()
+                    yield NodeResult(name, name, completed[name], now, now)
+            pending = [
+                name for name in decision.agents
+                if name not in completed and name not in running.values()
+            ]
+            while pending or running:
+                while pending and len(running) < limit:
+                    start(pending.pop(0))
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    running.pop(future)
+                    yield future.result()
+        finally:
+            for future in running:
+                future.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+    
+    def _count_route(self, method: str) -> None:
+        if self.metrics is not None:
+            self.metrics.counter(
+                "coordinator_routes_total",
+                "Coordinator tasks by routing method",
+                ["method"]
+            ).inc(method=method)
+    
+    def _count_speculation(self, routing: Dict[str, Any]) -> None:
+        if self.metrics is None:
+            return
+        counter = self.metrics.counter(
+            "coordinator_speculative_runs_total",
+            "Agents started speculatively, by whether the router kept them",
+            ["outcome"]
+        )
+        cancelled = len(routing["cancelled"])
+        counter.inc(len(routing["speculative"]) - cancelled, outcome="kept")
+        counter.inc(cancelled, outcome="cancelled")
+    
+    async def arun(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute the requested workflow over the registered agents."""
+        started = time.perf_counter()
+        routing: Dict[str, Any] = {}
+        results: Dict[str, NodeResult] = {}
+        async for result in self._results(input_data, routing):
+            results[result.node_id] = result
+        return self._summarize(
+            results, time.perf_counter() - started, routing
+        )
+    
+    async def astream(
+        self,
+        input_data: Dict[str, Any]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream each node result as soon as its agent finishes."""
+        started = time.perf_counter()
+        routing: Dict[str, Any] = {}
+        results: Dict[str, NodeResult] = {}
+        async for result in self._results(input_data, routing):
+            results[result.node_id] = result
+            yield "partial", {
+                "node_id": result.node_id,
+                "agent": result.agent,
+                "status": result.status,
+                "elapsed": result.elapsed,
+                "output": result.output
+            }
+        yield "final", self._summarize(
+            results, time.perf_counter() - started, routing
+        )
+    
+    @staticmethod
+    def _summarize(
+        results: Dict[str, NodeResult],
+        elapsed: float,
+        routing: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        ordered = sorted(results.values(), key=lambda r: r.started_at)
+        summary: Dict[str, Any] = {
             "workflow": [
-                f"Step 1: Route task '{task}' to appropriate agents",
-                "Step 2: Execute agent tasks in sequence",
-                "Step 3: Aggregate results"
+                f"{r.node_id}: {r.agent} {r.status} in {r.elapsed:.3f}s"
+                for r in ordered
             ],
             "results": {
-                "task_completed": True,
-                "execution_time": "2.5s"
+                "task_completed": all(
+                    r.status == "success" for r in results.values()
+                ),
+                "execution_time": f"{elapsed:.3f}s",
+                "execution_seconds": elapsed,
+                "node_seconds": {
+                    node_id: r.elapsed for node_id, r in results.items()
+                },
+                "nodes": {
+                    node_id: r.output for node_id, r in results.items()
+                }
             },
-            "agents_used": [agent.name for agent in self.agents]
+            "agents_used": list(dict.fromkeys(
+                r.agent for r in ordered if r.status != "skipped"
+            ))
         }
+        if routing:
+            summary["results"]["routing"] = routing
+        return summary
@@ -2,63 +2,270 @@
 Data Query Agent for BCI dataset search and retrieval.
 """
 
-from typing import Any, Dict, List, Optional
+import json
+import math
+import re
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
 
+from ..services.dataset_index import DatasetIndex, get_dataset_index
+from ..services.semantic_search import SemanticSearch, get_semantic_search
+from ..utils.rate_limit import DEFAULT_TENANT, AdmissionController
 from .base_agent import BaseAgent
+from .results import DataQueryResult
+
+#: Structured filters understood by the dataset index
+SEARCH_FILTERS = (
+    "modality",
+    "min_subjects",
+    "max_subjects",
+    "min_sampling_rate",
+    "tasks",
+)
+
+#: Stable instructions, sent as the system prompt so providers can cache them
+TRANSLATION_PROMPT = """Translate a dataset search request into JSON filters.
+Allowed keys: "text" (keywords to match), "modality" (list such as ["EEG"]),
+"min_subjects", "max_subjects", "min_sampling_rate" (Hz), "tasks" (list of
+snake_case task names). Omit keys that the request does not constrain and
+answer with the JSON object only."""
+
+
+def _coerce_filters(filters: Mapping[str, Any]) -> Dict[str, Any]:
+    """Convert filter values to the types the dataset index expects.
+    
+    Numbers may arrive as strings and lists as single values, in particular
+    from the language model. Values that cannot be converted, and unknown
+    keys, are dropped instead of failing the search.
+    """
+    coerced: Dict[str, Any] = {}
+    for key, value in filters.items():
+        if value is None or isinstance(value, bool):
+            continue
+        try:
+            if key in ("min_subjects", "max_subjects"):
+                value = int(float(value))
+            elif key == "min_sampling_rate":
+                value = float(value)
+                if not math.isfinite(value):
+                    continue
+            elif key in ("modality", "tasks"):
+                values = [value] if isinstance(value, str) else list(value)
+                value = [v for v in values if isinstance(v, str) and v]
+                if not value:
+                    continue
+            elif key == "text":
+                value = str(value)
+            else:
+                continue
+        except (TypeError, ValueError, OverflowError):
+            continue
+        coerced[key] = value
+    return coerced
 
 
 class DataQueryAgent(BaseAgent):
     """Agent specialized in dataset querying and search."""
     
-    def __init__(self, llm, tools: List[Any]):
+    route_keywords = (
+        "dataset", "data set", "search", "find", "openneuro", "physionet",
+        "subjects", "participants", "modality", "recordings available",
+    )
+    # Searches are read-only, so a slow one can safely be raced by a second.
+    hedge = True
+    # Only free-text translation calls the model; the executor admits it.
+    rate_limited = False
+    
+    def __init__(self, llm, tools: List[Any], **kwargs: Any):
         """Initialize the Data Query Agent."""
-        super().__init__(llm, tools, "DataQueryAgent")
+        super().__init__(llm, tools, "DataQueryAgent", **kwargs)
     
     def _create_executor(self) -> Any:
         """Create the agent executor for data queries."""
-        # Placeholder implementation
-        # Will be replaced with actual LangChain agent executor
-        return MockExecutor()
+        return DatasetSearchExecutor(
+            get_dataset_index(),
+            self.llm,
+            get_semantic_search(),
+            admission=self.admission,
+        )
     
-    def _format_output(self, result: Any) -> Dict[str, Any]:
+    def _format_output(self, result: Any) -> DataQueryResult:
         """Format the data query results."""
-        return {
-            "status": "success",
-            "agent": self.name,
-            "datasets": result.get("datasets", []),
-            "query": result.get("query", ""),
-            "total_results": len(result.get("datasets", []))
-        }
+        return DataQueryResult(
+            self.name,
+            datasets=result.get("datasets", []),
+            query=result.get("query", ""),
+            filters=result.get("filters", {})
+        )
     
     async def search_datasets(
         self,
         query: str,
         source: Optional[str] = None,
-        limit: int = 10
-    ) -> Dict[str, Any]:
-        """Search for datasets using natural language query."""
-        input_data = {
+        limit: int = 10,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Mapping[str, Any]:
+        """Search for datasets using natural language query.
+        
+        Args:
+            query: Free-text description of the datasets wanted
+            source: Optional catalog source to restrict the search to
+            limit: Maximum number of results
+            filters: Structured filters such as ``modality``,
+                ``min_subjects`` or ``tasks``; when given, the language
+                model is not consulted
+        """
+        input_data: Dict[str, Any] = {
             "query": query,
             "source": source,
             "limit": limit,
             "task": "search_datasets"
         }
+        if filters:
+            input_data["filters"] = filters
         return await self.run(input_data)
 
 
-class MockExecutor:
-    """Mock executor for development."""
+class DatasetSearchExecutor:
+    """Executor answering dataset searches from the local index.
+    
+    Structured filters go straight to the index. Free text is translated
+    into filters by the language model when one is configured; without a
+    model, or when translation fails, it is used as keywords. When semantic
+    search is available, keywords are ranked by embedding similarity among
+    the datasets passing the structured filters instead of by BM25. Only
+    the translation passes through admission control, so structured and
+    keyword searches are never throttled by the model rate limit.
+    """
+    
+    #: Upper bound on datasets passed to semantic ranking after filtering
+    MAX_CANDIDATES = 10000
+    
+    def __init__(
+        self,
+        index: DatasetIndex,
+        llm: Any = None,
+        semantic: Optional[SemanticSearch] = None,
+        admission: Optional[AdmissionController] = None
+    ):
+        """Initialize with the dataset index and optional ranking backends."""
+        self.index = index
+        self.llm = llm
+        self.semantic = semantic
+        self.admission = admission
+    
+    async def _translate(
+        self,
+        query: str,
+        input_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Ask the language model to turn free text into index filters.
+        
+        Raises:
+            RateLimitExceeded: If admission control sheds the model call
+        """
+        if self.llm is None or not hasattr(self.llm, "ainvoke"):
+            return {"text": query}
+        if self.admission is not None:
+            await self.admission.acquire(
+                input_data.get("tenant", DEFAULT_TENANT),
+                input_data.get("priority")
+            )
+        try:
+            response = await self.llm.ainvoke([
+                ("system", TRANSLATION_PROMPT),
+                ("human", f"Request: {query}"),
+            ])
+            content = getattr(response, "content", response)
+            found = re.search(r"\{.*\}", str(content), re.DOTALL)
+            parsed = json.loads(found.group(0)) if found else {}
+        except Exception:
+            return {"text": query}
+        if not isinstance(parsed, dict):
+            return {"text": query}
+        return _coerce_filters(parsed) or {"text": query}
+    
+    @staticmethod
+    def _split(filters: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+        text = filters.get("text")
+        return text, {k: v for k, v in filters.items() if k in SEARCH_FILTERS}
+    
+    async def _semantic_search(
+        self,
+        semantic: SemanticSearch,
+        text: str,
+        source: Optional[str],
+        limit: int,
+        structured: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Rank datasets passing the filters by similarity to ``text``."""
+        candidates = None
+        if source or structured:
+            candidates = [
+                dataset["id"] for dataset in self.index.search(
+                    source=source, limit=self.MAX_CANDIDATES, **structured
+                )
+            ]
+        ranked = await semantic.asearch(text, limit, candidates)
+        scores = dict(ranked)
+        datasets = self.index.get_many([dataset_id for dataset_id, _ in ranked])
+        for dataset in datasets:
+            dataset["relevance_score"] = round(scores[dataset["id"]], 4)
+        return datasets
+    
+    async def _resolve_filters(
+        self,
+        input_data: Dict[str, Any]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Return the query and the coerced filters to search with."""
+        query = input_data.get("query", "") or ""
+        given = input_data.get("filters") or {}
+        filters = _coerce_filters(given)
+        if not given and query:
+            filters = await self._translate(query, input_data)
+        elif query:
+            filters.setdefault("text", query)
+        return query, filters
+    
+    async def _find(
+        self,
+        input_data: Dict[str, Any],
+        filters: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Search the index, ranking semantically when possible."""
+        text, structured = self._split(filters)
+        source = input_data.get("source")
+        limit = input_data.get("limit", 10)
+        semantic = self.semantic
+        if text and semantic is not None and len(semantic.index):
+            return await self._semantic_search(
+                semantic, text, source, limit, structured
+            )
+        return self.index.search(
+            text=text, source=source, limit=limit, **structured
+        )
     
     async def arun(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Mock execution."""
+        """Search the dataset index."""
+        query, filters = await self._resolve_filters(input_data)
+        datasets = await self._find(input_data, filters)
         return {
-            "query": input_data.get("query", ""),
-            "datasets": [
-                {
-                    "id": "mock_dataset_001",
-                    "name": "Mock EEG Dataset",
-                    "description": "Mock dataset for development",
-                    "source": "mock"
-                }
-            ]
+            "query": query,
+            "filters": filters,
+            "datasets": datasets
+        }
+    
+    async def astream(
+        self,
+        input_data: Dict[str, Any]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream the resolved filters, then each dataset hit."""
+        query, filters = await self._resolve_filters(input_data)
+        yield "partial", {"filters": filters}
+        datasets = await self._find(input_data, filters)
+        for rank, dataset in enumerate(datasets, 1):
+            yield "partial", {"rank": rank, "dataset": dataset}
+        yield "final", {
+            "query": query,
+            "filters": filters,
+            "datasets": datasets
         }
@@ -2,31 +2,38 @@
 Planning Agent for experiment design and protocol generation.
 """
 
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Tuple
 
 from .base_agent import BaseAgent
+from .results import PlanningResult
 
 
 class PlanningAgent(BaseAgent):
     """Agent specialized in experiment planning and design."""
     
-    def __init__(self, llm, tools: List[Any]):
+    route_keywords = (
+        "plan", "design", "protocol", "experiment", "hypothes",
+        "sample size", "paradigm", "timeline", "budget",
+    )
+    # The planning executor does not call the language model yet.
+    rate_limited = False
+    
+    def __init__(self, llm, tools: List[Any], **kwargs: Any):
         """Initialize the Planning Agent."""
-        super().__init__(llm, tools, "PlanningAgent")
+        super().__init__(llm, tools, "PlanningAgent", **kwargs)
     
     def _create_executor(self) -> Any:
         """Create the agent executor for planning tasks."""
         return MockPlanningExecutor()
     
-    def _format_output(self, result: Any) -> Dict[str, Any]:
+    def _format_output(self, result: Any) -> PlanningResult:
         """Format the planning results."""
-        return {
-            "status": "success",
-            "agent": self.name,
-            "experiment_plan": result.get("experiment_plan", {}),
-            "timeline": result.get("timeline", {}),
-            "budget_estimate": result.get("budget_estimate", {})
-        }
+        return PlanningResult(
+            self.name,
+            experiment_plan=result.get("experiment_plan", {}),
+            timeline=result.get("timeline", {}),
+            budget_estimate=result.get("budget_estimate", {})
+        )
 
 
 class MockPlanningExecutor:
@@ -52,3 +59,13 @@ class MockPlanningExecutor:
                 "equipment": "$4,000"
             }
         }
+    
+    async def astream(
+        self,
+        input_data: Dict[str, Any]
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """Stream the finished plan one section at a time."""
+        result = await self.arun(input_data)
+        for section, content in result.items():
+            yield "partial", {"section": section, "content": content}
+        yield "final", result
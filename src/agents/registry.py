@@ -0,0 +1,47 @@
+"""
+Process-wide agent instances addressed by name.
+
+The API and the background job workers resolve agents through
+``get_agents`` so both serve requests with the same configuration. All
+agents share the process-wide language model gateway.
+"""
+
+from typing import Dict, Optional
+
+from ..services.llm_gateway import get_llm_gateway
+from .base_agent import BaseAgent
+
+_agents: Optional[Dict[str, BaseAgent]] = None
+
+
+def get_agents() -> Dict[str, BaseAgent]:
+    """Get the process-wide agents keyed by name.
+
+    Returns:
+        ``data-query``, ``analysis``, ``planning`` and a ``coordinator``
+        over the other three
+    """
+    global _agents
+    if _agents is None:
+        from .analysis_agent import AnalysisAgent
+        from .coordinator_agent import CoordinatorAgent
+        from .data_query_agent import DataQueryAgent
+        from .planning_agent import PlanningAgent
+        from .tools import BandPowerTool
+
+        llm = get_llm_gateway()
+        specialists = [
+            DataQueryAgent(llm=llm, tools=[]),
+            AnalysisAgent(llm=llm, tools=[BandPowerTool()]),
+            PlanningAgent(llm=llm, tools=[]),
+        ]
+        coordinator = CoordinatorAgent(
+            llm=llm, tools=[], agents=list(specialists)
+        )
+        _agents = {
+            "data-query": specialists[0],
+            "analysis": specialists[1],
+            "planning": specialists[2],
+            "coordinator": coordinator,
+        }
+    return _agents
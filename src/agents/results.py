@@ -0,0 +1,186 @@
+"""
+Typed agent results.
+
+Agents return their formatted output as result objects instead of freshly
+built dictionaries. Results use ``__slots__``, so they have no per-instance
+``__dict__``, and hold their payload by reference: arrays computed by an
+executor and the sub-agent outputs collected by the coordinator are shared,
+not copied or converted to lists. Results are read-only mappings, so code
+that reads outputs as dictionaries keeps working, and they are encoded only
+when they leave the process (see ``utils.serialization``).
+"""
+
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from ..utils.serialization import (
+    approx_nbytes,
+    dumps,
+    packb,
+    register_result_type,
+)
+
+
+class AgentResult(Mapping[str, Any]):
+    """Successful output of an agent.
+
+    Subclasses declare their payload in ``__slots__``; the slots become the
+    mapping keys, after ``status`` and ``agent``.
+    """
+
+    __slots__ = ("status", "agent")
+
+    #: Mapping keys in output order
+    fields: ClassVar[Tuple[str, ...]] = ("status", "agent")
+    _keys: ClassVar[FrozenSet[str]] = frozenset(fields)
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls.fields = cls.fields + tuple(cls.__dict__.get("__slots__", ()))
+        cls._keys = frozenset(cls.fields)
+        register_result_type(cls)
+
+    def __init__(self, agent: str, status: str = "success"):
+        """Initialize the result.
+
+        Args:
+            agent: Name of the agent that produced the result
+            status: Outcome of the run
+        """
+        self.status = status
+        self.agent = agent
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._keys:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.fields)
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{key}={self[key]!r}" for key in self.fields)
+        return f"{type(self).__name__}({values})"
+
+    @classmethod
+    def from_mapping(cls, values: Mapping[str, Any]) -> "AgentResult":
+        """Rebuild a result from its fields, e.g. after decoding."""
+        result = cls.__new__(cls)
+        for key in cls.fields:
+            setattr(result, key, values[key])
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dictionary of the result; values are shared, not copied."""
+        return {key: getattr(self, key) for key in self.fields}
+
+    def to_json(self) -> bytes:
+        """Encode the result as JSON, arrays as nested lists."""
+        return dumps(self)
+
+    def to_msgpack(self) -> bytes:
+        """Encode the result as MessagePack, arrays as binary buffers."""
+        return packb(self)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the result and everything it shares."""
+        return approx_nbytes(self)
+
+
+class AnalysisResult(AgentResult):
+    """Output of the analysis agent; ``results`` may hold NumPy arrays."""
+
+    __slots__ = ("analysis_type", "results", "recommendations")
+
+    def __init__(
+        self,
+        agent: str,
+        analysis_type: str = "",
+        results: Optional[Mapping[str, Any]] = None,
+        recommendations: Optional[List[str]] = None,
+        status: str = "success"
+    ):
+        super().__init__(agent, status)
+        self.analysis_type = analysis_type
+        self.results = results if results is not None else {}
+        self.recommendations = (
+            recommendations if recommendations is not None else []
+        )
+
+
+class DataQueryResult(AgentResult):
+    """Output of the data query agent."""
+
+    __slots__ = ("datasets", "query", "filters", "total_results")
+
+    def __init__(
+        self,
+        agent: str,
+        datasets: Optional[List[Any]] = None,
+        query: str = "",
+        filters: Optional[Mapping[str, Any]] = None,
+        status: str = "success"
+    ):
+        super().__init__(agent, status)
+        self.datasets = datasets if datasets is not None else []
+        self.query = query
+        self.filters = filters if filters is not None else {}
+        self.total_results = len(self.datasets)
+
+
+class PlanningResult(AgentResult):
+    """Output of the planning agent."""
+
+    __slots__ = ("experiment_plan", "timeline", "budget_estimate")
+
+    def __init__(
+        self,
+        agent: str,
+        experiment_plan: Optional[Mapping[str, Any]] = None,
+        timeline: Optional[Mapping[str, Any]] = None,
+        budget_estimate: Optional[Mapping[str, Any]] = None,
+        status: str = "success"
+    ):
+        super().__init__(agent, status)
+        self.experiment_plan = (
+            experiment_plan if experiment_plan is not None else {}
+        )
+        self.timeline = timeline if timeline is not None else {}
+        self.budget_estimate = (
+            budget_estimate if budget_estimate is not None else {}
+        )
+
+
+class CoordinatorResult(AgentResult):
+    """Output of the coordinator; node outputs are the sub-agents' results."""
+
+    __slots__ = ("workflow", "results", "agents_used")
+
+    def __init__(
+        self,
+        agent: str,
+        workflow: Optional[List[str]] = None,
+        results: Optional[Mapping[str, Any]] = None,
+        agents_used: Optional[List[str]] = None,
+        status: str = "success"
+    ):
+        super().__init__(agent, status)
+        self.workflow = workflow if workflow is not None else []
+        self.results = results if results is not None else {}
+        self.agents_used = agents_used if agents_used is not None else []
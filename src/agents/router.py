@@ -0,0 +1,171 @@
+"""
+Task routing for the coordinator.
+
+Tasks are classified by cheap keyword rules first: every agent declares
+``route_keywords``, and a task goes to the agents whose keywords it
+mentions. Only when no rule matches is the language model asked to choose,
+and while it deliberates the coordinator may already run the likeliest
+agents speculatively, cancelling the ones the model does not pick.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from loguru import logger
+
+from .base_agent import BaseAgent
+
+#: Stable routing instructions, sent as the system prompt so providers can
+#: cache them; ``{agents}`` lists the agent names and descriptions
+ROUTING_PROMPT = """You route research tasks to specialist agents.
+Reply with a JSON list of the names of the agents the task needs, most
+important first, and nothing else.
+
+Agents:
+{agents}"""
+
+
+@dataclass
+class RoutingDecision:
+    """Agents chosen for a task.
+
+    Attributes:
+        agents: Names of the agents to invoke, most relevant first
+        method: ``rules``, ``llm``, ``fallback`` (every agent), or
+            ``pending`` while the model has not been asked yet
+        scores: Keyword matches per agent
+        candidates: Agents worth starting speculatively while the decision
+            is pending, most likely first
+    """
+
+    agents: List[str]
+    method: str
+    scores: Dict[str, int] = field(default_factory=dict)
+    candidates: List[str] = field(default_factory=list)
+
+    @property
+    def confident(self) -> bool:
+        """Whether the decision is final without asking the model."""
+        return self.method != "pending"
+
+
+def _compile(keywords: Iterable[str]) -> Optional["re.Pattern[str]"]:
+    keywords = [k for k in keywords if k]
+    if not keywords:
+        return None
+    # Keywords match word prefixes, so "analy" covers "analysis" and
+    # "analyze".
+    alternatives = "|".join(re.escape(k.lower()) for k in keywords)
+    return re.compile(rf"\b(?:{alternatives})")
+
+
+def _describe(agent: BaseAgent) -> str:
+    """One routing prompt line naming an agent and its purpose."""
+    doc = (agent.__class__.__doc__ or "").strip()
+    summary = doc.splitlines()[0] if doc else ""
+    return f"- {agent.name}: {summary}" if summary else f"- {agent.name}"
+
+
+class TaskRouter:
+    """Choose the agents a coordinator task needs."""
+
+    def __init__(
+        self,
+        agents: Iterable[BaseAgent],
+        llm: Any = None,
+        rules: Optional[Mapping[str, Iterable[str]]] = None,
+        max_candidates: int = 2
+    ):
+        """Initialize the router.
+
+        Args:
+            agents: Agents to route among; read on every call, so agents
+                added later are routed to as well
+            llm: Language model consulted when no rule matches
+            rules: Keywords per agent name, replacing the agents'
+                ``route_keywords``
+            max_candidates: Agents started speculatively for ambiguous
+                tasks
+        """
+        self.agents = agents
+        self.llm = llm
+        self.rules = dict(rules) if rules is not None else None
+        self.max_candidates = max_candidates
+        self._patterns: Dict[Any, Optional["re.Pattern[str]"]] = {}
+
+    def _pattern(self, agent: BaseAgent) -> Optional["re.Pattern[str]"]:
+        keywords = tuple(
+            self.rules.get(agent.name, ()) if self.rules is not None
+            else agent.route_keywords
+        )
+        key = (agent.name, keywords)
+        if key not in self._patterns:
+            self._patterns[key] = _compile(keywords)
+        return self._patterns[key]
+
+    def classify(self, task: str) -> RoutingDecision:
+        """Route a task by keyword rules alone.
+
+        Returns:
+            A ``rules`` decision when a keyword matched, otherwise a
+            ``pending`` decision to be settled by ``resolve``
+        """
+        text = task.lower()
+        scores = {}
+        for agent in self.agents:
+            pattern = self._pattern(agent)
+            scores[agent.name] = len(pattern.findall(text)) if pattern else 0
+        matched = sorted(
+            (name for name, score in scores.items() if score),
+            key=lambda name: -scores[name]
+        )
+        if matched:
+            return RoutingDecision(matched, "rules", scores)
+        names = [agent.name for agent in self.agents]
+        return RoutingDecision(
+            names, "pending", scores, names[:self.max_candidates]
+        )
+
+    async def resolve(
+        self,
+        task: str,
+        decision: RoutingDecision
+    ) -> RoutingDecision:
+        """Settle a pending decision with the language model.
+
+        Falls back to every agent when no model is configured or its answer
+        names no known agent.
+        """
+        if decision.confident:
+            return decision
+        names = [agent.name for agent in self.agents]
+        chosen: List[str] = []
+        if self.llm is not None and task:
+            chosen = await self._ask(task)
+        if chosen:
+            return RoutingDecision(chosen, "llm", decision.scores)
+        return RoutingDecision(names, "fallback", decision.scores)
+
+    async def route(self, task: str) -> RoutingDecision:
+        """Classify a task, consulting the model only on ambiguity."""
+        return await self.resolve(task, self.classify(task))
+
+    async def _ask(self, task: str) -> List[str]:
+        known = {agent.name: agent for agent in self.agents}
+        described = "\n".join(_describe(agent) for agent in known.values())
+        try:
+            response = await self.llm.ainvoke([
+                ("system", ROUTING_PROMPT.format(agents=described)),
+                ("human", f"Task: {task}"),
+            ])
+            content = str(getattr(response, "content", response))
+            found = re.search(r"\[.*\]", content, re.DOTALL)
+            names = json.loads(found.group(0)) if found else []
+        except Exception as e:
+            logger.warning(f"Routing by language model failed: {e}")
+            return []
+        return list(dict.fromkeys(
+            name for name in names if isinstance(name, str) and name in known
+        ))
@@ -0,0 +1,86 @@
+"""
+Tools exposing signal processing routines to agents.
+"""
+
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from ..processing.features import CANONICAL_BANDS, band_powers
+from ..processing.streaming import window_view
+
+
+class BandPowerTool:
+    """Compute spectral band powers for a batch of epochs."""
+    
+    name = "band_power"
+    description = (
+        "Compute Welch band powers (delta to gamma) for every epoch and "
+        "channel of a recording in a single vectorized pass"
+    )
+    
+    def run(
+        self,
+        data: np.ndarray,
+        sampling_rate: float,
+        bands: Optional[Mapping[str, Tuple[float, float]]] = None,
+        epoch_seconds: Optional[float] = None,
+        relative: bool = False,
+        **_: Any
+    ) -> Dict[str, Any]:
+        """Compute band powers.
+        
+        Args:
+            data: ``(n_channels, n_times)`` recording or
+                ``(n_epochs, n_channels, n_times)`` epochs
+            sampling_rate: Sampling rate in Hz
+            bands: Band name to ``(low, high)`` Hz mapping
+            epoch_seconds: Split a continuous recording into epochs of this
+                length before computing powers
+            relative: Normalize by the total power of each signal
+            
+        Returns:
+            Band names, per-channel powers averaged over epochs as an
+            ``(n_channels, n_bands)`` array, per-band means across channels
+            and the peak alpha frequency
+            
+        Raises:
+            ValueError: If the data has the wrong shape or ``epoch_seconds``
+                does not fit within the recording
+        """
+        epochs = np.asarray(data)
+        if epochs.ndim == 2:
+            n_times = epochs.shape[-1]
+            size = n_times
+            if epoch_seconds:
+                size = int(epoch_seconds * sampling_rate)
+                if not 1 <= size <= n_times:
+                    raise ValueError(
+                        f"epoch_seconds={epoch_seconds:g} gives epochs of "
+                        f"{size} samples, but the recording has {n_times}"
+                    )
+            epochs = window_view(epochs, size)
+        if epochs.ndim != 3:
+            raise ValueError(
+                "Band power requires (n_channels, n_times) or "
+                "(n_epochs, n_channels, n_times) data"
+            )
+        
+        powers, names, peaks = band_powers(
+            epochs,
+            sampling_rate,
+            bands,
+            relative,
+            peak_band=CANONICAL_BANDS["alpha"],
+        )
+        channel_powers = powers.mean(axis=0)
+        return {
+            "bands": list(names),
+            "n_epochs": int(epochs.shape[0]),
+            "channel_band_power": channel_powers,
+            "mean_band_power": dict(
+                zip(names, channel_powers.mean(axis=0).tolist())
+            ),
+            "peak_alpha_frequency": float(np.median(peaks)),
+            "relative": relative
+        }
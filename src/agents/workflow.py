@@ -0,0 +1,348 @@
+"""
+Dependency-aware workflow engine for multi-agent execution.
+
+A workflow is a DAG of nodes, each bound to one registered agent. Nodes whose
+dependencies have completed run concurrently (up to a per-workflow cap), so
+end-to-end latency tracks the critical path instead of the sum of all calls.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Union,
+)
+
+from .base_agent import BaseAgent
+
+
+class WorkflowError(ValueError):
+    """Raised when a workflow graph is malformed."""
+
+
+@dataclass
+class WorkflowNode:
+    """A single step of a workflow bound to one agent.
+
+    Attributes:
+        id: Unique node identifier within the workflow
+        agent: Name of the agent that executes this node
+        input: Input data passed to the agent
+        depends_on: Identifiers of nodes that must finish first
+    """
+
+    id: str
+    agent: str
+    input: Dict[str, Any] = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, spec: Mapping[str, Any]) -> "WorkflowNode":
+        """Build a node from a plain dictionary specification."""
+        try:
+            return cls(
+                id=str(spec["id"]),
+                agent=str(spec["agent"]),
+                input=dict(spec.get("input") or {}),
+                depends_on=[str(dep) for dep in spec.get("depends_on") or []],
+            )
+        except KeyError as e:
+            raise WorkflowError(f"Workflow node is missing field {e}") from e
+
+
+@dataclass
+class NodeResult:
+    """Outcome of executing a single workflow node."""
+
+    node_id: str
+    agent: str
+    output: Mapping[str, Any]
+    started_at: float
+    finished_at: float
+
+    @property
+    def status(self) -> str:
+        """Status reported by the agent output."""
+        return self.output.get("status", "success")
+
+    @property
+    def elapsed(self) -> float:
+        """Wall-clock execution time in seconds."""
+        return self.finished_at - self.started_at
+
+
+NodeSpec = Union[WorkflowNode, Mapping[str, Any]]
+
+
+class WorkflowEngine:
+    """Execute workflow DAGs over a pool of agents."""
+
+    def __init__(
+        self,
+        agents: Iterable[BaseAgent],
+        max_concurrency: int = 4
+    ):
+        """Initialize the engine.
+
+        Args:
+            agents: Agents available to workflow nodes, resolved by name
+            max_concurrency: Maximum number of nodes running at once
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.agents = agents
+        self.max_concurrency = max_concurrency
+
+    def _agent_map(self) -> Dict[str, BaseAgent]:
+        return {agent.name: agent for agent in self.agents}
+
+    def validate(self, nodes: Iterable[NodeSpec]) -> List[WorkflowNode]:
+        """Validate a workflow and return its nodes in topological order.
+
+        Args:
+            nodes: Node objects or dictionary specifications
+
+        Returns:
+            Nodes ordered so that every node follows its dependencies
+
+        Raises:
+            WorkflowError: On duplicate ids, unknown agents or dependencies,
+                or dependency cycles
+        """
+        parsed = [
+            node if isinstance(node, WorkflowNode)
+            else WorkflowNode.from_dict(node)
+            for node in nodes
+        ]
+        by_id: Dict[str, WorkflowNode] = {}
+        for node in parsed:
+            if node.id in by_id:
+                raise WorkflowError(f"Duplicate workflow node id '{node.id}'")
+            by_id[node.id] = node
+
+        agents = self._agent_map()
+        for node in parsed:
+            if node.agent not in agents:
+                raise WorkflowError(
+                    f"Node '{node.id}' references unknown agent '{node.agent}'"
+                )
+            for dep in node.depends_on:
+                if dep not in by_id:
+                    raise WorkflowError(
+                        f"Node '{node.id}' depends on unknown node '{dep}'"
+                    )
+
+        indegree = {node.id: len(set(node.depends_on)) for node in parsed}
+        dependents = self._dependents(parsed)
+        ready = [node.id for node in parsed if indegree[node.id] == 0]
+        ordered: List[WorkflowNode] = []
+        while ready:
+            node_id = ready.pop(0)
+            ordered.append(by_id[node_id])
+            for child in dependents[node_id]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+
+        if len(ordered) != len(parsed):
+            cyclic = sorted(n for n, degree in indegree.items() if degree > 0)
+            raise WorkflowError(
+                f"Workflow contains a dependency cycle among {cyclic}"
+            )
+        return ordered
+
+    @staticmethod
+    def _dependents(nodes: List[WorkflowNode]) -> Dict[str, List[str]]:
+        dependents: Dict[str, List[str]] = {node.id: [] for node in nodes}
+        for node in nodes:
+            for dep in set(node.depends_on):
+                dependents[dep].append(node.id)
+        return dependents
+
+    async def astream(
+        self,
+        nodes: Iterable[NodeSpec],
+        context: Optional[Dict[str, Any]] = None,
+        max_concurrency: Optional[int] = None,
+        completed: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[NodeResult]:
+        """Execute a workflow, yielding node results as they complete.
+
+        Nodes whose dependency failed are not executed; they are yielded
+        with a ``skipped`` status so callers still see every node.
+
+        Under a deadline, every node starts with an equal share of the time
+        left for the longest chain of nodes still ahead of it, passed to its
+        agent as ``deadline``. Nodes not started by the deadline are yielded
+        with a ``timeout`` status.
+
+        Args:
+            nodes: Node objects or dictionary specifications
+            context: Input shared by every node, overridden by node input
+            max_concurrency: Per-workflow override of the engine cap
+            completed: Successful outputs of nodes finished by an earlier,
+                interrupted run, keyed by node id; these nodes are not
+                executed again and are yielded first
+            deadline: Epoch seconds by which the workflow must finish
+
+        Yields:
+            Node results in completion order
+        """
+        ordered = self.validate(nodes)
+        limit = max_concurrency or self.max_concurrency
+        agents = self._agent_map()
+        by_id = {node.id: node for node in ordered}
+        dependents = self._dependents(ordered)
+        remaining = {node.id: len(set(node.depends_on)) for node in ordered}
+        # Nodes on the longest chain from each node to the end of the graph
+        height: Dict[str, int] = {}
+        for node in reversed(ordered):
+            height[node.id] = 1 + max(
+                (height[child] for child in dependents[node.id]), default=0
+            )
+        outputs: Dict[str, Mapping[str, Any]] = {
+            node_id: output for node_id, output in (completed or {}).items()
+            if node_id in by_id and output.get("status", "success") == "success"
+        }
+        ready = [
+            node.id for node in ordered
+            if remaining[node.id] == 0 and node.id not in outputs
+        ]
+        running: Dict["asyncio.Future[NodeResult]", str] = {}
+
+        def release(node_id: str) -> List[NodeResult]:
+            """Mark a node finished and collect transitively skipped nodes."""
+            skipped: List[NodeResult] = []
+            stack = [node_id]
+            while stack:
+                current = stack.pop()
+                for child in dependents[current]:
+                    remaining[child] -= 1
+                    if remaining[child] > 0 or child in outputs:
+                        continue
+                    failed = [
+                        dep for dep in by_id[child].depends_on
+                        if outputs[dep].get("status", "success") != "success"
+                    ]
+                    if not failed:
+                        ready.append(child)
+                        continue
+                    now = time.perf_counter()
+                    outputs[child] = {
+                        "status": "skipped",
+                        "agent": by_id[child].agent,
+                        "error": f"Upstream node(s) {failed} did not succeed",
+                    }
+                    skipped.append(NodeResult(
+                        child, by_id[child].agent, outputs[child], now, now
+                    ))
+                    stack.append(child)
+            return skipped
+
+        restored = [node for node in ordered if node.id in outputs]
+        for node in restored:
+            now = time.perf_counter()
+            yield NodeResult(node.id, node.agent, outputs[node.id], now, now)
+        for node in restored:
+            for skipped in release(node.id):
+                yield skipped
+
+        try:
+            while ready or running:
+                while ready and len(running) < limit:
+                    node = by_id[ready.pop(0)]
+                    node_deadline = None
+                    if deadline is not None:
+                        now = time.time()
+                        if now >= deadline:
+                            result = self._expired(node)
+                            outputs[node.id] = result.output
+                            yield result
+                            for skipped in release(node.id):
+                                yield skipped
+                            continue
+                        node_deadline = now + (deadline - now) / height[node.id]
+                    task = asyncio.ensure_future(self._execute(
+                        node, agents[node.agent], context, outputs,
+                        node_deadline
+                    ))
+                    running[task] = node.id
+                if not running:
+                    continue
+
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    running.pop(future)
+                    result = future.result()
+                    outputs[result.node_id] = result.output
+                    yield result
+                    for skipped in release(result.node_id):
+                        yield skipped
+        finally:
+            for future in running:
+                future.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    async def run(
+        self,
+        nodes: Iterable[NodeSpec],
+        context: Optional[Dict[str, Any]] = None,
+        max_concurrency: Optional[int] = None,
+        completed: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        deadline: Optional[float] = None
+    ) -> Dict[str, NodeResult]:
+        """Execute a workflow to completion.
+
+        Returns:
+            Node results keyed by node id, in completion order
+        """
+        results: Dict[str, NodeResult] = {}
+        async for result in self.astream(
+            nodes, context, max_concurrency, completed, deadline
+        ):
+            results[result.node_id] = result
+        return results
+
+    @staticmethod
+    def _expired(node: WorkflowNode) -> NodeResult:
+        now = time.perf_counter()
+        return NodeResult(node.id, node.agent, {
+            "status": "timeout",
+            "agent": node.agent,
+            "error": "Deadline exceeded before the node started",
+        }, now, now)
+
+    @staticmethod
+    async def _execute(
+        node: WorkflowNode,
+        agent: BaseAgent,
+        context: Optional[Dict[str, Any]],
+        outputs: Dict[str, Mapping[str, Any]],
+        deadline: Optional[float] = None
+    ) -> NodeResult:
+        input_data = dict(context or {})
+        input_data.update(node.input)
+        if deadline is not None:
+            input_data["deadline"] = min(
+                deadline, input_data.get("deadline") or deadline
+            )
+        if node.depends_on:
+            input_data["upstream"] = {
+                dep: outputs[dep] for dep in node.depends_on
+            }
+        started = time.perf_counter()
+        output = await agent.run(input_data)
+        return NodeResult(
+            node.id, node.agent, output, started, time.perf_counter()
+        )
@@ -0,0 +1,3 @@
+"""
+HTTP API for the BCI Research Assistant.
+"""
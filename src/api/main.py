@@ -0,0 +1,65 @@
+"""
+FastAPI application for the BCI Research Assistant.
+"""
+
+import time
+
+from fastapi import FastAPI, Request, Response
+
+from ..config import get_settings
+from ..utils.metrics import get_metrics
+from .routes import agents, jobs, monitoring
+
+API_PREFIX = "/api/v1"
+
+
+def create_app() -> FastAPI:
+    """Create the FastAPI application."""
+    settings = get_settings()
+    app = FastAPI(
+        title=settings.app_name,
+        version=settings.app_version,
+        debug=settings.debug,
+    )
+
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next) -> Response:
+        registry = get_metrics()
+        if registry is None:
+            return await call_next(request)
+        started = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            # Label by route template, not raw path, to bound cardinality.
+            route = request.scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            registry.histogram(
+                "http_request_duration_seconds",
+                "HTTP request latency",
+                ["method", "path"]
+            ).observe(
+                time.perf_counter() - started,
+                method=request.method,
+                path=path,
+            )
+            registry.counter(
+                "http_requests_total",
+                "HTTP requests by status code",
+                ["method", "path", "status"]
+            ).inc(method=request.method, path=path, status=status)
+
+    app.include_router(monitoring.router, prefix=API_PREFIX)
+    app.include_router(agents.router, prefix=API_PREFIX)
+    app.include_router(jobs.router, prefix=API_PREFIX)
+    # Scrapers expect the exposition endpoint at the root.
+    app.add_api_route(
+        "/metrics", monitoring.metrics, include_in_schema=False
+    )
+    return app
+
+
+app = create_app()
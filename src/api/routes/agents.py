@@ -0,0 +1,131 @@
+"""
+Agent execution endpoints with streaming output.
+
+``POST /agents/{name}/run`` returns the final result in one response.
+``POST /agents/{name}/stream`` sends the agent's events as Server-Sent
+Events as soon as they are produced, and ``/agents/{name}/ws`` does the
+same over a WebSocket that accepts one request per message.
+
+Agent results are encoded only here: as JSON, or as MessagePack with binary
+arrays when the client sends ``Accept: application/msgpack``.
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict, Mapping, Optional
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import Response, StreamingResponse
+
+from ...agents.base_agent import BaseAgent
+from ...agents.registry import get_agents
+from ...utils.serialization import dumps, encode, negotiate
+
+router = APIRouter(prefix="/agents", tags=["agents"])
+
+
+def _get_agent(name: str) -> BaseAgent:
+    agent = get_agents().get(name)
+    if agent is None:
+        raise HTTPException(status_code=404, detail=f"Unknown agent: {name}")
+    return agent
+
+
+def _encode(data: Any) -> str:
+    return dumps(data).decode("utf-8")
+
+
+def _respond(
+    request: Request,
+    output: Mapping[str, Any],
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    media_type = negotiate(request.headers.get("accept"))
+    return Response(
+        encode(output, media_type),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type,
+    )
+
+
+async def _sse(agent: BaseAgent, payload: Dict[str, Any]) -> AsyncIterator[str]:
+    async for event in agent.astream(payload):
+        yield f"event: {event['event']}\ndata: {_encode(event)}\n\n"
+
+
+@router.get("")
+async def list_agents() -> Dict[str, Any]:
+    """List the agents that can be run."""
+    return {
+        "agents": [
+            {"name": name, "agent": agent.name}
+            for name, agent in get_agents().items()
+        ]
+    }
+
+
+@router.post("/{name}/run")
+async def run_agent(
+    name: str,
+    payload: Dict[str, Any],
+    request: Request
+) -> Response:
+    """Run an agent and return its final result."""
+    output = await _get_agent(name).run(payload)
+    if output.get("status") == "rejected":
+        retry_after = max(1, round(output.get("retry_after") or 1))
+        return _respond(
+            request, output, 429, {"Retry-After": str(retry_after)}
+        )
+    if output.get("status") == "timeout":
+        return _respond(request, output, 504)
+    return _respond(request, output)
+
+
+@router.post("/{name}/stream")
+async def stream_agent(name: str, payload: Dict[str, Any]) -> StreamingResponse:
+    """Run an agent and stream its events as Server-Sent Events."""
+    agent = _get_agent(name)
+    return StreamingResponse(
+        _sse(agent, payload),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Keep reverse proxies from holding events back.
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.websocket("/{name}/ws")
+async def agent_websocket(websocket: WebSocket, name: str) -> None:
+    """Run one agent request per received message, sending its events."""
+    agent = get_agents().get(name)
+    if agent is None:
+        await websocket.close(code=4404, reason=f"Unknown agent: {name}")
+        return
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                payload = json.loads(await websocket.receive_text())
+            except ValueError:
+                payload = None
+            if not isinstance(payload, dict):
+                await websocket.send_text(_encode({
+                    "event": "error",
+                    "agent": agent.name,
+                    "data": "Messages must be JSON objects",
+                }))
+                continue
+            async for event in agent.astream(payload):
+                await websocket.send_text(_encode(event))
+    except WebSocketDisconnect:
+        pass
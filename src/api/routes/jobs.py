@@ -0,0 +1,140 @@
+"""
+Background job endpoints.
+
+Long analyses are submitted as jobs, executed by worker processes
+(``python scripts/run_app.py worker``) and polled or streamed for status.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from ...agents.registry import get_agents
+from ...services.jobs import FINISHED, Job, get_job_queue
+from ...utils.rate_limit import Priority
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+#: Seconds between status checks of a streamed job
+POLL_INTERVAL = 1.0
+
+
+class JobRequest(BaseModel):
+    """Submission of a background job."""
+
+    agent: str = Field(description="Name of the agent that runs the job")
+    input: Optional[Dict[str, Any]] = Field(
+        None, description="Input of a single agent request"
+    )
+    inputs: Optional[List[Dict[str, Any]]] = Field(
+        None, description="Inputs of a batch request"
+    )
+    priority: str = Field("batch", description="interactive or batch")
+    max_attempts: int = Field(3, ge=1, description="Executions allowed")
+
+
+async def _get_job(job_id: str) -> Job:
+    job = await asyncio.to_thread(get_job_queue().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@router.post("", status_code=202)
+async def submit_job(request: JobRequest) -> Dict[str, Any]:
+    """Queue a job for the worker processes."""
+    if request.agent not in get_agents():
+        raise HTTPException(
+            status_code=404, detail=f"Unknown agent: {request.agent}"
+        )
+    if (request.input is None) == (request.inputs is None):
+        raise HTTPException(
+            status_code=400, detail="Provide exactly one of input and inputs"
+        )
+    try:
+        priority = Priority.parse(request.priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    job = await asyncio.to_thread(
+        get_job_queue().submit,
+        request.agent,
+        request.input,
+        request.inputs,
+        int(priority),
+        request.max_attempts,
+    )
+    return job.to_dict()
+
+
+@router.get("")
+async def list_jobs(
+    status: Optional[str] = None,
+    limit: int = 50
+) -> Dict[str, Any]:
+    """List recent jobs and the number of jobs per status."""
+    queue = get_job_queue()
+    jobs = await asyncio.to_thread(queue.list, status, limit)
+    return {
+        "jobs": [job.to_dict() for job in jobs],
+        "counts": await asyncio.to_thread(queue.counts),
+    }
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str) -> Dict[str, Any]:
+    """Get the status, progress and, once finished, result of a job."""
+    job = await _get_job(job_id)
+    return job.to_dict(include_payload=True)
+
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str) -> Dict[str, Any]:
+    """Cancel a queued or running job."""
+    job = await _get_job(job_id)
+    if not await asyncio.to_thread(get_job_queue().cancel, job_id):
+        raise HTTPException(
+            status_code=409, detail=f"Job {job_id} is already {job.status}"
+        )
+    job = await _get_job(job_id)
+    return job.to_dict()
+
+
+async def _job_events(job_id: str) -> AsyncIterator[str]:
+    queue = get_job_queue()
+    last = None
+    while True:
+        job = await asyncio.to_thread(queue.get, job_id)
+        if job is None:
+            data = json.dumps({"error": f"Unknown job: {job_id}"})
+            yield f"event: error\ndata: {data}\n\n"
+            return
+        state = (job.status, job.progress, job.attempts)
+        if job.status in FINISHED:
+            data = json.dumps(job.to_dict(), default=str)
+            yield f"event: result\ndata: {data}\n\n"
+            return
+        if state != last:
+            last = state
+            data = json.dumps({
+                "id": job.id,
+                "status": job.status,
+                "progress": job.progress,
+                "attempts": job.attempts,
+            })
+            yield f"event: status\ndata: {data}\n\n"
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+@router.get("/{job_id}/events")
+async def stream_job(job_id: str) -> StreamingResponse:
+    """Stream status changes of a job as Server-Sent Events."""
+    await _get_job(job_id)
+    return StreamingResponse(
+        _job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
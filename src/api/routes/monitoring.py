@@ -0,0 +1,47 @@
+"""
+Health and metrics endpoints.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from ...config import get_settings
+from ...utils.metrics import get_metrics
+
+#: Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter(tags=["monitoring"])
+
+
+@router.get("/health")
+async def health() -> Dict[str, Any]:
+    """Check if the API is running."""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "version": get_settings().app_version,
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Expose metrics in the Prometheus text format."""
+    registry = get_metrics()
+    if registry is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(
+        registry.render(), media_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
+@router.get("/metrics/snapshot")
+async def metrics_snapshot() -> Dict[str, Any]:
+    """Current metric values, with latency quantiles, as JSON."""
+    registry = get_metrics()
+    if registry is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return registry.snapshot()
@@ -3,8 +3,9 @@ Configuration management for the BCI Research Assistant.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 from pydantic import BaseModel, Field
 
@@ -52,6 +53,17 @@ class Settings(BaseModel):
     physionet_api_url: str = Field(
         "https://physionet.org/api", description="PhysioNet API URL"
     )
+    catalog_cache_dir: Path = Field(
+        Path("./data/cache/catalog"),
+        description="Directory persisting catalog pages for revalidation"
+    )
+    openneuro_bucket_url: str = Field(
+        "https://s3.amazonaws.com/openneuro.org",
+        description="Public S3 bucket holding OpenNeuro dataset files"
+    )
+    download_concurrency: int = Field(
+        4, description="Dataset files downloaded in parallel"
+    )
     
     # Security
     secret_key: str = Field(description="Secret key for JWT tokens")
@@ -66,11 +78,95 @@ class Settings(BaseModel):
     # Cache
     cache_ttl: int = Field(3600, description="Cache TTL in seconds")
     enable_cache: bool = Field(True, description="Enable caching")
+    cache_max_entries: int = Field(
+        1024, description="Maximum entries in the in-process cache"
+    )
+    cache_backend: str = Field(
+        "memory", description="Cache backend: memory or redis"
+    )
+    
+    # Semantic search
+    enable_semantic_search: bool = Field(
+        True, description="Enable embedding-based dataset search"
+    )
+    embedding_model: str = Field(
+        "all-MiniLM-L6-v2", description="Sentence-transformers model"
+    )
+    vector_index_dir: Path = Field(
+        Path("./data/vector_index"), description="Vector index directory"
+    )
+    
+    # Compute
+    compute_workers: Optional[int] = Field(
+        None,
+        description=(
+            "Worker processes for CPU-bound analysis "
+            "(CPU count when unset, 0 runs analyses in a thread)"
+        )
+    )
+    preprocessing_cache_dir: Path = Field(
+        Path("./data/processed/cache"),
+        description="Directory caching preprocessing stage outputs"
+    )
+    preprocessing_cache_size_gb: Optional[float] = Field(
+        None, description="Preprocessing cache size limit (unlimited if unset)"
+    )
+    agent_timeout: Optional[float] = Field(
+        300.0,
+        description=(
+            "Seconds an agent run may take without an earlier request "
+            "deadline (unset: no limit)"
+        )
+    )
+    
+    # Background jobs
+    job_queue_url: str = Field(
+        "sqlite:///./data/jobs.db", description="Job queue database URL"
+    )
+    job_workers: int = Field(2, description="Job worker processes")
+    job_stale_seconds: float = Field(
+        120.0,
+        description="Seconds without a heartbeat before a job is requeued"
+    )
+    
+    # Language model gateway
+    llm_backend: str = Field(
+        "anthropic", description="Language model backend: anthropic or fake"
+    )
+    llm_model: str = Field(
+        "claude-3-5-haiku-latest", description="Default language model"
+    )
+    llm_base_url: str = Field(
+        "https://api.anthropic.com", description="Language model API root"
+    )
+    llm_timeout: float = Field(60.0, description="Language model timeout")
+    llm_max_connections: int = Field(
+        20, description="Pooled connections to the language model API"
+    )
+    llm_cache_ttl: int = Field(
+        86400, description="Seconds deterministic completions stay cached"
+    )
+    llm_batch_window: float = Field(
+        0.005,
+        description="Seconds a request waits to share a batch, where supported"
+    )
     
     # Rate Limiting
     rate_limit_per_minute: int = Field(
         100, description="Rate limit per minute"
     )
+    rate_limit_burst: int = Field(
+        10, description="Requests allowed in a burst above the rate"
+    )
+    tenant_rate_limit_per_minute: Optional[int] = Field(
+        None, description="Per-tenant rate limit per minute (unset: none)"
+    )
+    admission_queue_size: int = Field(
+        100, description="Requests allowed to wait for admission"
+    )
+    admission_max_wait: float = Field(
+        30.0, description="Longest admission wait in seconds before shedding"
+    )
     enable_rate_limiting: bool = Field(
         True, description="Enable rate limiting"
     )
@@ -100,6 +196,13 @@ class Settings(BaseModel):
             physionet_api_url=os.getenv(
                 "PHYSIONET_API_URL", "https://physionet.org/api"
             ),
+            catalog_cache_dir=Path(
+                os.getenv("CATALOG_CACHE_DIR", "./data/cache/catalog")
+            ),
+            openneuro_bucket_url=os.getenv(
+                "OPENNEURO_BUCKET_URL", "https://s3.amazonaws.com/openneuro.org"
+            ),
+            download_concurrency=int(os.getenv("DOWNLOAD_CONCURRENCY", "4")),
             secret_key=os.getenv("SECRET_KEY", ""),
             access_token_expire_minutes=int(
                 os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
@@ -108,7 +211,48 @@ class Settings(BaseModel):
             enable_metrics=os.getenv("ENABLE_METRICS", "True").lower() == "true",
             cache_ttl=int(os.getenv("CACHE_TTL", "3600")),
             enable_cache=os.getenv("ENABLE_CACHE", "True").lower() == "true",
+            cache_max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024")),
+            cache_backend=os.getenv("CACHE_BACKEND", "memory"),
+            enable_semantic_search=os.getenv(
+                "ENABLE_SEMANTIC_SEARCH", "True"
+            ).lower() == "true",
+            embedding_model=os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2"),
+            vector_index_dir=Path(
+                os.getenv("VECTOR_INDEX_DIR", "./data/vector_index")
+            ),
+            compute_workers=(
+                int(os.environ["COMPUTE_WORKERS"])
+                if os.getenv("COMPUTE_WORKERS") else None
+            ),
+            preprocessing_cache_dir=Path(
+                os.getenv("PREPROCESSING_CACHE_DIR", "./data/processed/cache")
+            ),
+            preprocessing_cache_size_gb=(
+                float(os.environ["PREPROCESSING_CACHE_SIZE_GB"])
+                if os.getenv("PREPROCESSING_CACHE_SIZE_GB") else None
+            ),
+            agent_timeout=(
+                float(os.getenv("AGENT_TIMEOUT", "300"))
+                if os.getenv("AGENT_TIMEOUT", "300") else None
+            ),
+            job_queue_url=os.getenv("JOB_QUEUE_URL", "sqlite:///./data/jobs.db"),
+            job_workers=int(os.getenv("JOB_WORKERS", "2")),
+            job_stale_seconds=float(os.getenv("JOB_STALE_SECONDS", "120")),
+            llm_backend=os.getenv("LLM_BACKEND", "anthropic"),
+            llm_model=os.getenv("LLM_MODEL", "claude-3-5-haiku-latest"),
+            llm_base_url=os.getenv("LLM_BASE_URL", "https://api.anthropic.com"),
+            llm_timeout=float(os.getenv("LLM_TIMEOUT", "60")),
+            llm_max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+            llm_cache_ttl=int(os.getenv("LLM_CACHE_TTL", "86400")),
+            llm_batch_window=float(os.getenv("LLM_BATCH_WINDOW", "0.005")),
             rate_limit_per_minute=int(os.getenv("RATE_LIMIT_PER_MINUTE", "100")),
+            rate_limit_burst=int(os.getenv("RATE_LIMIT_BURST", "10")),
+            tenant_rate_limit_per_minute=(
+                int(os.environ["TENANT_RATE_LIMIT_PER_MINUTE"])
+                if os.getenv("TENANT_RATE_LIMIT_PER_MINUTE") else None
+            ),
+            admission_queue_size=int(os.getenv("ADMISSION_QUEUE_SIZE", "100")),
+            admission_max_wait=float(os.getenv("ADMISSION_MAX_WAIT", "30")),
             enable_rate_limiting=os.getenv(
                 "ENABLE_RATE_LIMITING", "True"
             ).lower() == "true",
@@ -120,13 +264,17 @@ class Settings(BaseModel):
         env_file_encoding = "utf-8"
 
 
-# Global settings instance
-settings = Settings.from_env()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Get application settings, built from the environment on first use."""
+    return Settings.from_env()
 
 
-def get_settings() -> Settings:
-    """Get application settings."""
-    return settings
+def __getattr__(name: str) -> Any:
+    # ``config.settings`` is still available, built lazily on first access.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_project_root() -> Path:
@@ -0,0 +1,138 @@
+"""
+Signal processing subsystem for neural recordings.
+
+Submodules are imported on first attribute access (PEP 562), so importing
+the package does not load SciPy until a feature function is used.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from .features import (
+        CANONICAL_BANDS,
+        band_powers,
+        bandpass_filter,
+        design_bandpass,
+        integrate_bands,
+        peak_frequency,
+        welch_psd,
+    )
+    from .online import (
+        OnlineDecoder,
+        RingBuffer,
+        SimulatedStream,
+        SyntheticEEG,
+        run_online,
+    )
+    from .preprocessing import (
+        PreprocessedRecording,
+        PreprocessingPipeline,
+        build_stages,
+        preprocess,
+    )
+    from .quality import (
+        QualityAccumulator,
+        QualityThresholds,
+        SignalQualityReport,
+        assess_signal_quality,
+        assess_signal_quality_batch,
+        assess_window_quality,
+    )
+    from .storage import (
+        HDF5RecordingReader,
+        HDF5RecordingWriter,
+        convert_recording,
+        read_recording,
+        write_recording,
+    )
+    from .streaming import (
+        RecordingReader,
+        RecordingWriter,
+        Window,
+        iter_windows,
+        window_view,
+    )
+
+_LAZY_ATTRIBUTES: Dict[str, str] = {
+    "CANONICAL_BANDS": ".features",
+    "band_powers": ".features",
+    "bandpass_filter": ".features",
+    "design_bandpass": ".features",
+    "integrate_bands": ".features",
+    "peak_frequency": ".features",
+    "welch_psd": ".features",
+    "OnlineDecoder": ".online",
+    "RingBuffer": ".online",
+    "SimulatedStream": ".online",
+    "SyntheticEEG": ".online",
+    "run_online": ".online",
+    "PreprocessedRecording": ".preprocessing",
+    "PreprocessingPipeline": ".preprocessing",
+    "build_stages": ".preprocessing",
+    "preprocess": ".preprocessing",
+    "QualityAccumulator": ".quality",
+    "QualityThresholds": ".quality",
+    "SignalQualityReport": ".quality",
+    "assess_signal_quality": ".quality",
+    "assess_signal_quality_batch": ".quality",
+    "assess_window_quality": ".quality",
+    "HDF5RecordingReader": ".storage",
+    "HDF5RecordingWriter": ".storage",
+    "convert_recording": ".storage",
+    "read_recording": ".storage",
+    "write_recording": ".storage",
+    "RecordingReader": ".streaming",
+    "RecordingWriter": ".streaming",
+    "Window": ".streaming",
+    "iter_windows": ".streaming",
+    "window_view": ".streaming",
+}
+
+__all__ = [
+    "CANONICAL_BANDS",
+    "band_powers",
+    "bandpass_filter",
+    "design_bandpass",
+    "integrate_bands",
+    "peak_frequency",
+    "welch_psd",
+    "OnlineDecoder",
+    "RingBuffer",
+    "SimulatedStream",
+    "SyntheticEEG",
+    "run_online",
+    "PreprocessedRecording",
+    "PreprocessingPipeline",
+    "build_stages",
+    "preprocess",
+    "QualityAccumulator",
+    "QualityThresholds",
+    "SignalQualityReport",
+    "assess_signal_quality",
+    "assess_signal_quality_batch",
+    "assess_window_quality",
+    "HDF5RecordingReader",
+    "HDF5RecordingWriter",
+    "convert_recording",
+    "read_recording",
+    "write_recording",
+    "RecordingReader",
+    "RecordingWriter",
+    "Window",
+    "iter_windows",
+    "window_view"
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
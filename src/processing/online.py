@@ -0,0 +1,586 @@
+"""
+Online decoding of streamed recordings.
+
+Sample blocks arriving from an acquisition stream are filtered with stateful
+IIR filters, so every sample is filtered exactly once, and band powers over a
+sliding window are maintained as running sums instead of being recomputed
+for every overlapping window. Ring buffers, running sums and feature arrays
+are allocated when a decoder is created and updated in place. The IIR
+filters are the exception: ``scipy.signal.sosfilt`` has no output argument,
+so every filter pass allocates its output block and final state.
+
+``SimulatedStream`` stands in for a Lab Streaming Layer inlet during
+development: it paces synthetic EEG blocks in real time and timestamps them
+on the ``time.perf_counter`` clock used for latency measurements.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+from scipy import signal
+
+from .features import CANONICAL_BANDS, design_bandpass
+
+#: Default processing budget per block in seconds
+DEFAULT_BUDGET = 0.05
+
+Decoder = Callable[[np.ndarray], Any]
+
+
+class RingBuffer:
+    """Preallocated ring of the most recent samples of every channel.
+
+    Every sample is stored twice, ``capacity`` apart, so the latest ``n``
+    samples are always one contiguous view regardless of where the write
+    position wrapped.
+    """
+
+    def __init__(self, n_channels: int, capacity: int, dtype: Any = np.float64):
+        """Initialize the buffer.
+
+        Args:
+            n_channels: Rows per sample
+            capacity: Samples retained per channel
+            dtype: Sample type
+        """
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros((n_channels, 2 * capacity), dtype=dtype)
+        self._position = 0
+        self.total = 0
+
+    def clear(self) -> None:
+        """Drop every sample."""
+        self._data.fill(0)
+        self._position = 0
+        self.total = 0
+
+    @property
+    def size(self) -> int:
+        """Number of valid samples held."""
+        return min(self.total, self.capacity)
+
+    def write(self, block: np.ndarray) -> None:
+        """Append a ``(n_channels, n_samples)`` block, dropping old samples."""
+        n = block.shape[1]
+        self.total += n
+        if n > self.capacity:
+            block = block[:, n - self.capacity:]
+            n = self.capacity
+        capacity = self.capacity
+        start = self._position
+        first = min(n, capacity - start)
+        mirror = capacity + start
+        self._data[:, start:start + first] = block[:, :first]
+        self._data[:, mirror:mirror + first] = block[:, :first]
+        rest = n - first
+        if rest:
+            self._data[:, :rest] = block[:, first:]
+            self._data[:, capacity:capacity + rest] = block[:, first:]
+        self._position = (start + n) % capacity
+
+    def latest(self, n: Optional[int] = None) -> np.ndarray:
+        """View of the latest ``n`` samples, oldest first.
+
+        The view is only valid until the next ``write``.
+        """
+        n = self.capacity if n is None else n
+        if n > self.capacity:
+            raise ValueError(f"Only the latest {self.capacity} samples are kept")
+        end = self._position + self.capacity
+        return self._data[:, end - n:end]
+
+
+class StatefulFilter:
+    """Second-order-sections filter carrying its state across blocks."""
+
+    def __init__(self, sos: np.ndarray, n_channels: int):
+        """Initialize the filter.
+
+        Args:
+            sos: Second-order sections of the filter
+            n_channels: Channels filtered in parallel
+        """
+        self.sos = np.array(sos, dtype=np.float64)
+        self._zi_unit = signal.sosfilt_zi(self.sos)[:, np.newaxis, :]
+        self._zi = np.zeros((len(self.sos), n_channels, 2))
+        self._primed = False
+
+    def reset(self) -> None:
+        """Forget the filter state."""
+        self._zi.fill(0.0)
+        self._primed = False
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Filter the next ``(n_channels, n_samples)`` block.
+
+        The filter state is kept in a preallocated array, but the filtered
+        block is a new array: ``sosfilt`` cannot write into a given output.
+        """
+        if not self._primed:
+            # Start from the steady state of the first sample to avoid the
+            # step response of a DC offset.
+            np.multiply(
+                self._zi_unit, block[np.newaxis, :, 0, np.newaxis], out=self._zi
+            )
+            self._primed = True
+        filtered, self._zi[...] = signal.sosfilt(
+            self.sos, block, axis=-1, zi=self._zi
+        )
+        return filtered
+
+
+class OnlineBandPower:
+    """Band powers over a sliding window, updated block by block.
+
+    Every band has its own stateful band-pass filter. Squared filter outputs
+    enter a ring buffer and a running sum per band and channel, from which
+    the samples leaving the window are subtracted.
+    """
+
+    def __init__(
+        self,
+        sampling_rate: float,
+        n_channels: int,
+        window: int,
+        bands: Optional[Mapping[str, Tuple[float, float]]] = None,
+        max_block_size: int = 256,
+        order: int = 4
+    ):
+        """Initialize the band-power tracker.
+
+        Args:
+            sampling_rate: Sampling rate in Hz
+            n_channels: Number of channels
+            window: Window length in samples
+            bands: Band name to ``(low, high)`` Hz mapping, canonical bands
+                below the Nyquist frequency when omitted
+            max_block_size: Largest block passed to ``update``
+            order: Band-pass filter order
+        """
+        nyquist = sampling_rate / 2
+        if bands is None:
+            bands = {
+                name: band for name, band in CANONICAL_BANDS.items()
+                if band[0] < nyquist
+            }
+        self.band_names = list(bands)
+        self.n_channels = n_channels
+        self.window = window
+        self.max_block_size = max_block_size
+        self._filters = [
+            StatefulFilter(
+                design_bandpass(float(sampling_rate), low, high, order),
+                n_channels,
+            )
+            for low, high in bands.values()
+        ]
+        rows = len(self._filters) * n_channels
+        self._ring = RingBuffer(rows, window)
+        self._block = np.zeros((rows, max_block_size))
+        self._sums = np.zeros(rows)
+        self._scratch = np.zeros(rows)
+        self._features = np.zeros((len(self._filters), n_channels))
+        self._since_resync = 0
+
+    def reset(self) -> None:
+        """Clear the filter states and the window."""
+        for band_filter in self._filters:
+            band_filter.reset()
+        self._ring.clear()
+        self._sums.fill(0.0)
+        self._since_resync = 0
+
+    @property
+    def ready(self) -> bool:
+        """Whether a full window has been observed."""
+        return self._ring.total >= self.window
+
+    def update(self, block: np.ndarray) -> None:
+        """Add a ``(n_channels, n_samples)`` block of filtered samples."""
+        n = block.shape[1]
+        if n > self.max_block_size:
+            raise ValueError(
+                f"Block of {n} samples exceeds max_block_size "
+                f"{self.max_block_size}"
+            )
+        if n > self.window:
+            raise ValueError("Blocks must not exceed the window length")
+        squared = self._block[:, :n]
+        for index, band_filter in enumerate(self._filters):
+            rows = slice(index * self.n_channels, (index + 1) * self.n_channels)
+            np.square(band_filter.process(block), out=squared[rows])
+
+        # The oldest n samples of the window are overwritten by this block.
+        np.sum(self._ring.latest()[:, :n], axis=1, out=self._scratch)
+        self._sums -= self._scratch
+        np.sum(squared, axis=1, out=self._scratch)
+        self._sums += self._scratch
+        self._ring.write(squared)
+
+        # Re-sum once per window so rounding errors cannot accumulate.
+        self._since_resync += n
+        if self._since_resync >= self.window:
+            np.sum(self._ring.latest(), axis=1, out=self._sums)
+            self._since_resync = 0
+
+    def features(self) -> np.ndarray:
+        """Log mean power per band and channel, ``(n_bands, n_channels)``.
+
+        The array is reused; copy it to keep values past the next call.
+        """
+        flat = self._features.reshape(-1)
+        np.divide(self._sums, max(self._ring.size, 1), out=flat)
+        np.maximum(flat, np.finfo(float).tiny, out=flat)
+        np.log(flat, out=flat)
+        return self._features
+
+
+class LinearDecoder:
+    """Linear classifier over flattened band-power features."""
+
+    def __init__(
+        self,
+        weights: np.ndarray,
+        bias: Optional[np.ndarray] = None,
+        labels: Optional[Any] = None
+    ):
+        """Initialize the decoder.
+
+        Args:
+            weights: ``(n_classes, n_features)`` weight matrix
+            bias: ``(n_classes,)`` offsets
+            labels: Class labels, indices when omitted
+        """
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = (
+            np.zeros(len(self.weights)) if bias is None
+            else np.asarray(bias, dtype=np.float64)
+        )
+        self.labels = list(labels) if labels is not None else list(
+            range(len(self.weights))
+        )
+        self._scores = np.zeros(len(self.weights))
+
+    def __call__(self, features: np.ndarray) -> Any:
+        np.dot(self.weights, features.reshape(-1), out=self._scores)
+        self._scores += self.bias
+        return self.labels[int(np.argmax(self._scores))]
+
+
+class LatencyTracker:
+    """Fixed-size record of recent latencies."""
+
+    def __init__(self, capacity: int = 4096, budget: float = DEFAULT_BUDGET):
+        """Initialize the tracker.
+
+        Args:
+            capacity: Most recent observations kept for percentiles
+            budget: Latency in seconds counted as over budget above it
+        """
+        self.budget = budget
+        self._values = np.zeros(capacity)
+        self.count = 0
+        self.over_budget = 0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Record one latency in seconds."""
+        self._values[self.count % len(self._values)] = value
+        self.count += 1
+        if value > self.budget:
+            self.over_budget += 1
+        if value > self.max:
+            self.max = value
+
+    def summary(self) -> Dict[str, float]:
+        """Count, percentiles and maximum in milliseconds."""
+        values = self._values[:min(self.count, len(self._values))]
+        if not len(values):
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+        return {
+            "count": self.count,
+            "mean_ms": round(float(values.mean()) * 1000, 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(self.max * 1000, 3),
+            "over_budget": self.over_budget,
+        }
+
+
+@dataclass
+class DecoderOutput:
+    """A decoder result emitted by the online pipeline.
+
+    Attributes:
+        timestamp: Acquisition time of the newest sample, on the
+            ``time.perf_counter`` clock
+        prediction: Decoder output
+        samples: Samples ingested so far
+        processing_time: Seconds spent processing the triggering block
+        latency: Seconds from acquisition of the newest sample to emission
+    """
+
+    timestamp: float
+    prediction: Any
+    samples: int
+    processing_time: float
+    latency: float
+
+
+class OnlineDecoder:
+    """Filter, featurize and decode a stream of sample blocks."""
+
+    def __init__(
+        self,
+        sampling_rate: float,
+        n_channels: int,
+        decoder: Optional[Decoder] = None,
+        window_seconds: float = 1.0,
+        step_seconds: float = 0.1,
+        band: Optional[Tuple[float, float]] = (1.0, 40.0),
+        line_freq: Optional[float] = 50.0,
+        bands: Optional[Mapping[str, Tuple[float, float]]] = None,
+        max_block_size: int = 256,
+        budget: float = DEFAULT_BUDGET
+    ):
+        """Initialize the online pipeline.
+
+        Args:
+            sampling_rate: Sampling rate in Hz
+            n_channels: Number of channels
+            decoder: Callable mapping ``(n_bands, n_channels)`` log band
+                powers to a prediction; outputs a copy of the features when
+                omitted
+            window_seconds: Length of the band-power window
+            step_seconds: Interval between decoder outputs
+            band: Broadband ``(low, high)`` pre-filter in Hz, or ``None``
+            line_freq: Line-noise frequency to notch out, or ``None``
+            bands: Bands for feature extraction
+            max_block_size: Largest block passed to ``process``
+            budget: Per-block processing budget in seconds
+        """
+        self.sampling_rate = float(sampling_rate)
+        self.n_channels = n_channels
+        self.decoder = decoder
+        window = int(round(window_seconds * sampling_rate))
+        self.step = max(int(round(step_seconds * sampling_rate)), 1)
+
+        sections = []
+        if line_freq is not None and line_freq < sampling_rate / 2:
+            b, a = signal.iirnotch(line_freq, 30.0, sampling_rate)
+            sections.append(signal.tf2sos(b, a))
+        if band is not None:
+            sections.append(design_bandpass(self.sampling_rate, *band))
+        self._prefilter = (
+            StatefulFilter(np.vstack(sections), n_channels) if sections else None
+        )
+        self.buffer = RingBuffer(n_channels, window)
+        self.band_power = OnlineBandPower(
+            sampling_rate, n_channels, window, bands, max_block_size
+        )
+        self.processing = LatencyTracker(budget=budget)
+        self.latency = LatencyTracker(budget=budget)
+        self._since_output = 0
+
+    def reset(self) -> None:
+        """Clear the filter states, e.g. after a gap in the stream."""
+        if self._prefilter is not None:
+            self._prefilter.reset()
+        self.band_power.reset()
+        self._since_output = 0
+
+    def process(
+        self,
+        block: np.ndarray,
+        timestamp: Optional[float] = None
+    ) -> Optional[DecoderOutput]:
+        """Ingest a ``(n_channels, n_samples)`` block.
+
+        Args:
+            block: Newest samples of every channel
+            timestamp: Acquisition time of the last sample of the block on
+                the ``time.perf_counter`` clock; latency then covers the time
+                the block spent in transit
+
+        Returns:
+            A decoder output once per ``step_seconds`` after the first full
+            window, otherwise ``None``
+        """
+        started = time.perf_counter()
+        filtered = (
+            self._prefilter.process(block) if self._prefilter is not None
+            else block
+        )
+        self.buffer.write(filtered)
+        self.band_power.update(filtered)
+        self._since_output += block.shape[1]
+
+        output = None
+        if self.band_power.ready and self._since_output >= self.step:
+            self._since_output %= self.step
+            features = self.band_power.features()
+            prediction = (
+                self.decoder(features) if self.decoder is not None
+                else features.copy()
+            )
+            finished = time.perf_counter()
+            output = DecoderOutput(
+                timestamp=timestamp if timestamp is not None else started,
+                prediction=prediction,
+                samples=self.buffer.total,
+                processing_time=finished - started,
+                latency=finished - (
+                    timestamp if timestamp is not None else started
+                ),
+            )
+            self.latency.record(output.latency)
+            self.processing.record(finished - started)
+        else:
+            self.processing.record(time.perf_counter() - started)
+        return output
+
+    def stats(self) -> Dict[str, Any]:
+        """Processing time per block and end-to-end output latency."""
+        return {
+            "samples": self.buffer.total,
+            "processing": self.processing.summary(),
+            "latency": self.latency.summary(),
+        }
+
+
+class SyntheticEEG:
+    """Generator of synthetic EEG: white noise plus a per-channel alpha rhythm."""
+
+    def __init__(
+        self,
+        n_channels: int,
+        sampling_rate: float,
+        alpha_freq: float = 10.0,
+        noise: float = 50.0,
+        seed: Optional[int] = None
+    ):
+        """Initialize the generator.
+
+        Args:
+            n_channels: Number of channels
+            sampling_rate: Sampling rate in Hz
+            alpha_freq: Frequency of the alpha rhythm in Hz
+            noise: Standard deviation of the noise
+            seed: Random seed
+        """
+        self.n_channels = n_channels
+        self.sampling_rate = float(sampling_rate)
+        self.alpha_freq = alpha_freq
+        self.noise = noise
+        self._rng = np.random.default_rng(seed)
+        self.alpha_gain = 20 * (0.5 + 0.5 * self._rng.random((n_channels, 1)))
+        self._ramp = np.zeros(0)
+        self._phase = np.zeros(0)
+        self._scratch = np.zeros((n_channels, 0))
+
+    def fill(self, out: np.ndarray, start: int) -> np.ndarray:
+        """Write samples ``start`` onwards into ``out`` in place."""
+        n = out.shape[1]
+        if len(self._ramp) < n:
+            self._ramp = np.arange(n, dtype=np.float64)
+            self._phase = np.zeros(n)
+            self._scratch = np.zeros((self.n_channels, n))
+        phase = self._phase[:n]
+        scratch = self._scratch[:, :n]
+        self._rng.standard_normal(out=out)
+        out *= self.noise
+        np.add(self._ramp[:n], start, out=phase)
+        phase *= 2 * np.pi * self.alpha_freq / self.sampling_rate
+        np.sin(phase, out=phase)
+        np.multiply(self.alpha_gain, phase, out=scratch)
+        out += scratch
+        return out
+
+    def generate(self, start: int, stop: int) -> np.ndarray:
+        """Samples ``start`` to ``stop`` as a new array."""
+        return self.fill(np.empty((self.n_channels, stop - start)), start)
+
+
+class SimulatedStream:
+    """Real-time paced stream of synthetic EEG blocks.
+
+    Mirrors the ``pull_chunk`` interface of a Lab Streaming Layer inlet, with
+    samples shaped ``(n_channels, n_samples)``.
+    """
+
+    def __init__(
+        self,
+        n_channels: int = 8,
+        sampling_rate: float = 256.0,
+        block_size: int = 16,
+        realtime: bool = True,
+        seed: Optional[int] = None
+    ):
+        """Initialize the stream.
+
+        Args:
+            n_channels: Number of channels
+            sampling_rate: Sampling rate in Hz
+            block_size: Samples per block
+            realtime: Wait until a block's samples would have been acquired;
+                blocks are produced as fast as possible otherwise
+            seed: Random seed
+        """
+        self.n_channels = n_channels
+        self.sampling_rate = float(sampling_rate)
+        self.block_size = block_size
+        self.realtime = realtime
+        self.generator = SyntheticEEG(n_channels, sampling_rate, seed=seed)
+        self._block = np.zeros((n_channels, block_size))
+        self._position = 0
+        self._started: Optional[float] = None
+
+    def pull_chunk(self) -> Tuple[np.ndarray, float]:
+        """Next block and the acquisition time of its last sample.
+
+        The block is reused by the following call; copy it to keep it.
+        """
+        if self._started is None:
+            self._started = time.perf_counter()
+        self._position += self.block_size
+        timestamp = self._started + self._position / self.sampling_rate
+        if self.realtime:
+            delay = timestamp - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        else:
+            timestamp = time.perf_counter()
+        self.generator.fill(self._block, self._position - self.block_size)
+        return self._block, timestamp
+
+
+def run_online(
+    stream: SimulatedStream,
+    decoder: OnlineDecoder,
+    duration: float,
+    on_output: Optional[Callable[[DecoderOutput], None]] = None
+) -> Dict[str, Any]:
+    """Feed a stream through an online decoder.
+
+    Args:
+        stream: Source of sample blocks
+        decoder: Online pipeline
+        duration: Seconds of signal to process
+        on_output: Called with every decoder output
+
+    Returns:
+        Latency statistics of the run
+    """
+    n_blocks = int(duration * stream.sampling_rate / stream.block_size)
+    for _ in range(n_blocks):
+        block, timestamp = stream.pull_chunk()
+        output = decoder.process(block, timestamp)
+        if output is not None and on_output is not None:
+            on_output(output)
+    return decoder.stats()
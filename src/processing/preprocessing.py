@@ -0,0 +1,574 @@
+"""
+Preprocessing pipeline with an incremental on-disk cache.
+
+A pipeline is an ordered list of stages (filtering, re-referencing,
+resampling, epoching). The output of every stage is cached under a key
+chained from the content hash of the input recording and the exact
+parameters of that stage and all stages before it. Re-running a pipeline
+reuses the longest cached prefix, so changing one stage only recomputes it
+and the stages downstream of it.
+
+Cached outputs are plain ``.npy`` files with a JSON sidecar, memory-mapped
+when read back. Content hashes of source files are remembered by path,
+size and modification time, so unchanged recordings are hashed only once.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import uuid
+from dataclasses import dataclass
+from fractions import Fraction
+from pathlib import Path
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+import numpy as np
+from loguru import logger
+from scipy import signal
+
+from ..utils.cache import make_cache_key
+from .features import bandpass_filter
+from .storage import read_recording, resolve_recording_path
+
+
+@dataclass
+class Signal:
+    """Samples flowing between stages.
+
+    Attributes:
+        data: ``(n_channels, n_times)`` recording or
+            ``(n_epochs, n_channels, n_times)`` epochs
+        sampling_rate: Sampling rate in Hz
+        channel_names: Channel labels
+    """
+
+    data: np.ndarray
+    sampling_rate: float
+    channel_names: List[str]
+
+
+@dataclass
+class Stage:
+    """A preprocessing step with hashable parameters.
+
+    Subclasses are dataclasses whose fields are the stage parameters.
+    Increase ``version`` when a change to ``apply`` alters its output, so
+    results cached by the old implementation are not reused.
+    """
+
+    name: ClassVar[str] = ""
+    version: ClassVar[int] = 1
+
+    def params(self) -> Dict[str, Any]:
+        """Parameters identifying the stage output."""
+        return dataclasses.asdict(self)
+
+    def apply(self, signal_in: Signal) -> Signal:
+        """Transform the signal."""
+        raise NotImplementedError
+
+
+@dataclass
+class BandpassFilter(Stage):
+    """Zero-phase Butterworth band-pass filter."""
+
+    name: ClassVar[str] = "bandpass"
+
+    low: float
+    high: float
+    order: int = 4
+
+    def apply(self, signal_in: Signal) -> Signal:
+        data = bandpass_filter(
+            signal_in.data,
+            signal_in.sampling_rate,
+            (self.low, self.high),
+            self.order,
+        )
+        return dataclasses.replace(signal_in, data=data)
+
+
+@dataclass
+class NotchFilter(Stage):
+    """Zero-phase notch filter at the line frequency and its harmonics."""
+
+    name: ClassVar[str] = "notch"
+
+    freq: float = 50.0
+    quality: float = 30.0
+    harmonics: int = 1
+
+    def apply(self, signal_in: Signal) -> Signal:
+        data = signal_in.data
+        nyquist = signal_in.sampling_rate / 2
+        for k in range(1, self.harmonics + 1):
+            if self.freq * k >= nyquist:
+                break
+            b, a = signal.iirnotch(
+                self.freq * k, self.quality, signal_in.sampling_rate
+            )
+            data = signal.filtfilt(b, a, data, axis=-1)
+        return dataclasses.replace(signal_in, data=data)
+
+
+@dataclass
+class Rereference(Stage):
+    """Subtract the average of all or of selected reference channels."""
+
+    name: ClassVar[str] = "rereference"
+
+    reference: Union[str, List[str]] = "average"
+
+    def apply(self, signal_in: Signal) -> Signal:
+        data = signal_in.data
+        if self.reference == "average":
+            reference = data.mean(axis=-2, keepdims=True)
+        else:
+            names = self.reference
+            if isinstance(names, str):
+                names = [names]
+            missing = set(names) - set(signal_in.channel_names)
+            if missing:
+                raise ValueError(f"Unknown reference channels {sorted(missing)}")
+            indices = [signal_in.channel_names.index(n) for n in names]
+            reference = data[..., indices, :].mean(axis=-2, keepdims=True)
+        return dataclasses.replace(signal_in, data=data - reference)
+
+
+@dataclass
+class Resample(Stage):
+    """Polyphase resampling to a new rate."""
+
+    name: ClassVar[str] = "resample"
+
+    sampling_rate: float
+
+    def apply(self, signal_in: Signal) -> Signal:
+        ratio = Fraction(
+            self.sampling_rate / signal_in.sampling_rate
+        ).limit_denominator(1000)
+        if ratio == 1:
+            return signal_in
+        data = signal.resample_poly(
+            signal_in.data, ratio.numerator, ratio.denominator, axis=-1
+        )
+        return dataclasses.replace(
+            signal_in,
+            data=data,
+            sampling_rate=signal_in.sampling_rate * float(ratio),
+        )
+
+
+@dataclass
+class Epoch(Stage):
+    """Cut a continuous recording into epochs.
+
+    Epochs start at ``onsets`` (seconds) shifted by ``tmin``, or tile the
+    recording every ``step`` seconds (``length`` when unset) if no onsets
+    are given. Epochs that do not fit the recording are dropped.
+    """
+
+    name: ClassVar[str] = "epoch"
+
+    length: float
+    step: Optional[float] = None
+    onsets: Optional[List[float]] = None
+    tmin: float = 0.0
+
+    def apply(self, signal_in: Signal) -> Signal:
+        data = signal_in.data
+        if data.ndim != 2:
+            raise ValueError("Epoching requires a continuous recording")
+        rate = signal_in.sampling_rate
+        size = int(round(self.length * rate))
+        n_times = data.shape[-1]
+        if self.onsets is not None:
+            starts = np.rint(
+                (np.asarray(self.onsets, dtype=float) + self.tmin) * rate
+            ).astype(np.intp)
+        else:
+            step = int(round((self.step or self.length) * rate))
+            starts = np.arange(0, max(n_times - size + 1, 0), step)
+        starts = starts[(starts >= 0) & (starts + size <= n_times)]
+        if len(starts):
+            epochs = np.stack([data[:, s:s + size] for s in starts])
+        else:
+            epochs = np.empty((0, data.shape[0], size), dtype=data.dtype)
+        return dataclasses.replace(signal_in, data=epochs)
+
+
+#: Stage classes by configuration name
+STAGES: Dict[str, Type[Stage]] = {
+    cls.name: cls
+    for cls in (BandpassFilter, NotchFilter, Rereference, Resample, Epoch)
+}
+
+
+def build_stages(specs: Sequence[Union[Stage, Mapping[str, Any]]]) -> List[Stage]:
+    """Build stages from ``{"stage": name, **params}`` specifications.
+
+    Raises:
+        ValueError: On an unknown stage name or invalid parameters
+    """
+    stages = []
+    for spec in specs:
+        if isinstance(spec, Stage):
+            stages.append(spec)
+            continue
+        params = dict(spec)
+        name = params.pop("stage", None)
+        cls = STAGES.get(name)
+        if cls is None:
+            raise ValueError(
+                f"Unknown preprocessing stage {name!r}, "
+                f"available: {sorted(STAGES)}"
+            )
+        try:
+            stages.append(cls(**params))
+        except TypeError as e:
+            raise ValueError(f"Invalid parameters for stage {name!r}: {e}")
+    return stages
+
+
+@dataclass
+class PreprocessedRecording:
+    """Output of a pipeline run, stored in the cache.
+
+    Attributes:
+        path: Cached ``.npy`` file of the final stage
+        key: Cache key of the final stage
+        sampling_rate: Sampling rate of the output in Hz
+        channel_names: Channel labels of the output
+        computed: Names of the stages computed by this run
+        reused: Names of the stages served from the cache
+    """
+
+    path: Path
+    key: str
+    sampling_rate: float
+    channel_names: List[str]
+    computed: List[str]
+    reused: List[str]
+
+    @property
+    def data(self) -> np.ndarray:
+        """The preprocessed samples, memory-mapped."""
+        return np.load(self.path, mmap_mode="r")
+
+
+RecordingSource = Union[str, Path, np.ndarray]
+
+
+class PreprocessingPipeline:
+    """Run preprocessing stages, caching every intermediate output."""
+
+    def __init__(
+        self,
+        stages: Sequence[Union[Stage, Mapping[str, Any]]],
+        cache_dir: Union[str, Path],
+        dtype: str = "float32",
+        max_cache_bytes: Optional[int] = None
+    ):
+        """Initialize the pipeline.
+
+        Args:
+            stages: Stages or ``{"stage": name, **params}`` specifications
+            cache_dir: Directory holding cached stage outputs
+            dtype: Type cached outputs are stored as
+            max_cache_bytes: Prune least recently used outputs beyond this
+                size after every run; unlimited when ``None``
+        """
+        self.stages = build_stages(stages)
+        self.cache_dir = Path(cache_dir)
+        self.dtype = np.dtype(dtype)
+        self.max_cache_bytes = max_cache_bytes
+
+    @classmethod
+    def from_settings(
+        cls,
+        stages: Sequence[Union[Stage, Mapping[str, Any]]],
+        settings: Any
+    ) -> "PreprocessingPipeline":
+        """Create a pipeline over the configured cache directory."""
+        size_gb = settings.preprocessing_cache_size_gb
+        return cls(
+            stages,
+            settings.preprocessing_cache_dir,
+            max_cache_bytes=int(size_gb * 1e9) if size_gb else None,
+        )
+
+    def stage_keys(self, source_key: str) -> List[str]:
+        """Cache key of every stage output for a source."""
+        keys = []
+        parent = source_key
+        for stage in self.stages:
+            parent = make_cache_key(f"preprocess:{stage.name}", {
+                "parent": parent,
+                "version": stage.version,
+                "params": stage.params(),
+                "dtype": self.dtype.str,
+            })
+            keys.append(parent)
+        return keys
+
+    def run(
+        self,
+        source: RecordingSource,
+        sampling_rate: Optional[float] = None,
+        channel_names: Optional[Sequence[str]] = None
+    ) -> PreprocessedRecording:
+        """Preprocess a recording, reusing cached stage outputs.
+
+        Args:
+            source: Recording path (any layout ``read_recording`` accepts)
+                or an in-memory ``(n_channels, n_times)`` array
+            sampling_rate: Sampling rate, required for arrays and overriding
+                the file metadata otherwise
+            channel_names: Channel labels, overriding the file metadata
+
+        Returns:
+            The final stage output
+
+        Raises:
+            ValueError: If the pipeline is empty or the sampling rate unknown
+        """
+        if not self.stages:
+            raise ValueError("Preprocessing pipeline has no stages")
+        source_key = self._source_key(source, sampling_rate, channel_names)
+        keys = self.stage_keys(source_key)
+
+        # Resume after the last stage whose output is already cached.
+        start = len(keys)
+        while start > 0 and not self._meta_path(keys[start - 1]).exists():
+            start -= 1
+        if start == len(keys):
+            self._touch(keys[-1])
+            result = self._result(keys[-1], [], [s.name for s in self.stages])
+            logger.debug(f"Preprocessing served from cache: {keys[-1][:12]}")
+            return result
+
+        if start:
+            current = self._load(keys[start - 1])
+        else:
+            current = self._read_source(source, sampling_rate, channel_names)
+        for stage, key in zip(self.stages[start:], keys[start:]):
+            current = stage.apply(current)
+            self._store(key, stage, current)
+
+        computed = [s.name for s in self.stages[start:]]
+        reused = [s.name for s in self.stages[:start]]
+        logger.info(
+            f"Preprocessing computed {computed}"
+            + (f", reused cached {reused}" if reused else "")
+        )
+        if self.max_cache_bytes is not None:
+            self.prune(self.max_cache_bytes, keep=keys)
+        return self._result(keys[-1], computed, reused)
+
+    def _source_key(
+        self,
+        source: RecordingSource,
+        sampling_rate: Optional[float],
+        channel_names: Optional[Sequence[str]]
+    ) -> str:
+        """Cache key of a source as read with the given overrides.
+
+        File metadata is covered by the file digest, so only the overrides
+        of ``run`` are added; without them the file metadata (or, for
+        arrays, the shape-derived channel names) applies.
+        """
+        if isinstance(source, np.ndarray):
+            content: Dict[str, Any] = {"data": source}
+        else:
+            content = {"sha256": self._file_digest(source)}
+        content["sampling_rate"] = float(sampling_rate) if sampling_rate else None
+        content["channel_names"] = (
+            list(channel_names) if channel_names else None
+        )
+        return make_cache_key("preprocess:source", content)
+
+    def _file_digest(self, path: Union[str, Path]) -> str:
+        """Content hash of a recording, memoized by path, size and mtime."""
+        path = resolve_recording_path(path).resolve()
+        stat = path.stat()
+        index_path = self.cache_dir / "sources.json"
+        index: Dict[str, Any] = {}
+        if index_path.exists():
+            index = json.loads(index_path.read_text())
+        entry = index.get(str(path))
+        if entry and entry["size"] == stat.st_size and (
+            entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return entry["sha256"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 22), b""):
+                digest.update(block)
+        # Metadata such as the sampling rate lives beside .npy samples.
+        metadata = path.parent / "metadata.json"
+        if path.suffix == ".npy" and metadata.exists():
+            digest.update(metadata.read_bytes())
+        index[str(path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest.hexdigest(),
+        }
+        self._write_atomic(index_path, json.dumps(index).encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _read_source(
+        source: RecordingSource,
+        sampling_rate: Optional[float],
+        channel_names: Optional[Sequence[str]]
+    ) -> Signal:
+        if isinstance(source, np.ndarray):
+            data, file_rate, file_names = source, None, None
+        else:
+            data, file_rate, file_names = read_recording(source)
+        rate = sampling_rate or file_rate
+        if not rate:
+            raise ValueError("Preprocessing requires the sampling rate")
+        names = list(channel_names or file_names or [
+            f"Ch{i + 1:02d}" for i in range(data.shape[-2])
+        ])
+        return Signal(np.array(data, dtype=np.float64), float(rate), names)
+
+    def _data_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.npy"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _store(self, key: str, stage: Stage, current: Signal) -> None:
+        path = self._data_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.stem}.{uuid.uuid4().hex}.npy")
+        np.save(tmp, current.data.astype(self.dtype, copy=False))
+        os.replace(tmp, path)
+        # The sidecar is written last; its presence marks a complete entry.
+        meta = {
+            "stage": stage.name,
+            "params": stage.params(),
+            "sampling_rate": current.sampling_rate,
+            "channel_names": current.channel_names,
+            "shape": list(current.data.shape),
+        }
+        self._write_atomic(
+            self._meta_path(key), json.dumps(meta, default=str).encode("utf-8")
+        )
+
+    def _load(self, key: str) -> Signal:
+        meta = json.loads(self._meta_path(key).read_text())
+        self._touch(key)
+        return Signal(
+            np.load(self._data_path(key)).astype(np.float64),
+            meta["sampling_rate"],
+            meta["channel_names"],
+        )
+
+    def _result(
+        self,
+        key: str,
+        computed: List[str],
+        reused: List[str]
+    ) -> PreprocessedRecording:
+        meta = json.loads(self._meta_path(key).read_text())
+        return PreprocessedRecording(
+            self._data_path(key),
+            key,
+            meta["sampling_rate"],
+            meta["channel_names"],
+            computed,
+            reused,
+        )
+
+    def _touch(self, key: str) -> None:
+        try:
+            os.utime(self._data_path(key))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _write_atomic(path: Path, content: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+        tmp.write_bytes(content)
+        os.replace(tmp, path)
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """Cached outputs as ``(key, size in bytes, last use)`` tuples."""
+        entries = []
+        for meta in self.cache_dir.glob("??/*.json"):
+            data = meta.with_suffix(".npy")
+            if data.exists():
+                stat = data.stat()
+                entries.append((meta.stem, stat.st_size, stat.st_mtime))
+        return entries
+
+    def prune(self, max_bytes: int, keep: Sequence[str] = ()) -> int:
+        """Remove least recently used outputs until the cache fits.
+
+        Args:
+            max_bytes: Target cache size
+            keep: Keys that must not be removed
+
+        Returns:
+            Number of outputs removed
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for key, size, _ in entries:
+            if total <= max_bytes:
+                break
+            if key in keep:
+                continue
+            self._meta_path(key).unlink(missing_ok=True)
+            self._data_path(key).unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+
+def preprocess(
+    source: RecordingSource,
+    stages: Sequence[Union[Stage, Mapping[str, Any]]],
+    sampling_rate: Optional[float] = None,
+    channel_names: Optional[Sequence[str]] = None,
+    cache_dir: Optional[Union[str, Path]] = None
+) -> PreprocessedRecording:
+    """Run a preprocessing pipeline with the configured cache.
+
+    Suitable for the compute pool: the result refers to the cached file
+    instead of carrying the samples.
+
+    Args:
+        source: Recording path or in-memory array
+        stages: Stages or ``{"stage": name, **params}`` specifications
+        sampling_rate: Sampling rate, required for arrays
+        channel_names: Channel labels
+        cache_dir: Cache directory, defaults to the configured one
+
+    Returns:
+        The final stage output
+    """
+    from ..config import get_settings
+
+    pipeline = PreprocessingPipeline.from_settings(stages, get_settings())
+    if cache_dir is not None:
+        pipeline.cache_dir = Path(cache_dir)
+    return pipeline.run(source, sampling_rate, channel_names)
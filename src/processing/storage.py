@@ -0,0 +1,599 @@
+"""
+Chunked, compressed HDF5 storage for processed EEG recordings.
+
+A recording file holds a ``(n_channels, n_samples)`` ``data`` dataset split
+into channel x time chunks, the channel names and the recording metadata,
+so a single file replaces the ``eeg_data.npy`` + ``metadata.json`` pair.
+Samples are stored as ``float64``, ``float32`` or ``int16``; ``int16``
+stores each channel quantized over its own value range with the scale and
+offset needed to restore microvolts. Readers decompress only the chunks a
+time range and channel subset touch, which keeps random epoch sampling
+cheap for long recordings.
+
+``h5py`` is imported on first use.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .streaming import ChannelSelection, RecordingReader, Window, _window_step
+
+#: Format identifier stored in the file attributes
+FORMAT_NAME = "bci-recording"
+FORMAT_VERSION = 1
+
+#: Sample types a recording can be stored as
+STORAGE_DTYPES = ("float64", "float32", "int16")
+
+#: Default chunk layout: channels per chunk and seconds of samples per chunk
+DEFAULT_CHUNK_CHANNELS = 16
+DEFAULT_CHUNK_SECONDS = 2.0
+
+#: Chunk cache per open file, large enough to hold the chunks of a window
+#: across all channels so consecutive windows do not decompress twice
+CHUNK_CACHE_BYTES = 32 * 1024 * 1024
+
+_INT16_MAX = np.iinfo(np.int16).max
+
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+def _h5py() -> Any:
+    try:
+        import h5py
+    except ImportError as e:
+        raise ImportError(
+            "HDF5 recording storage requires h5py (pip install h5py)"
+        ) from e
+    return h5py
+
+
+def quantization_params(
+    data: np.ndarray,
+    block_size: int = 1 << 16
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-channel ``int16`` scale and offset covering the value range.
+
+    The recording is scanned block by block, so memory-mapped input is
+    never loaded as a whole.
+
+    Args:
+        data: ``(n_channels, n_samples)`` recording
+        block_size: Samples per channel scanned at a time
+
+    Returns:
+        Tuple of ``scale`` and ``offset`` arrays of shape ``(n_channels,)``;
+        a sample is restored as ``stored * scale + offset``
+    """
+    low = np.full(data.shape[0], np.inf)
+    high = np.full(data.shape[0], -np.inf)
+    for start in range(0, data.shape[1], block_size):
+        block = np.asarray(data[:, start:start + block_size])
+        np.minimum(low, np.nanmin(block, axis=1), out=low)
+        np.maximum(high, np.nanmax(block, axis=1), out=high)
+    offset = (high + low) / 2
+    scale = (high - low) / (2 * _INT16_MAX)
+    # Flat channels still need a usable scale.
+    scale[~(scale > 0)] = 1.0
+    return scale, offset
+
+
+class HDF5RecordingWriter:
+    """Write a recording block by block into a chunked HDF5 file."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        n_channels: int,
+        n_samples: int,
+        sampling_rate: float,
+        dtype: str = "float32",
+        channel_names: Optional[Sequence[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        scale: Optional[ArrayLike] = None,
+        offset: ArrayLike = 0.0,
+        chunk_channels: int = DEFAULT_CHUNK_CHANNELS,
+        chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+        compression: Optional[str] = "gzip",
+        compression_level: int = 4
+    ):
+        """Create the output file.
+
+        Args:
+            path: Destination ``.h5`` file
+            n_channels: Number of channels
+            n_samples: Total number of samples per channel
+            sampling_rate: Sampling rate in Hz
+            dtype: Storage type, one of ``STORAGE_DTYPES``
+            channel_names: Channel labels, generated when omitted
+            metadata: JSON-serializable recording metadata
+            scale: Microvolts per ``int16`` step, per channel or shared;
+                required for ``int16`` (see ``quantization_params``)
+            offset: Value of a stored zero for ``int16``
+            chunk_channels: Channels per chunk
+            chunk_seconds: Seconds of samples per chunk
+            compression: ``gzip``, ``lzf`` or ``None``
+            compression_level: gzip level from 0 to 9
+
+        Raises:
+            ValueError: On an unknown storage type or missing ``int16`` scale
+        """
+        if dtype not in STORAGE_DTYPES:
+            raise ValueError(
+                f"Storage dtype must be one of {STORAGE_DTYPES}, got {dtype}"
+            )
+        if dtype == "int16" and scale is None:
+            raise ValueError("int16 storage requires a quantization scale")
+        names = list(channel_names or [
+            f"Ch{i + 1:02d}" for i in range(n_channels)
+        ])
+        if len(names) != n_channels:
+            raise ValueError(
+                f"Expected {n_channels} channel names, got {len(names)}"
+            )
+        h5py = _h5py()
+
+        self.path = Path(path)
+        self.n_channels = n_channels
+        self.n_samples = n_samples
+        self.dtype = dtype
+        self.position = 0
+        self._scale: Optional[np.ndarray] = None
+        self._offset: Optional[np.ndarray] = None
+        if dtype == "int16":
+            self._scale = np.broadcast_to(
+                np.asarray(scale, dtype=np.float64), (n_channels,)
+            ).copy()
+            self._offset = np.broadcast_to(
+                np.asarray(offset, dtype=np.float64), (n_channels,)
+            ).copy()
+
+        chunks = (
+            max(1, min(chunk_channels, n_channels)),
+            max(1, min(int(round(chunk_seconds * sampling_rate)), n_samples)),
+        )
+        self._file = h5py.File(self.path, "w")
+        self._file.attrs["format"] = FORMAT_NAME
+        self._file.attrs["version"] = FORMAT_VERSION
+        self._file.attrs["sampling_rate"] = float(sampling_rate)
+        self._file.attrs["metadata"] = json.dumps(metadata or {}, default=str)
+        self._data = self._file.create_dataset(
+            "data",
+            shape=(n_channels, n_samples),
+            dtype=dtype,
+            chunks=chunks,
+            compression=compression,
+            compression_opts=(
+                compression_level if compression == "gzip" else None
+            ),
+            # Byte shuffling groups the slowly varying high bytes of
+            # neighbouring samples, which compresses markedly better.
+            shuffle=compression is not None,
+        )
+        self._file.create_dataset(
+            "channels", data=names, dtype=h5py.string_dtype()
+        )
+        if self._scale is not None:
+            self._file.create_dataset("scale", data=self._scale)
+            self._file.create_dataset("offset", data=self._offset)
+
+    def write(self, block: np.ndarray) -> None:
+        """Append a ``(n_channels, k)`` block of samples.
+
+        Raises:
+            ValueError: If the block shape does not fit the recording
+        """
+        if self._file is None:
+            raise ValueError("Recording writer is closed")
+        if block.ndim != 2 or block.shape[0] != self.n_channels:
+            raise ValueError(
+                f"Expected a ({self.n_channels}, k) block, got {block.shape}"
+            )
+        stop = self.position + block.shape[1]
+        if stop > self.n_samples:
+            raise ValueError(
+                f"Block overruns recording of {self.n_samples} samples"
+            )
+        if self._scale is not None and self._offset is not None:
+            block = np.clip(
+                np.rint(
+                    (block - self._offset[:, None]) / self._scale[:, None]
+                ),
+                -_INT16_MAX,
+                _INT16_MAX,
+            )
+        self._data[:, self.position:stop] = block
+        self.position = stop
+
+    def close(self) -> None:
+        """Flush the file and close it."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "HDF5RecordingWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class HDF5RecordingReader:
+    """Random access to a recording stored by ``HDF5RecordingWriter``.
+
+    Reads return ``float32`` arrays (``float64`` for recordings stored as
+    ``float64``), with ``int16`` recordings restored to microvolts.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """Open a recording file.
+
+        Args:
+            path: ``.h5`` file written by ``HDF5RecordingWriter``
+        """
+        h5py = _h5py()
+        self.path = Path(path)
+        self._file = h5py.File(self.path, "r", rdcc_nbytes=CHUNK_CACHE_BYTES)
+        if self._file.attrs.get("format") != FORMAT_NAME:
+            self._file.close()
+            raise ValueError(f"{self.path} is not a {FORMAT_NAME} file")
+        self._data = self._file["data"]
+        self.sampling_rate = float(self._file.attrs["sampling_rate"])
+        self.metadata: Dict[str, Any] = json.loads(
+            self._file.attrs.get("metadata", "{}")
+        )
+        self.metadata.setdefault("sampling_rate", self.sampling_rate)
+        self._channel_names = [
+            name.decode() if isinstance(name, bytes) else name
+            for name in self._file["channels"][()]
+        ]
+        self._scale: Optional[np.ndarray] = None
+        self._offset: Optional[np.ndarray] = None
+        if "scale" in self._file:
+            self._scale = self._file["scale"][()].astype(np.float32)
+            self._offset = self._file["offset"][()].astype(np.float32)
+
+    @property
+    def n_channels(self) -> int:
+        """Number of channels in the recording."""
+        return self._data.shape[0]
+
+    @property
+    def n_samples(self) -> int:
+        """Number of samples per channel."""
+        return self._data.shape[1]
+
+    @property
+    def channel_names(self) -> Sequence[str]:
+        """Channel names stored with the recording."""
+        return self._channel_names
+
+    @property
+    def storage_dtype(self) -> str:
+        """Type the samples are stored as."""
+        return str(self._data.dtype)
+
+    @property
+    def chunks(self) -> Tuple[int, int]:
+        """Chunk shape as ``(channels, samples)``."""
+        return self._data.chunks
+
+    def _to_samples(self, seconds: float) -> int:
+        return int(round(seconds * self.sampling_rate))
+
+    def _channel_indices(self, channels: ChannelSelection) -> np.ndarray:
+        if channels is None:
+            return np.arange(self.n_channels)
+        if isinstance(channels, slice):
+            return np.arange(self.n_channels)[channels]
+        return np.arange(self.n_channels)[np.asarray(channels, dtype=np.intp)]
+
+    def read(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        channels: ChannelSelection = None
+    ) -> np.ndarray:
+        """Read a sample range of selected channels.
+
+        Only the chunks overlapping the selection are decompressed.
+
+        Args:
+            start: First sample (inclusive)
+            stop: Last sample (exclusive), defaults to the end
+            channels: Optional channel slice or index sequence, in any order
+
+        Returns:
+            ``(n_selected_channels, stop - start)`` array
+        """
+        start = min(max(0, start), self.n_samples)
+        stop = self.n_samples if stop is None else min(stop, self.n_samples)
+        stop = max(start, stop)
+        indices = self._channel_indices(channels)
+        if indices.size == 0:
+            raw = np.empty((0, stop - start), dtype=self._data.dtype)
+        elif np.array_equal(indices, np.arange(self.n_channels)):
+            raw = self._data[:, start:stop]
+        elif np.all(np.diff(indices) > 0):
+            raw = self._data[indices, start:stop]
+        else:
+            # HDF5 selections must be increasing and unique.
+            unique, inverse = np.unique(indices, return_inverse=True)
+            raw = self._data[unique, start:stop][inverse]
+        return self._restore(raw, indices)
+
+    def read_seconds(
+        self,
+        start: float,
+        stop: Optional[float] = None,
+        channels: ChannelSelection = None
+    ) -> np.ndarray:
+        """Read a time range given in seconds."""
+        return self.read(
+            self._to_samples(start),
+            None if stop is None else self._to_samples(stop),
+            channels,
+        )
+
+    def read_epochs(
+        self,
+        starts: Sequence[int],
+        length: int,
+        channels: ChannelSelection = None
+    ) -> np.ndarray:
+        """Read equally long epochs at arbitrary sample offsets.
+
+        Epochs are read in increasing offset order so neighbouring epochs
+        share decompressed chunks through the chunk cache.
+
+        Args:
+            starts: First sample of every epoch
+            length: Samples per epoch
+            channels: Optional channel slice or index sequence
+
+        Returns:
+            ``(n_epochs, n_selected_channels, length)`` array in the order of
+            ``starts``
+
+        Raises:
+            ValueError: If an epoch extends past the recording
+        """
+        offsets = np.asarray(starts, dtype=np.int64)
+        if offsets.size and (
+            offsets.min() < 0 or offsets.max() + length > self.n_samples
+        ):
+            raise ValueError("Epoch extends past the recording")
+        n_channels = self._channel_indices(channels).size
+        epochs = np.empty(
+            (offsets.size, n_channels, length), dtype=self._output_dtype()
+        )
+        for i in np.argsort(offsets, kind="stable"):
+            start = int(offsets[i])
+            epochs[i] = self.read(start, start + length, channels)
+        return epochs
+
+    def windows(
+        self,
+        window_size: Optional[int] = None,
+        overlap: int = 0,
+        channels: ChannelSelection = None,
+        window_seconds: Optional[float] = None,
+        overlap_seconds: Optional[float] = None,
+        drop_last: bool = True,
+        first: int = 0,
+        last: Optional[int] = None
+    ) -> Iterator[Window]:
+        """Iterate over windows of the recording, as ``RecordingReader``.
+
+        Each window decompresses only the chunks it overlaps, so a long
+        recording is consumed in memory bounded by the window size.
+
+        Args:
+            first: First sample of the range to window (inclusive)
+            last: Last sample of the range to window (exclusive), defaults
+                to the end
+
+        Yields:
+            Windows in temporal order
+        """
+        if window_seconds is not None:
+            window_size = self._to_samples(window_seconds)
+        if overlap_seconds is not None:
+            overlap = self._to_samples(overlap_seconds)
+        if window_size is None:
+            raise ValueError("window_size or window_seconds is required")
+        step = _window_step(window_size, overlap)
+        first = min(max(0, first), self.n_samples)
+        last = self.n_samples if last is None else min(last, self.n_samples)
+        index = 0
+        for start in range(first, last, step):
+            stop = start + window_size
+            if stop > last:
+                if drop_last:
+                    break
+                stop = last
+            yield Window(index, start, stop, self.read(start, stop, channels))
+            index += 1
+            if stop == last:
+                break
+
+    def _output_dtype(self) -> np.dtype:
+        if self._data.dtype == np.float64:
+            return np.dtype(np.float64)
+        return np.dtype(np.float32)
+
+    def _restore(self, raw: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        data = raw.astype(self._output_dtype(), copy=False)
+        if self._scale is not None and self._offset is not None:
+            data *= self._scale[indices, None]
+            data += self._offset[indices, None]
+        return data
+
+    def close(self) -> None:
+        """Close the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "HDF5RecordingReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def write_recording(
+    path: Union[str, Path],
+    data: np.ndarray,
+    sampling_rate: float,
+    dtype: str = "float32",
+    channel_names: Optional[Sequence[str]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    block_size: int = 1 << 16,
+    **options: Any
+) -> Path:
+    """Store a whole recording, block by block.
+
+    Args:
+        path: Destination ``.h5`` file
+        data: ``(n_channels, n_samples)`` recording, may be memory-mapped
+        sampling_rate: Sampling rate in Hz
+        dtype: Storage type; ``int16`` quantizes each channel over its range
+        channel_names: Channel labels
+        metadata: JSON-serializable recording metadata
+        block_size: Samples per channel copied at a time
+        **options: Chunking and compression options of
+            ``HDF5RecordingWriter``
+
+    Returns:
+        Path of the written file
+    """
+    if dtype == "int16" and "scale" not in options:
+        options["scale"], options["offset"] = quantization_params(
+            data, block_size
+        )
+    n_channels, n_samples = data.shape
+    with HDF5RecordingWriter(
+        path, n_channels, n_samples, sampling_rate, dtype,
+        channel_names=channel_names, metadata=metadata, **options
+    ) as writer:
+        for start in range(0, n_samples, block_size):
+            writer.write(np.asarray(data[:, start:start + block_size]))
+    return Path(path)
+
+
+def convert_recording(
+    source: Union[str, Path],
+    destination: Optional[Union[str, Path]] = None,
+    dtype: str = "float32",
+    **options: Any
+) -> Path:
+    """Convert an ``.npy`` recording to the HDF5 format.
+
+    Args:
+        source: ``.npy`` file, or a directory holding ``eeg_data.npy`` and
+            ``metadata.json``
+        destination: Output file, defaults to ``recording.h5`` in the
+            directory or the ``.npy`` path with an ``.h5`` suffix
+        dtype: Storage type, one of ``STORAGE_DTYPES``
+        **options: Options of ``write_recording``
+
+    Returns:
+        Path of the written file
+    """
+    source = Path(source)
+    if source.is_dir():
+        reader = RecordingReader.from_directory(source)
+        default = source / "recording.h5"
+    else:
+        reader = RecordingReader(source)
+        default = source.with_suffix(".h5")
+    if not reader.sampling_rate:
+        raise ValueError(f"Sampling rate of {source} is unknown")
+    metadata = {
+        k: v for k, v in reader.metadata.items()
+        if k not in ("channels", "sampling_rate")
+    }
+    return write_recording(
+        destination or default,
+        reader.data,
+        reader.sampling_rate,
+        dtype,
+        channel_names=reader.channel_names,
+        metadata=metadata,
+        **options
+    )
+
+
+def is_hdf5_recording(path: Union[str, Path]) -> bool:
+    """Whether a path names an HDF5 recording file."""
+    return Path(path).suffix.lower() in (".h5", ".hdf5")
+
+
+def resolve_recording_path(path: Union[str, Path]) -> Path:
+    """Resolve a recording directory to the file holding its samples.
+
+    Directories resolve to ``recording.h5`` when present, otherwise to
+    ``eeg_data.npy``; file paths are returned unchanged.
+    """
+    path = Path(path)
+    if not path.is_dir():
+        return path
+    if (path / "recording.h5").exists():
+        return path / "recording.h5"
+    return path / "eeg_data.npy"
+
+
+def read_recording(
+    path: Union[str, Path],
+    start: Optional[float] = None,
+    stop: Optional[float] = None,
+    channels: ChannelSelection = None,
+    sampling_rate: Optional[float] = None
+) -> Tuple[np.ndarray, Optional[float], Sequence[str]]:
+    """Open a recording, or a time range of it, in any supported layout.
+
+    Args:
+        path: ``.npy`` file, HDF5 recording, or a directory holding
+            ``recording.h5`` or ``eeg_data.npy`` and ``metadata.json``
+        start: Start of the time range in seconds, defaults to the start
+        stop: End of the time range in seconds, defaults to the end
+        channels: Optional channel slice or index sequence
+        sampling_rate: Sampling rate in Hz, overrides the one stored with
+            the recording
+
+    Returns:
+        Tuple of samples, sampling rate (``None`` when unknown) and the
+        names of the selected channels. ``.npy`` samples are memory-mapped;
+        for HDF5 recordings only the chunks of the range are decompressed.
+
+    Raises:
+        ValueError: If a time range is requested and the sampling rate is
+            unknown
+    """
+    path = Path(path)
+    resolved = resolve_recording_path(path)
+    if is_hdf5_recording(resolved):
+        with HDF5RecordingReader(resolved) as h5_reader:
+            if sampling_rate:
+                h5_reader.sampling_rate = float(sampling_rate)
+            data = h5_reader.read_seconds(start or 0.0, stop, channels)
+            names = h5_reader.channel_names
+            rate: Optional[float] = h5_reader.sampling_rate
+    else:
+        reader = (
+            RecordingReader.from_directory(path) if path.is_dir()
+            else RecordingReader(path)
+        )
+        reader.sampling_rate = sampling_rate or reader.sampling_rate
+        first = max(0, reader._to_samples(start)) if start else 0
+        last = reader._to_samples(stop) if stop is not None else None
+        data = reader.read(first, last, channels)
+        names = reader.channel_names
+        rate = reader.sampling_rate
+    if channels is not None:
+        names = list(np.asarray(names, dtype=object)[channels])
+    return data, rate, names
@@ -0,0 +1,292 @@
+"""
+Streaming access to EEG recordings stored as ``.npy`` arrays.
+
+Recordings are laid out as ``(n_channels, n_samples)`` arrays. Writers fill a
+memory-mapped file block by block and readers expose the file as a sequence
+of fixed-size windows over ``np.load(mmap_mode="r")``, so memory use is
+bounded by the window size rather than the recording length.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Union
+
+import numpy as np
+
+ChannelSelection = Union[None, slice, Sequence[int], np.ndarray]
+
+
+@dataclass
+class Window:
+    """A window of samples taken from a recording.
+
+    Attributes:
+        index: Sequential window number
+        start: First sample index (inclusive)
+        stop: Last sample index (exclusive)
+        data: ``(n_channels, stop - start)`` array, a view where possible
+    """
+
+    index: int
+    start: int
+    stop: int
+    data: np.ndarray
+
+
+def _window_step(window_size: int, overlap: int) -> int:
+    if window_size < 1:
+        raise ValueError("window_size must be at least 1")
+    if not 0 <= overlap < window_size:
+        raise ValueError("overlap must be in [0, window_size)")
+    return window_size - overlap
+
+
+def _as_slice(
+    channels: ChannelSelection,
+    n_channels: int
+) -> Optional[slice]:
+    """Express a channel selection as a slice when it is evenly spaced.
+
+    Selections reaching past ``n_channels`` are not converted, since a
+    slice would silently clamp where an index list raises ``IndexError``.
+    """
+    if channels is None:
+        return slice(None)
+    if isinstance(channels, slice):
+        return channels
+    indices = np.asarray(channels, dtype=np.intp).ravel()
+    if indices.size == 0 or indices[0] < 0 or indices[-1] >= n_channels:
+        return None
+    if indices.size == 1:
+        return slice(int(indices[0]), int(indices[0]) + 1)
+    steps = np.diff(indices)
+    if steps[0] > 0 and np.all(steps == steps[0]):
+        return slice(int(indices[0]), int(indices[-1]) + 1, int(steps[0]))
+    return None
+
+
+def _select(
+    data: np.ndarray,
+    channels: ChannelSelection,
+    start: int = 0,
+    stop: Optional[int] = None
+) -> np.ndarray:
+    """Select channels and samples, copying only for irregular channel lists."""
+    channel_slice = _as_slice(channels, data.shape[0])
+    if channel_slice is not None:
+        return data[channel_slice, start:stop]
+    return data[:, start:stop][np.asarray(channels, dtype=np.intp)]
+
+
+def iter_windows(
+    data: np.ndarray,
+    window_size: int,
+    overlap: int = 0,
+    channels: ChannelSelection = None,
+    drop_last: bool = True
+) -> Iterator[Window]:
+    """Iterate over fixed-size windows of a ``(n_channels, n_samples)`` array.
+    
+    Channel selections that can be expressed as slices yield views into
+    ``data``; arbitrary index lists copy only the current window.
+    
+    Args:
+        data: Recording array, typically memory-mapped
+        window_size: Number of samples per window
+        overlap: Number of samples shared by consecutive windows
+        channels: Optional channel slice or index sequence
+        drop_last: Skip a trailing window shorter than ``window_size``
+        
+    Yields:
+        Windows in temporal order
+    """
+    step = _window_step(window_size, overlap)
+    n_samples = data.shape[-1]
+    index = 0
+    for start in range(0, n_samples, step):
+        stop = start + window_size
+        if stop > n_samples:
+            if drop_last:
+                break
+            stop = n_samples
+        yield Window(index, start, stop, _select(data, channels, start, stop))
+        index += 1
+        if stop == n_samples:
+            break
+
+
+def window_view(
+    data: np.ndarray,
+    window_size: int,
+    overlap: int = 0
+) -> np.ndarray:
+    """Return all full windows as a zero-copy strided view.
+    
+    Args:
+        data: ``(n_channels, n_samples)`` recording array
+        window_size: Number of samples per window
+        overlap: Number of samples shared by consecutive windows
+        
+    Returns:
+        Read-only ``(n_windows, n_channels, window_size)`` view
+    """
+    step = _window_step(window_size, overlap)
+    windows = np.lib.stride_tricks.sliding_window_view(
+        data, window_size, axis=-1
+    )[..., ::step, :]
+    return np.moveaxis(windows, -2, 0)
+
+
+class RecordingWriter:
+    """Write a recording block by block into a memory-mapped ``.npy`` file."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        n_channels: int,
+        n_samples: int,
+        dtype: Any = np.float64
+    ):
+        """Create the output file.
+        
+        Args:
+            path: Destination ``.npy`` file
+            n_channels: Number of channels
+            n_samples: Total number of samples per channel
+            dtype: Sample data type
+        """
+        self.path = Path(path)
+        self.n_channels = n_channels
+        self.n_samples = n_samples
+        self.position = 0
+        self._array: Optional[np.memmap] = np.lib.format.open_memmap(
+            self.path, mode="w+", dtype=dtype, shape=(n_channels, n_samples)
+        )
+
+    def write(self, block: np.ndarray) -> None:
+        """Append a ``(n_channels, k)`` block of samples.
+        
+        Raises:
+            ValueError: If the block shape does not fit the recording
+        """
+        if self._array is None:
+            raise ValueError("Recording writer is closed")
+        if block.ndim != 2 or block.shape[0] != self.n_channels:
+            raise ValueError(
+                f"Expected a ({self.n_channels}, k) block, got {block.shape}"
+            )
+        stop = self.position + block.shape[1]
+        if stop > self.n_samples:
+            raise ValueError(
+                f"Block overruns recording of {self.n_samples} samples"
+            )
+        self._array[:, self.position:stop] = block
+        self.position = stop
+
+    def close(self) -> None:
+        """Flush written samples to disk and release the mapping."""
+        if self._array is not None:
+            self._array.flush()
+            self._array = None
+
+    def __enter__(self) -> "RecordingWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class RecordingReader:
+    """Read a recording incrementally through a read-only memory map."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        sampling_rate: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Open a recording.
+        
+        Args:
+            path: ``.npy`` file holding a ``(n_channels, n_samples)`` array
+            sampling_rate: Sampling rate in Hz, overrides the metadata
+            metadata: Recording metadata such as channel names
+        """
+        self.path = Path(path)
+        self.metadata = metadata or {}
+        self.data: np.ndarray = np.load(self.path, mmap_mode="r")
+        if self.data.ndim != 2:
+            raise ValueError(
+                f"Expected a (n_channels, n_samples) array in {self.path}"
+            )
+        self.sampling_rate = sampling_rate or self.metadata.get("sampling_rate")
+
+    @classmethod
+    def from_directory(cls, directory: Union[str, Path]) -> "RecordingReader":
+        """Open ``eeg_data.npy`` with its ``metadata.json`` sidecar."""
+        directory = Path(directory)
+        metadata_path = directory / "metadata.json"
+        metadata = {}
+        if metadata_path.exists():
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+        return cls(directory / "eeg_data.npy", metadata=metadata)
+
+    @property
+    def n_channels(self) -> int:
+        """Number of channels in the recording."""
+        return self.data.shape[0]
+
+    @property
+    def n_samples(self) -> int:
+        """Number of samples per channel."""
+        return self.data.shape[1]
+
+    @property
+    def channel_names(self) -> Sequence[str]:
+        """Channel names from the metadata, or generated defaults."""
+        return self.metadata.get("channels") or [
+            f"Ch{i + 1:02d}" for i in range(self.n_channels)
+        ]
+
+    def _to_samples(self, seconds: float) -> int:
+        if not self.sampling_rate:
+            raise ValueError("Sampling rate is unknown for this recording")
+        return int(round(seconds * self.sampling_rate))
+
+    def windows(
+        self,
+        window_size: Optional[int] = None,
+        overlap: int = 0,
+        channels: ChannelSelection = None,
+        window_seconds: Optional[float] = None,
+        overlap_seconds: Optional[float] = None,
+        drop_last: bool = True
+    ) -> Iterator[Window]:
+        """Iterate over windows of the recording.
+        
+        Sizes may be given in samples or, when the sampling rate is known,
+        in seconds.
+        
+        Yields:
+            Windows in temporal order
+        """
+        if window_seconds is not None:
+            window_size = self._to_samples(window_seconds)
+        if overlap_seconds is not None:
+            overlap = self._to_samples(overlap_seconds)
+        if window_size is None:
+            raise ValueError("window_size or window_seconds is required")
+        return iter_windows(
+            self.data, window_size, overlap, channels, drop_last
+        )
+
+    def read(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        channels: ChannelSelection = None
+    ) -> np.ndarray:
+        """Return a sample range, as a view where the selection allows."""
+        return _select(self.data, channels, start, stop)
@@ -0,0 +1,3 @@
+"""
+Services backing the research agents.
+"""
@@ -0,0 +1,329 @@
+"""
+Asynchronous client for remote dataset catalogs.
+
+Catalog pages from OpenNeuro and PhysioNet are fetched concurrently over a
+single pooled HTTP connection set, with bounded parallelism, timeouts,
+retries with exponential backoff, and conditional requests so that
+unchanged pages cost a ``304 Not Modified`` round-trip instead of a full
+download. Page validators can be persisted in a cache directory, so the
+savings carry over between processes.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import httpx
+from loguru import logger
+
+from ..utils.http import parse_retry_after
+
+RETRY_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class _CachedResponse:
+    """Validators and body of a previously fetched catalog page."""
+
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: Any
+
+
+class CatalogError(RuntimeError):
+    """Raised when a catalog page cannot be fetched."""
+
+
+class CatalogClient:
+    """Fetch dataset listings from OpenNeuro and PhysioNet."""
+
+    def __init__(
+        self,
+        openneuro_url: str = "https://openneuro.org/crn/api",
+        physionet_url: str = "https://physionet.org/api",
+        max_concurrency: int = 8,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        page_size: int = 100,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache_dir: Optional[Union[str, Path]] = None
+    ):
+        """Initialize the client.
+
+        Args:
+            openneuro_url: Base URL of the OpenNeuro API
+            physionet_url: Base URL of the PhysioNet API
+            max_concurrency: Maximum number of requests in flight
+            timeout: Per-request timeout in seconds
+            max_retries: Retries after a failed attempt
+            backoff: Base delay in seconds, doubled after every retry
+            page_size: Datasets requested per page
+            transport: Optional transport, e.g. ``httpx.MockTransport`` for
+                tests against a local stub
+            cache_dir: Directory persisting the validators and bodies of
+                fetched pages; they are kept in memory only when omitted
+        """
+        self.openneuro_url = openneuro_url.rstrip("/")
+        self.physionet_url = physionet_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.page_size = page_size
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._validators: Dict[Tuple[str, str], _CachedResponse] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Any, **kwargs: Any) -> "CatalogClient":
+        """Create a client for the API endpoints in application settings."""
+        kwargs.setdefault("cache_dir", settings.catalog_cache_dir)
+        return cls(
+            openneuro_url=settings.openneuro_api_url,
+            physionet_url=settings.physionet_api_url,
+            **kwargs
+        )
+
+    async def __aenter__(self) -> "CatalogClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by every request."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                headers={"Accept": "application/json"},
+                follow_redirects=True,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return retry_after
+        delay = self.backoff * (2 ** attempt)
+        return delay + random.uniform(0, delay / 2)
+
+    def _cache_path(self, key: Tuple[str, str]) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def _load_cached(self, key: Tuple[str, str]) -> Optional[_CachedResponse]:
+        path = self._cache_path(key)
+        if path is None:
+            return None
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            return _CachedResponse(
+                entry["etag"], entry["last_modified"], entry["body"]
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Ignoring unreadable catalog cache {path}: {e}")
+            return None
+
+    def _store_cached(
+        self,
+        key: Tuple[str, str],
+        cached: _CachedResponse
+    ) -> None:
+        path = self._cache_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+            tmp.write_text(json.dumps(asdict(cached)), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not persist catalog cache {path}: {e}")
+
+    async def _cached(self, key: Tuple[str, str]) -> Optional[_CachedResponse]:
+        """Validators of a page, from memory or the cache directory."""
+        cached = self._validators.get(key)
+        if cached is None and self.cache_dir is not None:
+            cached = await asyncio.to_thread(self._load_cached, key)
+            if cached is not None:
+                self._validators[key] = cached
+        return cached
+
+    async def get_json(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """Fetch and decode a JSON document.
+
+        Previously seen pages are revalidated with ``If-None-Match`` and
+        ``If-Modified-Since``; a ``304`` response reuses the cached body.
+
+        Raises:
+            CatalogError: When the page cannot be fetched after all retries
+        """
+        key = (url, str(sorted((params or {}).items())))
+        cached = await self._cached(key)
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with self._semaphore:
+                    response = await self.client.get(
+                        url, params=params, headers=headers
+                    )
+                if response.status_code == 304 and cached is not None:
+                    return cached.body
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    body = response.json()
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if etag or last_modified:
+                        self._validators[key] = _CachedResponse(
+                            etag, last_modified, body
+                        )
+                        await asyncio.to_thread(
+                            self._store_cached, key, self._validators[key]
+                        )
+                    return body
+                last_error = CatalogError(
+                    f"{url} returned HTTP {response.status_code}"
+                )
+            except httpx.TransportError as e:
+                last_error = e
+            except (httpx.HTTPStatusError, ValueError) as e:
+                raise CatalogError(f"Failed to fetch {url}: {e}") from e
+
+            if attempt < self.max_retries:
+                delay = self._retry_delay(attempt, response)
+                logger.debug(
+                    f"Retrying {url} in {delay:.2f}s after: {last_error}"
+                )
+                await asyncio.sleep(delay)
+
+        raise CatalogError(f"Failed to fetch {url}: {last_error}")
+
+    @staticmethod
+    def _items(body: Any) -> List[Dict[str, Any]]:
+        if isinstance(body, dict):
+            for field in ("datasets", "results", "projects", "data"):
+                if isinstance(body.get(field), list):
+                    return body[field]
+            return []
+        return list(body or [])
+
+    async def list_openneuro(
+        self,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """List OpenNeuro datasets, fetching pages concurrently.
+
+        After the first page, pages are requested in waves of
+        ``max_concurrency`` until a short page marks the end of the
+        catalog or ``limit`` datasets have been collected.
+
+        Args:
+            limit: Maximum number of datasets, the whole catalog if ``None``
+        """
+        url = f"{self.openneuro_url}/datasets"
+        page_size = min(self.page_size, limit) if limit else self.page_size
+
+        async def page(offset: int) -> List[Dict[str, Any]]:
+            body = await self.get_json(
+                url, {"limit": page_size, "offset": offset}
+            )
+            return self._items(body)
+
+        datasets = await page(0)
+        offset = len(datasets)
+        exhausted = len(datasets) < page_size
+        while not exhausted and (limit is None or offset < limit):
+            offsets = [
+                offset + i * page_size for i in range(self.max_concurrency)
+            ]
+            if limit is not None:
+                offsets = [o for o in offsets if o < limit]
+            pages = await asyncio.gather(*(page(o) for o in offsets))
+            for items in pages:
+                datasets.extend(items)
+                if len(items) < page_size:
+                    exhausted = True
+                    break
+            offset = offsets[-1] + page_size
+
+        for dataset in datasets:
+            dataset.setdefault("source", "openneuro")
+        return datasets[:limit] if limit else datasets
+
+    async def list_physionet(self) -> List[Dict[str, Any]]:
+        """List published PhysioNet projects."""
+        body = await self.get_json(
+            f"{self.physionet_url}/v1/project/published/"
+        )
+        projects = self._items(body)
+        for project in projects:
+            project.setdefault("source", "physionet")
+        return projects
+
+    async def fetch_catalog(
+        self,
+        sources: Iterable[str] = ("openneuro", "physionet"),
+        limit: Optional[int] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch several catalogs concurrently.
+
+        A source that fails is logged and reported as an empty listing so
+        one unavailable catalog does not hide the others.
+
+        Returns:
+            Dataset listings keyed by source name
+        """
+        fetchers = {
+            "openneuro": lambda: self.list_openneuro(limit),
+            "physionet": self.list_physionet,
+        }
+        names = [name for name in sources if name in fetchers]
+        results = await asyncio.gather(
+            *(fetchers[name]() for name in names), return_exceptions=True
+        )
+        catalog: Dict[str, List[Dict[str, Any]]] = {}
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to fetch {name} catalog: {result}")
+                result = []
+            catalog[name] = result
+        return catalog
@@ -0,0 +1,442 @@
+"""
+Local dataset metadata index backed by SQLite.
+
+Catalog entries from every source are normalized into one table with B-tree
+indexes on the structured facets (source, modality, subjects, sampling rate,
+tasks) and an FTS5 table over names, descriptions and tasks. Structured
+filters and keyword search are answered locally in milliseconds.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    modality TEXT,
+    n_subjects INTEGER,
+    n_channels INTEGER,
+    sampling_rate REAL,
+    tasks TEXT NOT NULL DEFAULT '',
+    metadata TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_datasets_source ON datasets(source);
+CREATE INDEX IF NOT EXISTS idx_datasets_modality ON datasets(modality);
+CREATE INDEX IF NOT EXISTS idx_datasets_subjects ON datasets(n_subjects);
+CREATE INDEX IF NOT EXISTS idx_datasets_sampling_rate
+    ON datasets(sampling_rate);
+
+CREATE TABLE IF NOT EXISTS dataset_tasks (
+    dataset_rowid INTEGER NOT NULL
+        REFERENCES datasets(rowid) ON DELETE CASCADE,
+    task TEXT NOT NULL,
+    PRIMARY KEY (task, dataset_rowid)
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS datasets_fts USING fts5(
+    name, description, tasks,
+    content='datasets', content_rowid='rowid',
+    tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS datasets_ai AFTER INSERT ON datasets BEGIN
+    INSERT INTO datasets_fts(rowid, name, description, tasks)
+    VALUES (new.rowid, new.name, new.description, new.tasks);
+END;
+CREATE TRIGGER IF NOT EXISTS datasets_ad AFTER DELETE ON datasets BEGIN
+    INSERT INTO datasets_fts(datasets_fts, rowid, name, description, tasks)
+    VALUES ('delete', old.rowid, old.name, old.description, old.tasks);
+END;
+CREATE TRIGGER IF NOT EXISTS datasets_au AFTER UPDATE ON datasets BEGIN
+    INSERT INTO datasets_fts(datasets_fts, rowid, name, description, tasks)
+    VALUES ('delete', old.rowid, old.name, old.description, old.tasks);
+    INSERT INTO datasets_fts(rowid, name, description, tasks)
+    VALUES (new.rowid, new.name, new.description, new.tasks);
+END;
+"""
+
+
+@dataclass
+class DatasetRecord:
+    """Normalized dataset metadata shared by all catalog sources."""
+
+    id: str
+    source: str
+    name: str
+    description: str = ""
+    modality: Optional[str] = None
+    n_subjects: Optional[int] = None
+    n_channels: Optional[int] = None
+    sampling_rate: Optional[float] = None
+    tasks: List[str] = field(default_factory=list)
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a plain dictionary."""
+        return asdict(self)
+
+
+def _first(entry: Dict[str, Any], *keys: str) -> Any:
+    for key in keys:
+        value = entry.get(key)
+        if value not in (None, "", []):
+            return value
+    return None
+
+
+def _as_number(value: Any, kind: type) -> Any:
+    try:
+        return kind(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_task(task: str) -> str:
+    """Canonical task label, e.g. ``Motor Imagery`` -> ``motor_imagery``."""
+    return re.sub(r"[^a-z0-9]+", "_", str(task).lower()).strip("_")
+
+
+def normalize_entry(
+    entry: Dict[str, Any],
+    source: Optional[str] = None
+) -> DatasetRecord:
+    """Map a raw catalog entry onto a ``DatasetRecord``.
+
+    Args:
+        entry: Entry as returned by a catalog API or curated list
+        source: Source name, defaults to ``entry["source"]``
+
+    Returns:
+        Normalized record
+
+    Raises:
+        ValueError: If the entry has no identifier
+    """
+    metadata = entry.get("metadata") or {}
+    merged = {**metadata, **entry}
+    dataset_id = _first(merged, "id", "accession", "slug", "label")
+    if dataset_id is None:
+        raise ValueError(f"Catalog entry has no identifier: {entry}")
+
+    modality = _first(merged, "modality", "modalities")
+    if isinstance(modality, (list, tuple)):
+        modality = modality[0] if modality else None
+    tasks = _first(merged, "tasks") or []
+    if isinstance(tasks, str):
+        tasks = [tasks]
+
+    return DatasetRecord(
+        id=str(dataset_id),
+        source=str(source or merged.get("source") or "unknown"),
+        name=str(_first(merged, "name", "title", "label") or dataset_id),
+        description=str(
+            _first(merged, "description", "short_description", "abstract")
+            or ""
+        ),
+        modality=str(modality).upper() if modality else None,
+        n_subjects=_as_number(
+            _first(merged, "n_subjects", "subjects", "participants"), int
+        ),
+        n_channels=_as_number(_first(merged, "n_channels", "channels"), int),
+        sampling_rate=_as_number(_first(merged, "sampling_rate"), float),
+        tasks=sorted({normalize_task(task) for task in tasks}),
+        metadata=metadata,
+    )
+
+
+def _fts_query(text: str, operator: str = "AND") -> Optional[str]:
+    """Turn free text into an FTS5 query over its quoted terms."""
+    terms = re.findall(r"\w+", text.lower())
+    if not terms:
+        return None
+    return f" {operator} ".join(f'"{term}"' for term in dict.fromkeys(terms))
+
+
+def sqlite_path(database_url: str) -> str:
+    """Extract the database path from a ``sqlite:///`` URL."""
+    prefix = "sqlite:///"
+    if not database_url.startswith(prefix):
+        raise ValueError(
+            f"Dataset index requires a SQLite database URL, got {database_url}"
+        )
+    return database_url[len(prefix):] or ":memory:"
+
+
+class DatasetIndex:
+    """Persistent, faceted dataset search over SQLite and FTS5."""
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        """Initialize the index; the database is opened on first use.
+
+        Args:
+            path: SQLite database file, or ``:memory:``
+        """
+        self.path = str(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "DatasetIndex":
+        """Create an index stored in the configured database."""
+        return cls(sqlite_path(settings.database_url))
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open connection with the schema in place."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys = ON")
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM datasets").fetchone()[0]
+
+    def upsert(self, records: Iterable[DatasetRecord]) -> int:
+        """Insert or update records in a single transaction.
+
+        Returns:
+            Number of records written
+        """
+        count = 0
+        with self._lock, self.conn as conn:
+            for record in records:
+                tasks = sorted({normalize_task(task) for task in record.tasks})
+                conn.execute(
+                    """
+                    INSERT INTO datasets (
+                        id, source, name, description, modality, n_subjects,
+                        n_channels, sampling_rate, tasks, metadata
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        source = excluded.source,
+                        name = excluded.name,
+                        description = excluded.description,
+                        modality = excluded.modality,
+                        n_subjects = excluded.n_subjects,
+                        n_channels = excluded.n_channels,
+                        sampling_rate = excluded.sampling_rate,
+                        tasks = excluded.tasks,
+                        metadata = excluded.metadata
+                    """,
+                    (
+                        record.id, record.source, record.name,
+                        record.description, record.modality,
+                        record.n_subjects, record.n_channels,
+                        record.sampling_rate, " ".join(tasks),
+                        json.dumps(record.metadata, default=str),
+                    ),
+                )
+                rowid = conn.execute(
+                    "SELECT rowid FROM datasets WHERE id = ?", (record.id,)
+                ).fetchone()[0]
+                conn.execute(
+                    "DELETE FROM dataset_tasks WHERE dataset_rowid = ?",
+                    (rowid,),
+                )
+                conn.executemany(
+                    "INSERT INTO dataset_tasks (dataset_rowid, task) "
+                    "VALUES (?, ?)",
+                    [(rowid, task) for task in tasks],
+                )
+                count += 1
+        return count
+
+    def upsert_catalog(self, catalog: Dict[str, List[Dict[str, Any]]]) -> int:
+        """Normalize and store raw listings keyed by source name.
+
+        Entries without an identifier are skipped.
+
+        Returns:
+            Number of records written
+        """
+        records = []
+        for source, entries in catalog.items():
+            for entry in entries:
+                try:
+                    records.append(normalize_entry(entry, source))
+                except ValueError:
+                    continue
+        return self.upsert(records)
+
+    def get(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        """Return a dataset by identifier."""
+        row = self.conn.execute(
+            "SELECT * FROM datasets WHERE id = ?", (dataset_id,)
+        ).fetchone()
+        return self._row_to_dict(row) if row is not None else None
+
+    def get_many(self, dataset_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """Return datasets by identifier, preserving the requested order."""
+        if not dataset_ids:
+            return []
+        rows = self.conn.execute(
+            "SELECT * FROM datasets WHERE id IN "
+            f"({', '.join('?' * len(dataset_ids))})",
+            list(dataset_ids),
+        ).fetchall()
+        found = {row["id"]: self._row_to_dict(row) for row in rows}
+        return [found[i] for i in dataset_ids if i in found]
+
+    def texts(self) -> Dict[str, str]:
+        """Searchable text of every dataset keyed by identifier."""
+        rows = self.conn.execute(
+            "SELECT id, name, description, tasks FROM datasets"
+        ).fetchall()
+        return {
+            row["id"]: " ".join(
+                part for part in (
+                    row["name"], row["description"],
+                    row["tasks"].replace("_", " ")
+                ) if part
+            )
+            for row in rows
+        }
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        source: Optional[str] = None,
+        modality: Union[None, str, Sequence[str]] = None,
+        min_subjects: Optional[int] = None,
+        max_subjects: Optional[int] = None,
+        min_sampling_rate: Optional[float] = None,
+        tasks: Union[None, str, Sequence[str]] = None,
+        limit: int = 10,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Search datasets by keywords and structured filters.
+
+        Keyword matches are ranked by BM25, preferring datasets that match
+        every keyword and falling back to any keyword; filter-only searches
+        are ordered by subject count.
+
+        Args:
+            text: Free-text keywords matched against name, description and
+                tasks
+            source: Catalog source, e.g. ``openneuro``
+            modality: One modality or a list of accepted modalities
+            min_subjects: Minimum number of subjects
+            max_subjects: Maximum number of subjects
+            min_sampling_rate: Minimum sampling rate in Hz
+            tasks: One task or a list of tasks that must all be present
+            limit: Maximum number of results
+            offset: Number of results to skip
+
+        Returns:
+            Matching datasets with a ``relevance_score``
+        """
+        results = self._query(
+            _fts_query(text) if text else None, limit, offset, source,
+            modality, min_subjects, max_subjects, min_sampling_rate, tasks,
+        )
+        if not results and text and len(re.findall(r"\w+", text)) > 1:
+            results = self._query(
+                _fts_query(text, "OR"), limit, offset, source, modality,
+                min_subjects, max_subjects, min_sampling_rate, tasks,
+            )
+        return results
+
+    def _query(
+        self,
+        match: Optional[str],
+        limit: int,
+        offset: int,
+        source: Optional[str],
+        modality: Union[None, str, Sequence[str]],
+        min_subjects: Optional[int],
+        max_subjects: Optional[int],
+        min_sampling_rate: Optional[float],
+        tasks: Union[None, str, Sequence[str]]
+    ) -> List[Dict[str, Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if match:
+            sql = (
+                "SELECT d.*, -bm25(datasets_fts) AS score "
+                "FROM datasets_fts JOIN datasets d "
+                "ON d.rowid = datasets_fts.rowid"
+            )
+            clauses.append("datasets_fts MATCH ?")
+            params.append(match)
+            order = "score DESC"
+        else:
+            sql = "SELECT d.*, 0.0 AS score FROM datasets d"
+            order = "d.n_subjects IS NULL, d.n_subjects DESC, d.id"
+
+        if source:
+            clauses.append("d.source = ?")
+            params.append(source)
+        if modality:
+            modalities = [modality] if isinstance(modality, str) else modality
+            clauses.append(
+                f"d.modality IN ({', '.join('?' * len(modalities))})"
+            )
+            params.extend(str(m).upper() for m in modalities)
+        if min_subjects is not None:
+            clauses.append("d.n_subjects >= ?")
+            params.append(min_subjects)
+        if max_subjects is not None:
+            clauses.append("d.n_subjects <= ?")
+            params.append(max_subjects)
+        if min_sampling_rate is not None:
+            clauses.append("d.sampling_rate >= ?")
+            params.append(min_sampling_rate)
+        if isinstance(tasks, str):
+            tasks = [tasks]
+        for task in tasks or []:
+            clauses.append(
+                "d.rowid IN (SELECT dataset_rowid FROM dataset_tasks "
+                "WHERE task = ?)"
+            )
+            params.append(normalize_task(task))
+
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {order} LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+
+        rows = self.conn.execute(sql, params).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        data = dict(row)
+        data.pop("rowid", None)
+        data["tasks"] = data["tasks"].split() if data["tasks"] else []
+        data["metadata"] = json.loads(data["metadata"])
+        if "score" in data:
+            data["relevance_score"] = round(data.pop("score"), 4)
+        return data
+
+
+_default_index: Optional[DatasetIndex] = None
+
+
+def get_dataset_index() -> DatasetIndex:
+    """Get the process-wide dataset index configured from settings."""
+    global _default_index
+    if _default_index is None:
+        from ..config import get_settings
+
+        _default_index = DatasetIndex.from_settings(get_settings())
+    return _default_index
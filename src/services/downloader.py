@@ -0,0 +1,505 @@
+"""
+Parallel, resumable dataset file downloads.
+
+Files are fetched concurrently over a pooled HTTP client with bounded
+parallelism. Each file streams into a ``.part`` file next to its target and
+is hashed while it streams, so verification needs no second pass over the
+data. Interrupted downloads resume with an HTTP ``Range`` request guarded
+by ``If-Range``, so a file that changed on the server is restarted instead
+of being spliced. A file is renamed into place only once its size and
+checksum match; an existing target is therefore always complete.
+"""
+
+import asyncio
+import fnmatch
+import hashlib
+import json
+import os
+import random
+import re
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import httpx
+from loguru import logger
+
+from ..utils.http import parse_retry_after
+from .catalog import RETRY_STATUS_CODES
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadError(RuntimeError):
+    """Raised when a file cannot be downloaded."""
+
+
+class ChecksumMismatch(DownloadError):
+    """Raised when a downloaded file does not match its checksum."""
+
+
+class _RetryableStatus(DownloadError):
+    """A response status worth retrying, with the server's requested delay."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class RemoteFile:
+    """A file to download.
+
+    Attributes:
+        url: Source URL
+        path: Destination path relative to the download directory
+        size: Expected size in bytes, when known
+        checksum: Expected hex digest, when known
+        algorithm: ``hashlib`` algorithm of ``checksum``
+    """
+
+    url: str
+    path: str
+    size: Optional[int] = None
+    checksum: Optional[str] = None
+    algorithm: str = "sha256"
+
+
+@dataclass
+class DownloadProgress:
+    """Running totals of a download session."""
+
+    files_total: int = 0
+    bytes_total: Optional[int] = None
+    files_done: int = 0
+    files_skipped: int = 0
+    bytes_done: int = 0
+    bytes_resumed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the session started."""
+        return time.monotonic() - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Bytes transferred per second, excluding resumed bytes."""
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> Optional[float]:
+        """Estimated seconds remaining, when the total size is known."""
+        if not self.bytes_total or not self.throughput:
+            return None
+        remaining = self.bytes_total - self.bytes_done - self.bytes_resumed
+        return max(remaining, 0) / self.throughput
+
+    def summary(self) -> str:
+        """One-line human-readable status."""
+        done = (self.bytes_done + self.bytes_resumed) / 1e6
+        total = f"/{self.bytes_total / 1e6:.1f}" if self.bytes_total else ""
+        eta = f", ETA {self.eta:.0f}s" if self.eta is not None else ""
+        return (
+            f"{self.files_done}/{self.files_total} files, "
+            f"{done:.1f}{total} MB at {self.throughput / 1e6:.2f} MB/s{eta}"
+        )
+
+
+ProgressCallback = Callable[[DownloadProgress], None]
+
+
+class FileDownloader:
+    """Download sets of files concurrently with resume and verification."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        chunk_size: int = 1 << 20,
+        timeout: float = 60.0,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        progress_interval: float = 5.0,
+        on_progress: Optional[ProgressCallback] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """Initialize the downloader.
+
+        Args:
+            max_concurrency: Maximum number of files downloading at once
+            chunk_size: Bytes read from the network per write
+            timeout: Per-read timeout in seconds
+            max_retries: Retries per file; each retry resumes the transfer
+            backoff: Base delay in seconds, doubled after every retry
+            progress_interval: Seconds between progress reports
+            on_progress: Called with the running totals at every report;
+                defaults to logging them
+            transport: Optional transport, e.g. ``httpx.MockTransport`` for
+                tests against a local stub
+        """
+        self.max_concurrency = max_concurrency
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.progress_interval = progress_interval
+        self.on_progress = on_progress or (
+            lambda progress: logger.info(f"Download: {progress.summary()}")
+        )
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._last_report = 0.0
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Any,
+        **kwargs: Any
+    ) -> "FileDownloader":
+        """Create a downloader with the configured concurrency."""
+        kwargs.setdefault("max_concurrency", settings.download_concurrency)
+        return cls(**kwargs)
+
+    async def __aenter__(self) -> "FileDownloader":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by every transfer."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                follow_redirects=True,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def download(
+        self,
+        files: Iterable[RemoteFile],
+        destination: Union[str, Path]
+    ) -> List[Path]:
+        """Download files into a directory.
+
+        Files already in place are skipped and partial files are resumed.
+        Every file is attempted even if others fail.
+
+        Args:
+            files: Files to download
+            destination: Directory the relative file paths resolve against
+
+        Returns:
+            Paths of the downloaded files
+
+        Raises:
+            DownloadError: If any file failed, after all files were tried
+        """
+        files = list(files)
+        destination = Path(destination)
+        sizes = [f.size for f in files if f.size is not None]
+        progress = DownloadProgress(
+            files_total=len(files),
+            bytes_total=(
+                sum(sizes) if files and len(sizes) == len(files) else None
+            ),
+        )
+        self._last_report = time.monotonic()
+        results = await asyncio.gather(
+            *(self._download_one(f, destination, progress) for f in files),
+            return_exceptions=True,
+        )
+        self.on_progress(progress)
+
+        failures = [
+            (f, r) for f, r in zip(files, results)
+            if isinstance(r, BaseException)
+        ]
+        for remote, error in failures:
+            logger.error(f"Failed to download {remote.path}: {error}")
+        if failures:
+            raise DownloadError(
+                f"{len(failures)} of {len(files)} files failed to download"
+            )
+        return [result for result in results if isinstance(result, Path)]
+
+    async def _download_one(
+        self,
+        remote: RemoteFile,
+        destination: Path,
+        progress: DownloadProgress
+    ) -> Path:
+        target = destination / remote.path
+        if not target.resolve().is_relative_to(destination.resolve()):
+            raise DownloadError(f"Refusing to write outside {destination}")
+        if target.exists():
+            progress.files_done += 1
+            progress.files_skipped += 1
+            progress.bytes_resumed += target.stat().st_size
+            return target
+        partial = target.with_name(target.name + ".part")
+        if partial.exists():
+            progress.bytes_resumed += partial.stat().st_size
+        async with self._semaphore:
+            path = await self.download_file(remote, target, progress)
+        progress.files_done += 1
+        return path
+
+    async def download_file(
+        self,
+        remote: RemoteFile,
+        target: Union[str, Path],
+        progress: Optional[DownloadProgress] = None
+    ) -> Path:
+        """Download a single file, resuming a previous partial transfer.
+
+        Args:
+            remote: File to download
+            target: Destination path
+            progress: Running totals to update
+
+        Returns:
+            The destination path
+
+        Raises:
+            DownloadError: When the file cannot be fetched after all retries
+            ChecksumMismatch: When the completed file fails verification
+        """
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + ".part")
+        progress = progress or DownloadProgress(files_total=1)
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._transfer(remote, partial, progress)
+                self._finalize(partial, target)
+                return target
+            except ChecksumMismatch as e:
+                # Corrupt data cannot be resumed; start over.
+                self._discard(partial)
+                last_error = e
+            except (httpx.TransportError, DownloadError) as e:
+                last_error = e
+            except httpx.HTTPStatusError as e:
+                raise DownloadError(
+                    f"Failed to download {remote.url}: {e}"
+                ) from e
+
+            if attempt < self.max_retries:
+                delay = self._retry_delay(attempt, last_error)
+                logger.debug(
+                    f"Retrying {remote.path} in {delay:.2f}s after: "
+                    f"{last_error}"
+                )
+                await asyncio.sleep(delay)
+
+        raise DownloadError(
+            f"Failed to download {remote.url}: {last_error}"
+        ) from last_error
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        if isinstance(error, _RetryableStatus) and error.retry_after is not None:
+            return error.retry_after
+        delay = self.backoff * (2 ** attempt)
+        return delay + random.uniform(0, delay / 2)
+
+    async def _transfer(
+        self,
+        remote: RemoteFile,
+        partial: Path,
+        progress: DownloadProgress
+    ) -> None:
+        """Stream the remainder of a file into its ``.part`` file.
+
+        Returns once the partial file is complete and verified.
+
+        Raises:
+            DownloadError: When the transfer fails or should be retried
+            ChecksumMismatch: When the completed file fails verification
+        """
+        meta_path = partial.with_name(partial.name + ".json")
+        offset = partial.stat().st_size if partial.exists() else 0
+        validator = None
+        if offset and meta_path.exists():
+            validator = json.loads(meta_path.read_text()).get("validator")
+        if offset and not validator:
+            # Without a validator a resumed range could splice two versions.
+            self._discard(partial)
+            offset = 0
+
+        digest = hashlib.new(remote.algorithm)
+        if offset:
+            # Rebuild the running hash from the bytes already on disk.
+            await asyncio.to_thread(self._hash_file, partial, digest)
+
+        headers = {}
+        if offset and validator:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = str(validator)
+        async with self.client.stream(
+            "GET", remote.url, headers=headers
+        ) as response:
+            if response.status_code == 416 and offset:
+                # Nothing left to fetch: the partial file is complete.
+                self._verify(remote, partial, digest)
+                return
+            if response.status_code in RETRY_STATUS_CODES:
+                raise _RetryableStatus(
+                    f"{remote.url} returned HTTP {response.status_code}",
+                    parse_retry_after(response.headers.get("Retry-After")),
+                )
+            response.raise_for_status()
+
+            if response.status_code == 206:
+                match = _CONTENT_RANGE.match(
+                    response.headers.get("Content-Range", "")
+                )
+                if match is None or int(match.group(1)) != offset:
+                    raise DownloadError(
+                        f"Unexpected Content-Range for {remote.url}"
+                    )
+                mode = "ab"
+            else:
+                # Full content: the server ignored the range or the file
+                # changed since the partial download.
+                offset = 0
+                digest = hashlib.new(remote.algorithm)
+                mode = "wb"
+
+            validator = (
+                response.headers.get("ETag")
+                or response.headers.get("Last-Modified")
+            )
+            meta_path.write_text(json.dumps({"validator": validator}))
+            with open(partial, mode) as f:
+                async for chunk in response.aiter_bytes(self.chunk_size):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    progress.bytes_done += len(chunk)
+                    self._report(progress)
+        self._verify(remote, partial, digest)
+
+    def _verify(
+        self,
+        remote: RemoteFile,
+        partial: Path,
+        digest: "hashlib._Hash"
+    ) -> None:
+        """Check the size and checksum of a completed partial file.
+
+        Raises:
+            DownloadError: If the file is shorter than expected
+            ChecksumMismatch: If the file is longer or its checksum differs
+        """
+        size = partial.stat().st_size
+        if remote.size is not None and size != remote.size:
+            if size < remote.size:
+                raise DownloadError(
+                    f"{remote.path} ended after {size} of {remote.size} bytes"
+                )
+            raise ChecksumMismatch(
+                f"{remote.path} is {size} bytes, expected {remote.size}"
+            )
+        if remote.checksum and digest.hexdigest() != remote.checksum.lower():
+            raise ChecksumMismatch(
+                f"{remote.algorithm} of {remote.path} is "
+                f"{digest.hexdigest()}, expected {remote.checksum}"
+            )
+
+    def _finalize(self, partial: Path, target: Path) -> None:
+        with open(partial, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(partial, target)
+        self._discard(partial)
+
+    @staticmethod
+    def _discard(partial: Path) -> None:
+        for path in (partial, partial.with_name(partial.name + ".json")):
+            if path.exists():
+                path.unlink()
+
+    def _hash_file(self, path: Path, digest: "hashlib._Hash") -> None:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(self.chunk_size), b""):
+                digest.update(block)
+
+    def _report(self, progress: DownloadProgress) -> None:
+        now = time.monotonic()
+        if now - self._last_report >= self.progress_interval:
+            self._last_report = now
+            self.on_progress(progress)
+
+
+async def list_openneuro_files(
+    dataset_id: str,
+    bucket_url: str = "https://s3.amazonaws.com/openneuro.org",
+    include: Optional[Iterable[str]] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None
+) -> List[RemoteFile]:
+    """List the files of an OpenNeuro dataset from its public S3 bucket.
+
+    Objects uploaded in a single part carry their MD5 as ETag, which is
+    used as checksum; multipart uploads are verified by size only.
+
+    Args:
+        dataset_id: Dataset accession number, e.g. ``ds002778``
+        bucket_url: Base URL of the OpenNeuro bucket
+        include: Glob patterns of relative paths to keep, all if ``None``
+        transport: Optional transport for tests
+
+    Returns:
+        Files with paths relative to the dataset root
+    """
+    namespace = {"s3": "http://s3.amazonaws.com/doc/2006-03-01/"}
+    prefix = f"{dataset_id.strip('/')}/"
+    patterns = list(include or [])
+    files: List[RemoteFile] = []
+    params: Dict[str, str] = {"list-type": "2", "prefix": prefix}
+    async with httpx.AsyncClient(
+        timeout=30.0, transport=transport, follow_redirects=True
+    ) as client:
+        while True:
+            response = await client.get(bucket_url.rstrip("/"), params=params)
+            response.raise_for_status()
+            root = ET.fromstring(response.content)
+            for item in root.findall("s3:Contents", namespace):
+                key = item.findtext("s3:Key", "", namespace)
+                relative = key[len(prefix):]
+                if not relative or relative.endswith("/"):
+                    continue
+                if patterns and not any(
+                    fnmatch.fnmatch(relative, p) for p in patterns
+                ):
+                    continue
+                etag = item.findtext("s3:ETag", "", namespace).strip('"')
+                files.append(RemoteFile(
+                    url=f"{bucket_url.rstrip('/')}/{key}",
+                    path=relative,
+                    size=int(item.findtext("s3:Size", "0", namespace)),
+                    checksum=etag if re.fullmatch(r"[0-9a-f]{32}", etag)
+                    else None,
+                    algorithm="md5",
+                ))
+            token = root.findtext("s3:NextContinuationToken", None, namespace)
+            truncated = root.findtext("s3:IsTruncated", "false", namespace)
+            if truncated != "true" or token is None:
+                break
+            params["continuation-token"] = token
+    return files
@@ -0,0 +1,674 @@
+"""
+Durable background jobs for long-running agent requests.
+
+Jobs are stored in SQLite, so they survive API and worker restarts. Worker
+processes claim queued jobs atomically, send heartbeats while running and
+checkpoint progress: batch jobs after every chunk of inputs, coordinator
+workflows after every finished node. A job whose worker stops sending
+heartbeats is requeued and resumes from its last checkpoint, and a worker
+that is shut down hands its job back to the queue immediately.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+from loguru import logger
+
+from ..agents.base_agent import BaseAgent
+from ..utils.serialization import dumps
+from .dataset_index import sqlite_path
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+#: Statuses a job never leaves
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    agent TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 1,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    progress REAL NOT NULL DEFAULT 0,
+    checkpoint TEXT,
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_queue
+    ON jobs (status, priority, created_at);
+"""
+
+
+def _dumps(value: Any) -> str:
+    return dumps(value).decode("utf-8")
+
+
+def _loads(value: Optional[str]) -> Any:
+    return None if value is None else json.loads(value)
+
+
+@dataclass
+class Job:
+    """A queued, running or finished background job.
+
+    Attributes:
+        id: Job identifier
+        agent: Name of the agent that executes the job
+        payload: ``{"input": {...}}`` for a single request or
+            ``{"inputs": [...]}`` for a batch
+        status: One of ``queued``, ``running``, ``succeeded``, ``failed``
+            or ``cancelled``
+        priority: Lower values are claimed first
+        attempts: Executions started so far
+        max_attempts: Executions allowed before the job fails
+        progress: Fraction of the work completed, from 0 to 1
+        checkpoint: State saved by the last checkpoint
+        result: Agent output once the job succeeded
+        error: Last error message
+        worker: Identifier of the worker running the job
+        created_at: Submission time (UNIX seconds)
+        started_at: Start of the latest attempt
+        heartbeat_at: Last heartbeat of the running worker
+        finished_at: Time the job reached a final status
+    """
+
+    id: str
+    agent: str
+    payload: Dict[str, Any]
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    progress: float
+    checkpoint: Optional[Dict[str, Any]]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    worker: Optional[str]
+    created_at: float
+    started_at: Optional[float]
+    heartbeat_at: Optional[float]
+    finished_at: Optional[float]
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job reached a final status."""
+        return self.status in FINISHED
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        """Build a job from a database row."""
+        data = dict(row)
+        for key in ("payload", "checkpoint", "result"):
+            data[key] = _loads(data[key])
+        return cls(**data)
+
+    def to_dict(self, include_payload: bool = False) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        data = asdict(self)
+        if not include_payload:
+            del data["payload"]
+        del data["checkpoint"]
+        return data
+
+
+class JobQueue:
+    """Persistent job queue over SQLite, shared by API and worker processes."""
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        """Initialize the queue; the database is opened on first use.
+
+        Args:
+            path: SQLite database file, or ``:memory:``
+        """
+        self.path = str(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "JobQueue":
+        """Create a queue stored in the configured database."""
+        return cls(sqlite_path(settings.job_queue_url))
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Open connection with the schema in place."""
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            # Transactions are issued explicitly so that claims can take the
+            # write lock up front.
+            conn = sqlite3.connect(
+                self.path,
+                timeout=30.0,
+                isolation_level=None,
+                check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _update(self, sql: str, params: Sequence[Any]) -> bool:
+        with self._lock:
+            return self.conn.execute(sql, params).rowcount > 0
+
+    def submit(
+        self,
+        agent: str,
+        input_data: Optional[Dict[str, Any]] = None,
+        inputs: Optional[List[Dict[str, Any]]] = None,
+        priority: int = 1,
+        max_attempts: int = 3
+    ) -> Job:
+        """Enqueue a job.
+
+        Args:
+            agent: Name of the agent that executes the job
+            input_data: Input of a single agent request
+            inputs: Inputs of a batch request, mutually exclusive with
+                ``input_data``
+            priority: Lower values are claimed first
+            max_attempts: Executions allowed before the job fails
+
+        Returns:
+            The queued job
+        """
+        if (input_data is None) == (inputs is None):
+            raise ValueError("Provide exactly one of input_data and inputs")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        payload = (
+            {"input": input_data} if inputs is None
+            else {"inputs": list(inputs)}
+        )
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO jobs (id, agent, payload, status, priority, "
+                "max_attempts, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id, agent, _dumps(payload), QUEUED, priority,
+                    max_attempts, time.time(),
+                ),
+            )
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return Job.from_row(row)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by identifier."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return None if row is None else Job.from_row(row)
+
+    def list(
+        self,
+        status: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Job]:
+        """List the most recently submitted jobs.
+
+        Args:
+            status: Only return jobs with this status
+            limit: Maximum number of jobs
+        """
+        sql = "SELECT * FROM jobs"
+        params: List[Any] = []
+        if status is not None:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """Atomically take the next queued job for a worker.
+
+        Returns:
+            The claimed job, now ``running``, or ``None`` if none is queued
+        """
+        now = time.time()
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? "
+                    "ORDER BY priority, created_at LIMIT 1",
+                    (QUEUED,),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, "
+                        "attempts = attempts + 1, started_at = ?, "
+                        "heartbeat_at = ?, error = NULL WHERE id = ?",
+                        (RUNNING, worker, now, now, row["id"]),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return None if row is None else self.get(row["id"])
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        """Record that a worker is still running a job.
+
+        Returns:
+            Whether the worker still owns the job; ``False`` once it was
+            cancelled or requeued
+        """
+        return self._update(
+            "UPDATE jobs SET heartbeat_at = ? "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (time.time(), job_id, worker, RUNNING),
+        )
+
+    def checkpoint(
+        self,
+        job_id: str,
+        worker: str,
+        state: Dict[str, Any],
+        progress: float
+    ) -> bool:
+        """Save resumable state of a running job.
+
+        Returns:
+            Whether the worker still owns the job
+        """
+        return self._update(
+            "UPDATE jobs SET checkpoint = ?, progress = ?, heartbeat_at = ? "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (
+                _dumps(state), min(max(progress, 0.0), 1.0), time.time(),
+                job_id, worker, RUNNING,
+            ),
+        )
+
+    def complete(
+        self,
+        job_id: str,
+        worker: str,
+        result: Mapping[str, Any]
+    ) -> bool:
+        """Mark a running job as succeeded."""
+        return self._update(
+            "UPDATE jobs SET status = ?, result = ?, progress = 1, "
+            "finished_at = ? WHERE id = ? AND worker = ? AND status = ?",
+            (SUCCEEDED, _dumps(result), time.time(), job_id, worker, RUNNING),
+        )
+
+    def fail(self, job_id: str, worker: str, error: str) -> bool:
+        """Record a failed attempt, requeueing the job if attempts remain."""
+        return self._update(
+            "UPDATE jobs SET error = ?, "
+            "status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, "
+            "finished_at = CASE WHEN attempts < max_attempts "
+            "THEN NULL ELSE ? END "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (error, QUEUED, FAILED, time.time(), job_id, worker, RUNNING),
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job.
+
+        A running job is stopped by its worker at the next heartbeat.
+
+        Returns:
+            Whether the job was cancelled
+        """
+        return self._update(
+            "UPDATE jobs SET status = ?, finished_at = ? "
+            "WHERE id = ? AND status IN (?, ?)",
+            (CANCELLED, time.time(), job_id, QUEUED, RUNNING),
+        )
+
+    def requeue_stale(self, stale_seconds: float) -> int:
+        """Requeue running jobs whose worker stopped sending heartbeats.
+
+        Jobs that already used all their attempts fail instead.
+
+        Returns:
+            Number of jobs requeued or failed
+        """
+        now = time.time()
+        with self._lock:
+            return self.conn.execute(
+                "UPDATE jobs SET error = 'Worker stopped responding', "
+                "status = CASE WHEN attempts < max_attempts "
+                "THEN ? ELSE ? END, "
+                "finished_at = CASE WHEN attempts < max_attempts "
+                "THEN NULL ELSE ? END "
+                "WHERE status = ? AND heartbeat_at < ?",
+                (QUEUED, FAILED, now, RUNNING, now - stale_seconds),
+            ).rowcount
+
+    def release(self, job_id: str, worker: str) -> bool:
+        """Return a running job to the queue without using up an attempt.
+
+        Used when a worker shuts down; the job resumes from its checkpoint.
+        """
+        return self._update(
+            "UPDATE jobs SET status = ?, worker = NULL, "
+            "attempts = attempts - 1 "
+            "WHERE id = ? AND worker = ? AND status = ?",
+            (QUEUED, job_id, worker, RUNNING),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return {status: count for status, count in rows}
+
+
+class JobLost(Exception):
+    """Raised inside a worker when it no longer owns its job."""
+
+
+class JobWorker:
+    """Execute queued jobs with the agents of this process."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        agents: Mapping[str, BaseAgent],
+        worker_id: Optional[str] = None,
+        poll_interval: float = 1.0,
+        stale_seconds: float = 120.0,
+        batch_chunk: int = 64
+    ):
+        """Initialize the worker.
+
+        Args:
+            queue: Queue to claim jobs from
+            agents: Agents available to jobs, keyed by name
+            worker_id: Identifier recorded on claimed jobs
+            poll_interval: Seconds between polls of an empty queue
+            stale_seconds: Seconds without a heartbeat before a job is
+                requeued; heartbeats are sent four times as often
+            batch_chunk: Inputs of a batch job executed between checkpoints
+        """
+        self.queue = queue
+        self.agents = agents
+        self.worker_id = worker_id or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        )
+        self.poll_interval = poll_interval
+        self.stale_seconds = stale_seconds
+        self.heartbeat_interval = stale_seconds / 4
+        self.batch_chunk = batch_chunk
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """Execute jobs until ``stop`` is set."""
+        stop = stop or asyncio.Event()
+        logger.info(f"Job worker {self.worker_id} started")
+        while not stop.is_set():
+            if await self.run_once():
+                continue
+            requeued = await asyncio.to_thread(
+                self.queue.requeue_stale, self.stale_seconds
+            )
+            if requeued:
+                logger.warning(f"Requeued {requeued} stale job(s)")
+            try:
+                await asyncio.wait_for(stop.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    async def run_once(self) -> bool:
+        """Claim and execute one job.
+
+        Returns:
+            Whether a job was claimed
+        """
+        job = await asyncio.to_thread(self.queue.claim, self.worker_id)
+        if job is None:
+            return False
+        logger.info(f"Running job {job.id} ({job.agent}, attempt "
+                    f"{job.attempts}/{job.max_attempts})")
+        task = asyncio.ensure_future(self._execute(job))
+        heartbeat = asyncio.ensure_future(self._heartbeat(job, task))
+        try:
+            result = await task
+        except JobLost:
+            logger.info(f"Job {job.id} was cancelled or reassigned")
+        except asyncio.CancelledError:
+            if not (heartbeat.done() and heartbeat.result()):
+                # The worker is shutting down.
+                self.queue.release(job.id, self.worker_id)
+                logger.info(f"Returned job {job.id} to the queue")
+                raise
+            logger.info(f"Job {job.id} was cancelled or reassigned")
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {e}")
+            await asyncio.to_thread(
+                self.queue.fail, job.id, self.worker_id, str(e)
+            )
+        else:
+            await asyncio.to_thread(
+                self.queue.complete, job.id, self.worker_id, result
+            )
+        finally:
+            heartbeat.cancel()
+        return True
+
+    async def _heartbeat(self, job: Job, task: "asyncio.Future[Any]") -> bool:
+        """Send heartbeats, cancelling ``task`` once the job is lost.
+
+        Returns:
+            Whether the task was cancelled
+        """
+        while not task.done():
+            await asyncio.sleep(self.heartbeat_interval)
+            owned = await asyncio.to_thread(
+                self.queue.heartbeat, job.id, self.worker_id
+            )
+            if not owned:
+                task.cancel()
+                return True
+        return False
+
+    async def _checkpoint(
+        self,
+        job: Job,
+        state: Dict[str, Any],
+        progress: float
+    ) -> None:
+        owned = await asyncio.to_thread(
+            self.queue.checkpoint, job.id, self.worker_id, state, progress
+        )
+        if not owned:
+            raise JobLost(job.id)
+
+    async def _execute(self, job: Job) -> Mapping[str, Any]:
+        agent = self.agents.get(job.agent)
+        if agent is None:
+            raise ValueError(f"Unknown agent: {job.agent}")
+        if "inputs" in job.payload:
+            return await self._execute_batch(job, agent)
+
+        input_data = dict(job.payload["input"])
+        # Background work must not starve interactive requests.
+        input_data.setdefault("priority", "batch")
+        if getattr(agent.executor, "astream", None) is None:
+            return self._checked(await agent.run(input_data))
+
+        # Streaming agents report partial results; coordinator workflows
+        # checkpoint finished nodes and skip them when resumed.
+        completed = dict((job.checkpoint or {}).get("completed", {}))
+        if completed:
+            input_data["completed"] = completed
+        total = len(
+            input_data.get("workflow") or getattr(agent, "agents", [])
+        )
+        result: Dict[str, Any] = {}
+        async for event in agent.astream(input_data):
+            data = event["data"]
+            if event["event"] == "result":
+                result = data
+            elif event["event"] == "partial" and "node_id" in data:
+                if data["status"] == "success":
+                    completed[data["node_id"]] = data["output"]
+                await self._checkpoint(
+                    job,
+                    {"completed": completed},
+                    len(completed) / total if total else 0.0
+                )
+        return self._checked(result)
+
+    async def _execute_batch(
+        self,
+        job: Job,
+        agent: BaseAgent
+    ) -> Dict[str, Any]:
+        inputs = job.payload["inputs"]
+        results = list((job.checkpoint or {}).get("results", []))
+        for start in range(len(results), len(inputs), self.batch_chunk):
+            results.extend(
+                await agent.run_batch(inputs[start:start + self.batch_chunk])
+            )
+            await self._checkpoint(
+                job, {"results": results}, len(results) / len(inputs)
+            )
+        return {
+            "status": "success",
+            "agent": agent.name,
+            "results": results,
+            "failed": sum(r.get("status") != "success" for r in results)
+        }
+
+    @staticmethod
+    def _checked(result: Mapping[str, Any]) -> Mapping[str, Any]:
+        if result.get("status") in ("error", "failed", "rejected", "timeout"):
+            raise RuntimeError(
+                result.get("error") or f"Agent returned {result['status']}"
+            )
+        return result
+
+
+def _worker_main(path: str, index: int, stale_seconds: float) -> None:
+    from ..agents.registry import get_agents
+
+    async def main() -> None:
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        if task is not None:
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                loop.add_signal_handler(sig, task.cancel)
+        agents = get_agents()
+        for agent in agents.values():
+            # Jobs exist for work that outlasts a request, so only deadlines
+            # set by the job itself apply, not the interactive default.
+            agent.timeout = None
+        worker = JobWorker(
+            JobQueue(path),
+            agents,
+            worker_id=f"{socket.gethostname()}:{os.getpid()}:{index}",
+            stale_seconds=stale_seconds
+        )
+        try:
+            await worker.run()
+        except asyncio.CancelledError:
+            logger.info(f"Job worker {worker.worker_id} stopped")
+
+    asyncio.run(main())
+
+
+def start_workers(
+    processes: Optional[int] = None,
+    queue: Optional[JobQueue] = None
+) -> List[multiprocessing.Process]:
+    """Start job worker processes.
+
+    On ``SIGTERM`` a worker returns its current job to the queue, where it
+    resumes from the last checkpoint; jobs of workers that died are
+    requeued once their heartbeat goes stale.
+
+    Args:
+        processes: Number of workers, defaults to the configured count
+        queue: Queue to serve, defaults to the configured queue
+
+    Returns:
+        The started processes
+    """
+    from ..config import get_settings
+
+    settings = get_settings()
+    processes = settings.job_workers if processes is None else processes
+    queue = queue or JobQueue.from_settings(settings)
+    # Create the schema once instead of racing on it in every worker.
+    queue.conn
+    workers = []
+    for index in range(processes):
+        # Not daemonic: workers start compute pools of their own.
+        process = multiprocessing.Process(
+            target=_worker_main,
+            args=(queue.path, index, settings.job_stale_seconds),
+            name=f"job-worker-{index}"
+        )
+        process.start()
+        workers.append(process)
+    logger.info(f"Started {processes} job worker(s) on {queue.path}")
+    return workers
+
+
+def stop_workers(workers: Sequence[multiprocessing.Process]) -> None:
+    """Ask worker processes to stop and wait for them."""
+    for process in workers:
+        if process.is_alive():
+            process.terminate()
+    for process in workers:
+        process.join()
+
+
+_default_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get the process-wide job queue."""
+    global _default_queue
+    if _default_queue is None:
+        from ..config import get_settings
+
+        _default_queue = JobQueue.from_settings(get_settings())
+    return _default_queue
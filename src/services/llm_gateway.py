@@ -0,0 +1,656 @@
+"""
+Shared language model gateway.
+
+Every agent talks to the language model through one process-wide gateway
+instead of a client of its own. The gateway:
+
+- keeps a pooled HTTP client with keep-alive connections to the provider,
+- marks system prompts and tool definitions for provider-side prompt
+  caching, so long stable prefixes are billed at the cache-read rate,
+- caches deterministic (temperature 0) completions by request hash with a
+  TTL, and coalesces concurrent identical ones,
+- groups concurrent requests into micro-batches for backends that accept
+  several prompts per call,
+- accounts input, output and cached tokens and latency per model.
+
+``FakeBackend`` answers deterministically without network access, for
+development and tests.
+"""
+
+import asyncio
+import dataclasses
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from loguru import logger
+
+from ..utils.cache import LRUCache, ResultCache, make_cache_key
+from ..utils.http import parse_retry_after
+from ..utils.metrics import MetricsRegistry, get_metrics
+from ..utils.singleflight import SingleFlight
+
+#: Anthropic API version sent with every request
+ANTHROPIC_VERSION = "2023-06-01"
+
+#: Provider statuses worth retrying
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504, 529)
+
+#: Message roles accepted from LangChain-style ``(role, content)`` tuples
+ROLE_ALIASES = {"human": "user", "ai": "assistant"}
+
+
+class LLMError(Exception):
+    """A language model request failed."""
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None
+    ):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+@dataclass
+class LLMRequest:
+    """A chat completion request.
+
+    Attributes:
+        messages: ``{"role": "user" | "assistant", "content": ...}`` turns
+        system: System prompt, marked for prompt caching
+        tools: Tool definitions, marked for prompt caching
+        model: Model name, the gateway default when ``None``
+        max_tokens: Upper bound on generated tokens
+        temperature: Sampling temperature; only temperature 0 completions
+            are cached and coalesced
+        stop: Stop sequences
+    """
+
+    messages: List[Dict[str, Any]]
+    system: Optional[str] = None
+    tools: Optional[List[Dict[str, Any]]] = None
+    model: Optional[str] = None
+    max_tokens: int = 1024
+    temperature: float = 0.0
+    stop: Optional[List[str]] = None
+
+    def cache_key(self) -> str:
+        """Content hash identifying the completion."""
+        return make_cache_key("llm", dataclasses.asdict(self))
+
+
+@dataclass
+class LLMUsage:
+    """Token counts of one or more completions."""
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    def add(self, other: "LLMUsage") -> None:
+        """Accumulate another usage record."""
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cache_read_tokens += other.cache_read_tokens
+        self.cache_write_tokens += other.cache_write_tokens
+
+    def to_dict(self) -> Dict[str, int]:
+        """Return the counts as a plain dictionary."""
+        return dataclasses.asdict(self)
+
+
+@dataclass
+class LLMResponse:
+    """A chat completion.
+
+    Attributes:
+        content: Generated text
+        model: Model that produced it
+        usage: Token counts billed for it
+        stop_reason: Why generation stopped
+        cached: Whether it was served from the completion cache
+        latency: Seconds until it was available
+    """
+
+    content: str
+    model: str
+    usage: LLMUsage = field(default_factory=LLMUsage)
+    stop_reason: Optional[str] = None
+    cached: bool = False
+    latency: float = 0.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of English text (about four characters a token)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+class LLMBackend(ABC):
+    """Provider-specific completion transport."""
+
+    #: Whether ``complete_batch`` sends several requests in one call
+    supports_batching: bool = False
+
+    @abstractmethod
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        """Complete one request."""
+        raise NotImplementedError
+
+    async def complete_batch(
+        self,
+        requests: Sequence[LLMRequest]
+    ) -> List[Union[LLMResponse, BaseException]]:
+        """Complete many requests, one result or exception each."""
+        return await asyncio.gather(
+            *(self.complete(request) for request in requests),
+            return_exceptions=True
+        )
+
+    async def aclose(self) -> None:
+        """Release connections."""
+
+
+class AnthropicBackend(LLMBackend):
+    """Anthropic Messages API over a pooled HTTP client.
+
+    The Messages API takes one conversation per call, so concurrent
+    requests are multiplexed over the pooled keep-alive connections rather
+    than batched.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.anthropic.com",
+        timeout: float = 60.0,
+        max_connections: int = 20,
+        max_retries: int = 2,
+        transport: Any = None
+    ):
+        """Initialize the backend.
+
+        Args:
+            api_key: Anthropic API key
+            base_url: API root
+            timeout: Seconds before a request fails
+            max_connections: Size of the connection pool
+            max_retries: Retries of rate-limited or failed requests
+            transport: Optional ``httpx`` transport, for tests
+        """
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self.transport = transport
+        self._client: Optional[Any] = None
+
+    def _get_client(self) -> Any:
+        # Created on first use so that it binds to the running event loop.
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "x-api-key": self.api_key,
+                    "anthropic-version": ANTHROPIC_VERSION,
+                    "content-type": "application/json",
+                },
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self.transport,
+            )
+        return self._client
+
+    @staticmethod
+    def payload(request: LLMRequest) -> Dict[str, Any]:
+        """Messages API body with cache breakpoints on the stable prefix."""
+        body: Dict[str, Any] = {
+            "model": request.model,
+            "max_tokens": request.max_tokens,
+            "temperature": request.temperature,
+            "messages": request.messages,
+        }
+        if request.tools:
+            tools = [dict(tool) for tool in request.tools]
+            tools[-1]["cache_control"] = {"type": "ephemeral"}
+            body["tools"] = tools
+        if request.system:
+            body["system"] = [{
+                "type": "text",
+                "text": request.system,
+                "cache_control": {"type": "ephemeral"},
+            }]
+        if request.stop:
+            body["stop_sequences"] = request.stop
+        return body
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        import httpx
+
+        client = self._get_client()
+        body = self.payload(request)
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.post("/v1/messages", json=body)
+            except httpx.TransportError as e:
+                # Connection failures and timeouts
+                if attempt == self.max_retries:
+                    raise LLMError(
+                        f"Anthropic API request failed: {e!r}"
+                    ) from e
+                await asyncio.sleep(2 ** attempt)
+                continue
+            if response.status_code < 400:
+                break
+            error = LLMError(
+                f"Anthropic API returned {response.status_code}: "
+                f"{response.text[:200]}",
+                status=response.status_code,
+                retry_after=parse_retry_after(
+                    response.headers.get("retry-after")
+                ),
+            )
+            if (
+                response.status_code not in RETRY_STATUSES
+                or attempt == self.max_retries
+            ):
+                raise error
+            await asyncio.sleep(
+                2 ** attempt if error.retry_after is None else error.retry_after
+            )
+
+        data = response.json()
+        usage = data.get("usage") or {}
+        return LLMResponse(
+            content="".join(
+                block.get("text", "") for block in data.get("content", [])
+                if block.get("type") == "text"
+            ),
+            model=data.get("model", request.model),
+            usage=LLMUsage(
+                input_tokens=usage.get("input_tokens", 0),
+                output_tokens=usage.get("output_tokens", 0),
+                cache_read_tokens=usage.get("cache_read_input_tokens") or 0,
+                cache_write_tokens=usage.get("cache_creation_input_tokens") or 0,
+            ),
+            stop_reason=data.get("stop_reason"),
+        )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class FakeBackend(LLMBackend):
+    """Deterministic local backend for development and tests.
+
+    Responses depend only on the request. System prompts are reported as
+    cache writes the first time and cache reads afterwards, like a provider
+    prompt cache that never expires.
+    """
+
+    supports_batching = True
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[LLMRequest], str]] = None,
+        latency: float = 0.0
+    ):
+        """Initialize the backend.
+
+        Args:
+            responder: Maps a request to the response text; by default the
+                response names a digest of the request
+            latency: Simulated seconds per call
+        """
+        self.responder = responder or self._default_response
+        self.latency = latency
+        self.calls = 0
+        self.batch_sizes: List[int] = []
+        self._cached_prefixes: set = set()
+
+    @staticmethod
+    def _default_response(request: LLMRequest) -> str:
+        digest = request.cache_key()[:12]
+        return f"Fake completion {digest} for: {_last_user_text(request)}"
+
+    def _respond(self, request: LLMRequest) -> LLMResponse:
+        prefix = (request.system or "") + (
+            json.dumps(request.tools, sort_keys=True) if request.tools else ""
+        )
+        prefix_tokens = estimate_tokens(prefix) if prefix else 0
+        usage = LLMUsage(
+            input_tokens=sum(
+                estimate_tokens(str(message.get("content", "")))
+                for message in request.messages
+            )
+        )
+        digest = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        if prefix_tokens and digest in self._cached_prefixes:
+            usage.cache_read_tokens = prefix_tokens
+        elif prefix_tokens:
+            usage.cache_write_tokens = prefix_tokens
+            self._cached_prefixes.add(digest)
+        content = self.responder(request)
+        usage.output_tokens = estimate_tokens(content)
+        return LLMResponse(content, request.model or "fake", usage, "end_turn")
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        self.calls += 1
+        self.batch_sizes.append(1)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(request)
+
+    async def complete_batch(
+        self,
+        requests: Sequence[LLMRequest]
+    ) -> List[Union[LLMResponse, BaseException]]:
+        self.calls += 1
+        self.batch_sizes.append(len(requests))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return [self._respond(request) for request in requests]
+
+
+def _last_user_text(request: LLMRequest) -> str:
+    for message in reversed(request.messages):
+        if message.get("role") == "user":
+            return str(message.get("content", ""))
+    return ""
+
+
+def _to_messages(prompt: Any) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """Split a prompt into the system prompt and chat messages.
+
+    Accepts a string, ``{"role", "content"}`` dictionaries or LangChain-style
+    ``(role, content)`` tuples, where role may be ``system``, ``human``,
+    ``user``, ``ai`` or ``assistant``.
+    """
+    if isinstance(prompt, str):
+        return None, [{"role": "user", "content": prompt}]
+    system = []
+    messages = []
+    for message in prompt:
+        if isinstance(message, tuple):
+            role, content = message
+        else:
+            role, content = message["role"], message["content"]
+        if role == "system":
+            system.append(content)
+        else:
+            messages.append({
+                "role": ROLE_ALIASES.get(role, role), "content": content
+            })
+    return "\n\n".join(system) or None, messages
+
+
+class LLMGateway:
+    """Process-wide entry point for language model completions."""
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        model: str,
+        cache: Optional[ResultCache] = None,
+        cache_ttl: Optional[float] = None,
+        max_concurrency: int = 20,
+        batch_window: float = 0.005,
+        max_batch_size: int = 16,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """Initialize the gateway.
+
+        Args:
+            backend: Provider transport
+            model: Default model name
+            cache: Completion cache, ``None`` disables caching
+            cache_ttl: Seconds completions stay cached, the cache default
+                when ``None``
+            max_concurrency: Backend calls in flight at once
+            batch_window: Seconds a request waits for others to share its
+                batch, for backends that support batching
+            max_batch_size: Largest batch sent to the backend
+            metrics: Metrics registry, defaults to the process-wide registry
+        """
+        self.backend = backend
+        self.model = model
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.metrics = metrics if metrics is not None else get_metrics()
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._flights = SingleFlight()
+        self._pending: List[Tuple[LLMRequest, "asyncio.Future[Any]"]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.usage: Dict[str, LLMUsage] = {}
+        self.requests = {"success": 0, "cached": 0, "error": 0}
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        """Complete a request, from the cache when possible.
+
+        Raises:
+            LLMError: If the provider rejects the request
+        """
+        model = request.model or self.model
+        if request.model is None:
+            request = dataclasses.replace(request, model=model)
+        started = time.perf_counter()
+        key = request.cache_key()
+        cache = self.cache if request.temperature == 0 else None
+        if cache is not None:
+            hit = await cache.get(key)
+            if hit is not None:
+                response = dataclasses.replace(
+                    hit,
+                    usage=LLMUsage(),
+                    cached=True,
+                    latency=time.perf_counter() - started,
+                )
+                self._record(response, "cached")
+                return response
+        try:
+            if request.temperature == 0:
+                response = await self._flights.do(
+                    key, lambda: self._execute(request)
+                )
+            else:
+                # Sampled completions are independent draws; callers must
+                # not share one.
+                response = await self._execute(request)
+        except Exception:
+            self._record_error(model)
+            raise
+        response = dataclasses.replace(
+            response, latency=time.perf_counter() - started
+        )
+        if cache is not None:
+            await cache.set(key, response, self.cache_ttl)
+        self._record(response, "success")
+        return response
+
+    async def ainvoke(self, prompt: Any, **kwargs: Any) -> LLMResponse:
+        """Complete a prompt given as text or chat messages.
+
+        Accepts the prompt shapes LangChain chat models take, so the gateway
+        can stand in for one; keyword arguments are ``LLMRequest`` fields.
+        """
+        system, messages = _to_messages(prompt)
+        if system is not None:
+            kwargs.setdefault("system", system)
+        return await self.complete(LLMRequest(messages=messages, **kwargs))
+
+    async def _execute(self, request: LLMRequest) -> LLMResponse:
+        # Runs once per coalesced group, so tokens are counted once.
+        response = await self._dispatch(request)
+        self._record_tokens(response)
+        return response
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _dispatch(self, request: LLMRequest) -> LLMResponse:
+        if not self.backend.supports_batching:
+            async with self._get_semaphore():
+                return await self.backend.complete(request)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.batch_window, self._flush
+            )
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._send_batch(batch))
+
+    async def _send_batch(
+        self,
+        batch: List[Tuple[LLMRequest, "asyncio.Future[Any]"]]
+    ) -> None:
+        try:
+            async with self._get_semaphore():
+                results = await self.backend.complete_batch(
+                    [request for request, _ in batch]
+                )
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _record(self, response: LLMResponse, status: str) -> None:
+        self.requests[status] += 1
+        if self.metrics is None:
+            return
+        self.metrics.counter(
+            "llm_requests_total",
+            "Language model requests by model and outcome",
+            ["model", "status"]
+        ).inc(model=response.model, status=status)
+        self.metrics.histogram(
+            "llm_request_duration_seconds",
+            "Latency of language model requests",
+            ["model", "status"]
+        ).observe(response.latency, model=response.model, status=status)
+
+    def _record_tokens(self, response: LLMResponse) -> None:
+        self.usage.setdefault(response.model, LLMUsage()).add(response.usage)
+        if self.metrics is None:
+            return
+        tokens = self.metrics.counter(
+            "llm_tokens_total",
+            "Language model tokens by kind",
+            ["model", "kind"]
+        )
+        for kind, count in (
+            ("input", response.usage.input_tokens),
+            ("output", response.usage.output_tokens),
+            ("cache_read", response.usage.cache_read_tokens),
+            ("cache_write", response.usage.cache_write_tokens),
+        ):
+            if count:
+                tokens.inc(count, model=response.model, kind=kind)
+
+    def _record_error(self, model: str) -> None:
+        self.requests["error"] += 1
+        if self.metrics is not None:
+            self.metrics.counter(
+                "llm_requests_total",
+                "Language model requests by model and outcome",
+                ["model", "status"]
+            ).inc(model=model, status="error")
+
+    def stats(self) -> Dict[str, Any]:
+        """Request outcomes and token usage per model."""
+        return {
+            "requests": dict(self.requests),
+            "coalesced": self._flights.stats.coalesced,
+            "usage": {
+                model: usage.to_dict() for model, usage in self.usage.items()
+            },
+        }
+
+    async def aclose(self) -> None:
+        """Release backend connections."""
+        await self.backend.aclose()
+
+
+def build_llm_gateway(settings: Any) -> Optional[LLMGateway]:
+    """Build the gateway described by application settings.
+
+    Returns:
+        The gateway, or ``None`` when the Anthropic backend is selected but
+        no API key is configured
+    """
+    if settings.llm_backend == "fake":
+        backend: LLMBackend = FakeBackend()
+    elif settings.llm_backend == "anthropic":
+        if not settings.anthropic_api_key or (
+            settings.anthropic_api_key.startswith("your_")
+        ):
+            logger.info("No Anthropic API key configured, LLM features disabled")
+            return None
+        backend = AnthropicBackend(
+            settings.anthropic_api_key,
+            base_url=settings.llm_base_url,
+            timeout=settings.llm_timeout,
+            max_connections=settings.llm_max_connections,
+        )
+    else:
+        raise ValueError(f"Unknown LLM backend {settings.llm_backend!r}")
+    cache = (
+        LRUCache(settings.cache_max_entries, ttl=settings.llm_cache_ttl)
+        if settings.enable_cache else None
+    )
+    return LLMGateway(
+        backend,
+        settings.llm_model,
+        cache=cache,
+        max_concurrency=settings.llm_max_connections,
+        batch_window=settings.llm_batch_window,
+    )
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_built = False
+
+
+def get_llm_gateway() -> Optional[LLMGateway]:
+    """Get the process-wide gateway shared by all agents."""
+    global _gateway, _gateway_built
+    if not _gateway_built:
+        from ..config import get_settings
+
+        _gateway = build_llm_gateway(get_settings())
+        _gateway_built = True
+    return _gateway
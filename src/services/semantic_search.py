@@ -0,0 +1,405 @@
+"""
+Embedding-based semantic search over dataset descriptions.
+
+Embeddings live in a memory-mapped ``.npy`` matrix of L2-normalized rows
+next to a JSON manifest recording, for every row, the dataset id and a hash
+of the embedded text. Synchronizing with the catalog only embeds new or
+changed texts and removes stale rows, so restarts never re-embed the whole
+catalog. Queries are a single matrix-vector product followed by a partial
+sort.
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+from loguru import logger
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """Batch text embedder backed by ``sentence-transformers``."""
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        batch_size: int = 64
+    ):
+        """Initialize the embedder; the model loads on first use.
+
+        Args:
+            model_name: Sentence-transformers model identifier
+            batch_size: Texts encoded per forward pass
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model: Any = None
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into a ``(len(texts), dim)`` float32 matrix."""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            self._model = SentenceTransformer(self.model_name)
+        return np.asarray(
+            self._model.encode(
+                list(texts),
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            ),
+            dtype=np.float32,
+        )
+
+
+class VectorIndex:
+    """Persistent vector index stored as a memory-mapped matrix."""
+
+    VECTORS_FILE = "vectors.npy"
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, directory: Union[str, Path], model_name: str):
+        """Open or create the index.
+
+        An index built with a different model is discarded, since its
+        vectors are not comparable with new query embeddings.
+
+        Args:
+            directory: Directory holding the matrix and manifest
+            model_name: Name of the embedding model used for the vectors
+        """
+        self.directory = Path(directory)
+        self.model_name = model_name
+        self.ids: List[str] = []
+        self.hashes: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._vectors_path = self.directory / self.VECTORS_FILE
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> Optional[int]:
+        """Embedding dimension, unknown until the first vectors are added."""
+        return None if self._vectors is None else self._vectors.shape[1]
+
+    def _load(self) -> None:
+        manifest_path = self.directory / self.MANIFEST_FILE
+        if not manifest_path.exists():
+            return
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        vectors_path = self.directory / manifest.get(
+            "vectors", self.VECTORS_FILE
+        )
+        if not vectors_path.exists():
+            return
+        if manifest.get("model") != self.model_name:
+            logger.info(
+                f"Vector index was built with {manifest.get('model')}, "
+                f"rebuilding for {self.model_name}"
+            )
+            return
+        self.ids = manifest["ids"]
+        self.hashes = manifest["hashes"]
+        self._rows = {dataset_id: row for row, dataset_id in enumerate(self.ids)}
+        self._vectors_path = vectors_path
+        self._vectors = np.load(vectors_path, mmap_mode="r+")
+
+    def _matrix(self) -> np.memmap:
+        """Return the vector matrix, which exists once rows were added."""
+        if self._vectors is None:
+            raise ValueError("Vector index has no vectors yet")
+        return self._vectors
+
+    def _capacity(self) -> int:
+        return 0 if self._vectors is None else self._vectors.shape[0]
+
+    def _reserve(self, rows: int, dim: int) -> np.memmap:
+        """Grow the matrix geometrically so appends stay amortized O(1).
+
+        Returns:
+            The matrix, with room for at least ``rows`` rows
+        """
+        if self._vectors is not None and self._vectors.shape[1] != dim:
+            raise ValueError(
+                f"Embedding dimension {dim} does not match index dimension "
+                f"{self._vectors.shape[1]}"
+            )
+        if rows <= self._capacity():
+            return self._matrix()
+        capacity = max(rows, 2 * self._capacity(), 256)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._vectors_path
+        tmp = path.with_suffix(".tmp.npy")
+        grown = np.lib.format.open_memmap(
+            tmp, mode="w+", dtype=np.float32, shape=(capacity, dim)
+        )
+        if self._vectors is not None:
+            grown[:len(self)] = self._vectors[:len(self)]
+        grown.flush()
+        del grown
+        self._vectors = None
+        os.replace(tmp, path)
+        self._vectors = np.load(path, mmap_mode="r+")
+        return self._matrix()
+
+    def stale(self, texts: Dict[str, str]) -> Tuple[List[str], List[str]]:
+        """Compare the index with the current texts.
+
+        Returns:
+            Ids whose text is new or changed, and ids no longer present
+        """
+        changed = [
+            dataset_id for dataset_id, text in texts.items()
+            if dataset_id not in self._rows
+            or self.hashes[self._rows[dataset_id]] != _text_hash(text)
+        ]
+        removed = [
+            dataset_id for dataset_id in self.ids if dataset_id not in texts
+        ]
+        return changed, removed
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        vectors: np.ndarray
+    ) -> None:
+        """Insert or overwrite the vectors of ``ids``."""
+        if not ids:
+            return
+        vectors = _normalize(vectors)
+        new = [
+            dataset_id for dataset_id in ids if dataset_id not in self._rows
+        ]
+        matrix = self._reserve(len(self) + len(new), vectors.shape[1])
+        for dataset_id in new:
+            self._rows[dataset_id] = len(self.ids)
+            self.ids.append(dataset_id)
+            self.hashes.append("")
+        rows = np.fromiter((self._rows[i] for i in ids), dtype=np.intp)
+        matrix[rows] = vectors
+        for row, text in zip(rows, texts):
+            self.hashes[row] = _text_hash(text)
+
+    def remove(self, ids: Iterable[str], block_rows: int = 65536) -> None:
+        """Delete rows and save the compacted index.
+
+        Rows are never moved inside the live matrix: the remaining rows are
+        copied to a new vectors file and the manifest is then switched to
+        it, so a crash leaves the old or the new index, never manifest ids
+        pointing at shifted rows.
+
+        Args:
+            ids: Dataset ids to delete
+            block_rows: Rows copied at a time
+        """
+        drop = {dataset_id for dataset_id in ids if dataset_id in self._rows}
+        if not drop:
+            return
+        matrix = self._matrix()
+        keep = np.array([
+            row for row, dataset_id in enumerate(self.ids)
+            if dataset_id not in drop
+        ], dtype=np.intp)
+        old_path = self._vectors_path
+        path = self.directory / f"vectors.{uuid.uuid4().hex[:12]}.npy"
+        compacted = np.lib.format.open_memmap(
+            path, mode="w+", dtype=np.float32, shape=matrix.shape
+        )
+        for start in range(0, keep.size, block_rows):
+            rows = keep[start:start + block_rows]
+            compacted[start:start + rows.size] = matrix[rows]
+        compacted.flush()
+        del compacted, matrix
+
+        self.ids = [self.ids[row] for row in keep]
+        self.hashes = [self.hashes[row] for row in keep]
+        self._rows = {dataset_id: row for row, dataset_id in enumerate(self.ids)}
+        self._vectors = np.load(path, mmap_mode="r+")
+        self._vectors_path = path
+        self.save()
+        try:
+            old_path.unlink()
+        except OSError as e:
+            logger.debug(f"Could not delete replaced vectors file: {e}")
+
+    def save(self) -> None:
+        """Flush vectors and atomically write the manifest."""
+        if self._vectors is None:
+            return
+        self._vectors.flush()
+        path = self.directory / self.MANIFEST_FILE
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            manifest = {
+                "model": self.model_name,
+                "vectors": self._vectors_path.name,
+                "ids": self.ids,
+                "hashes": self.hashes,
+            }
+            json.dump(manifest, f)
+        os.replace(tmp, path)
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        candidates: Optional[Collection[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """Return the ``k`` ids most similar to ``query``.
+
+        Args:
+            query: Query embedding
+            k: Number of results
+            candidates: Optional ids the results must be drawn from
+
+        Returns:
+            ``(id, cosine similarity)`` pairs, most similar first
+        """
+        if not self.ids or k <= 0:
+            return []
+        matrix = self._matrix()[:len(self)]
+        if candidates is not None:
+            rows = np.fromiter(
+                (self._rows[i] for i in candidates if i in self._rows),
+                dtype=np.intp,
+            )
+            if rows.size == 0:
+                return []
+        else:
+            rows = np.arange(len(self))
+        scores = matrix[rows] @ _normalize(query).ravel()
+        k = min(k, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[rows[i]], float(scores[i])) for i in top]
+
+
+class SemanticSearch:
+    """Semantic dataset search kept in sync with the dataset index."""
+
+    def __init__(self, index: VectorIndex, embedder: Any):
+        """Initialize with a vector index and an embedder.
+
+        Args:
+            index: Persistent vector index
+            embedder: Object whose ``encode(texts)`` returns embeddings
+        """
+        self.index = index
+        self.embedder = embedder
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "SemanticSearch":
+        """Create the search configured in application settings."""
+        embedder = SentenceTransformerEmbedder(settings.embedding_model)
+        index = VectorIndex(settings.vector_index_dir, settings.embedding_model)
+        return cls(index, embedder)
+
+    def sync(
+        self,
+        texts: Dict[str, str],
+        batch_size: int = 256
+    ) -> Dict[str, int]:
+        """Bring the vector index in line with the current catalog texts.
+
+        Args:
+            texts: Text to embed keyed by dataset id
+            batch_size: Texts embedded per call
+
+        Returns:
+            Counts of embedded and removed datasets
+        """
+        changed, removed = self.index.stale(texts)
+        self.index.remove(removed)
+        for start in range(0, len(changed), batch_size):
+            batch = changed[start:start + batch_size]
+            batch_texts = [texts[dataset_id] for dataset_id in batch]
+            vectors = self.embedder.encode(batch_texts)
+            self.index.upsert(batch, batch_texts, vectors)
+        self.index.save()
+        if changed or removed:
+            logger.info(
+                f"Vector index synced: {len(changed)} embedded, "
+                f"{len(removed)} removed"
+            )
+        return {"embedded": len(changed), "removed": len(removed)}
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        candidates: Optional[Collection[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """Rank datasets by similarity to a free-text query."""
+        if not len(self.index):
+            return []
+        vector = self.embedder.encode([query])[0]
+        return self.index.search(vector, k, candidates)
+
+    async def asearch(
+        self,
+        query: str,
+        k: int = 10,
+        candidates: Optional[Collection[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """Rank datasets without blocking the event loop on the model."""
+        return await asyncio.to_thread(self.search, query, k, candidates)
+
+
+_default_search: Optional[SemanticSearch] = None
+_default_search_built = False
+
+
+def get_semantic_search() -> Optional[SemanticSearch]:
+    """Get the process-wide semantic search, or ``None`` when unavailable.
+
+    Semantic search is disabled in settings or when
+    ``sentence-transformers`` is not installed.
+    """
+    global _default_search, _default_search_built
+    if not _default_search_built:
+        _default_search_built = True
+        from ..config import get_settings
+
+        settings = get_settings()
+        if not settings.enable_semantic_search:
+            return None
+        # Only look the package up: importing it loads torch, which the
+        # embedder defers to its first ``encode``.
+        if importlib.util.find_spec("sentence_transformers") is None:
+            logger.info(
+                "sentence-transformers not installed, semantic search disabled"
+            )
+            return None
+        _default_search = SemanticSearch.from_settings(settings)
+    return _default_search
@@ -0,0 +1,341 @@
+"""
+Result caching for agent executions.
+
+Results are stored under a content-addressed key derived from the agent name
+and a canonical encoding of the input, so byte-identical requests map to the
+same entry regardless of dictionary ordering. An in-process LRU tier bounds
+memory; an optional Redis tier shares results across workers.
+"""
+
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+from .serialization import packb, unpackb
+
+
+def _canonical_default(obj: Any) -> Any:
+    """Encode values the JSON encoder does not know about.
+    
+    Raises:
+        TypeError: If the value has no content-based encoding; a ``repr``
+            is not used, since it may not identify the value (NumPy
+            elides the middle of large arrays)
+    """
+    if isinstance(obj, Mapping):
+        # Result objects passed on as upstream inputs
+        return dict(obj)
+    if hasattr(obj, "tobytes") and hasattr(obj, "dtype"):
+        digest = hashlib.sha256(obj.tobytes()).hexdigest()
+        return {
+            "__array__": digest,
+            "dtype": str(obj.dtype),
+            "shape": list(getattr(obj, "shape", ())),
+        }
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=repr)
+    if isinstance(obj, bytes):
+        return {"__bytes__": hashlib.sha256(obj).hexdigest()}
+    raise TypeError(
+        f"Cannot derive a cache key from {type(obj).__name__} values"
+    )
+
+
+def make_cache_key(agent_name: str, input_data: Dict[str, Any]) -> str:
+    """Build a content-addressed cache key.
+    
+    Args:
+        agent_name: Name of the agent producing the result
+        input_data: Input parameters of the request
+        
+    Returns:
+        Hex digest identifying the request
+        
+    Raises:
+        TypeError: If the input holds values without a canonical encoding
+    """
+    payload = json.dumps(
+        {"agent": agent_name, "input": input_data},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=_canonical_default,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    errors: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the counters as a plain dictionary."""
+        data = asdict(self)
+        data["hit_rate"] = self.hit_rate
+        return data
+
+
+class ResultCache(ABC):
+    """Interface for agent result caches.
+    
+    Cached values are shared between callers and must be treated as
+    read-only.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        """Initialize the cache.
+        
+        Args:
+            ttl: Default time-to-live in seconds, ``None`` for no expiry
+        """
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key`` or ``None`` on a miss."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` under ``key``."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove ``key`` from the cache if present."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove every entry from the cache."""
+        raise NotImplementedError
+
+
+class LRUCache(ResultCache):
+    """Size-bounded in-process cache with TTL and LRU eviction."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        """Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of entries kept in memory
+            ttl: Default time-to-live in seconds, ``None`` for no expiry
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisCache(ResultCache):
+    """Cache tier backed by Redis, shared across worker processes.
+    
+    Values are stored as typed MessagePack (requires ``msgpack``), so hits
+    return the same result objects, with the same arrays, as the local
+    tier. Any client exposing the asynchronous ``get``/``set``/``delete``
+    subset of ``redis.asyncio.Redis`` can be injected, e.g.
+    ``fakeredis.aioredis.FakeRedis`` in tests. Backend errors are logged
+    and treated as misses so an unavailable Redis never fails an agent
+    run.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        ttl: Optional[float] = None,
+        prefix: str = "bci:cache:"
+    ):
+        """Initialize the cache.
+        
+        Args:
+            client: Asynchronous Redis client
+            ttl: Default time-to-live in seconds, ``None`` for no expiry
+            prefix: Namespace prepended to every key
+        """
+        super().__init__(ttl)
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, ttl: Optional[float] = None) -> "RedisCache":
+        """Create a cache connected to the Redis server at ``url``."""
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(url), ttl=ttl)
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self.client.get(self.prefix + key)
+            value = None if raw is None else unpackb(raw, typed=True)
+        except Exception as e:
+            logger.warning(f"Redis cache lookup failed: {e}")
+            self.stats.errors += 1
+            self.stats.misses += 1
+            return None
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            await self.client.set(
+                self.prefix + key,
+                packb(value, typed=True),
+                # Milliseconds, so sub-second TTLs do not round to zero
+                px=max(int(ttl * 1000), 1) if ttl else None,
+            )
+        except Exception as e:
+            logger.warning(f"Redis cache store failed: {e}")
+            self.stats.errors += 1
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.client.delete(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Redis cache delete failed: {e}")
+            self.stats.errors += 1
+
+    async def clear(self) -> None:
+        try:
+            async for key in self.client.scan_iter(match=self.prefix + "*"):
+                await self.client.delete(key)
+        except Exception as e:
+            logger.warning(f"Redis cache clear failed: {e}")
+            self.stats.errors += 1
+
+
+class TieredCache(ResultCache):
+    """Two-level cache with a local front tier and a shared back tier."""
+
+    def __init__(self, local: ResultCache, remote: ResultCache):
+        """Initialize the cache.
+        
+        Args:
+            local: Fast in-process tier consulted first
+            remote: Shared tier consulted on local misses
+        """
+        super().__init__(local.ttl)
+        self.local = local
+        self.remote = remote
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.local.get(key)
+        if value is None:
+            value = await self.remote.get(key)
+            if value is not None:
+                await self.local.set(key, value)
+        if value is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self.local.set(key, value, ttl)
+        await self.remote.set(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await self.local.delete(key)
+        await self.remote.delete(key)
+
+    async def clear(self) -> None:
+        await self.local.clear()
+        await self.remote.clear()
+
+
+def build_cache(settings: Any) -> Optional[ResultCache]:
+    """Build the result cache described by application settings.
+    
+    Args:
+        settings: Application settings
+        
+    Returns:
+        Configured cache, or ``None`` when caching is disabled
+    """
+    if not settings.enable_cache:
+        return None
+    local = LRUCache(settings.cache_max_entries, ttl=settings.cache_ttl)
+    if settings.cache_backend == "redis":
+        remote = RedisCache.from_url(settings.redis_url, ttl=settings.cache_ttl)
+        return TieredCache(local, remote)
+    return local
+
+
+_default_cache: Optional[ResultCache] = None
+_default_cache_built = False
+
+
+def get_default_cache() -> Optional[ResultCache]:
+    """Get the process-wide result cache shared by all agents."""
+    global _default_cache, _default_cache_built
+    if not _default_cache_built:
+        from ..config import get_settings
+
+        _default_cache = build_cache(get_settings())
+        _default_cache_built = True
+    return _default_cache
+
+
+def set_default_cache(cache: Optional[ResultCache]) -> None:
+    """Replace the process-wide result cache, ``None`` disables caching."""
+    global _default_cache, _default_cache_built
+    _default_cache = cache
+    _default_cache_built = True
@@ -0,0 +1,266 @@
+"""
+Offloading of CPU-bound work away from the event loop.
+
+Numeric analyses run in a bounded process pool so that light, I/O-bound
+agent requests keep being served while heavy jobs execute. Large NumPy
+arrays are not pickled to the workers: memory-mapped recordings are reopened
+by file name and other arrays are copied once into shared memory that the
+worker maps without a further copy.
+"""
+
+import asyncio
+import functools
+import mmap
+import os
+import pickle
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """Picklable reference to an array placed in shared memory."""
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+    @classmethod
+    def create(
+        cls,
+        array: np.ndarray
+    ) -> Tuple["SharedArray", shared_memory.SharedMemory]:
+        """Copy ``array`` into a new shared memory block.
+
+        Returns:
+            The reference and the block, which the caller must unlink
+        """
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        view[...] = array
+        return cls(block.name, array.shape, array.dtype.str), block
+
+    def attach(self) -> Tuple[np.ndarray, shared_memory.SharedMemory]:
+        """Map the block into this process as a read-only array."""
+        block = shared_memory.SharedMemory(name=self.name)
+        array = np.ndarray(self.shape, dtype=self.dtype, buffer=block.buf)
+        array.setflags(write=False)
+        return array, block
+
+
+@dataclass(frozen=True)
+class MappedArray:
+    """Picklable reference to a memory-mapped array on disk."""
+
+    filename: str
+    offset: int
+    shape: Tuple[int, ...]
+    dtype: str
+    order: Literal["C", "F"]
+
+    @classmethod
+    def from_memmap(cls, array: np.ndarray) -> Optional["MappedArray"]:
+        """Describe ``array`` if it maps a whole region of a file."""
+        if not isinstance(array, np.memmap) or array.filename is None:
+            return None
+        if not isinstance(array.base, mmap.mmap):
+            # Views of a memmap do not carry their own offset.
+            return None
+        order: Literal["C", "F"] = (
+            "F" if array.flags.f_contiguous and array.ndim > 1 else "C"
+        )
+        return cls(
+            array.filename, array.offset, array.shape, array.dtype.str, order
+        )
+
+    def attach(self) -> np.ndarray:
+        """Reopen the mapping read-only in this process."""
+        return np.memmap(
+            self.filename,
+            dtype=self.dtype,
+            mode="r",
+            offset=self.offset,
+            shape=self.shape,
+            order=self.order,
+        )
+
+
+def _attach(value: Any, blocks: List[shared_memory.SharedMemory]) -> Any:
+    if isinstance(value, SharedArray):
+        array, block = value.attach()
+        blocks.append(block)
+        return array
+    if isinstance(value, MappedArray):
+        return value.attach()
+    return value
+
+
+def _invoke(fn: Callable[..., Any], args: Tuple, kwargs: Dict[str, Any]) -> Any:
+    """Worker-side entry point resolving array references before the call.
+
+    When shared memory was attached, the result is returned pickled: it may
+    hold views of the blocks at any depth, and they must be serialized
+    before the blocks are unmapped.
+    """
+    blocks: List[shared_memory.SharedMemory] = []
+    try:
+        args = tuple(_attach(arg, blocks) for arg in args)
+        kwargs = {key: _attach(value, blocks) for key, value in kwargs.items()}
+        result = fn(*args, **kwargs)
+        if blocks:
+            return pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        return result
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def _release(blocks: List[shared_memory.SharedMemory]) -> None:
+    for block in blocks:
+        block.close()
+        block.unlink()
+    blocks.clear()
+
+
+class ComputePool:
+    """Bounded pool for CPU-bound jobs awaited from the event loop."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        min_shared_bytes: int = 1 << 20,
+        max_pending: Optional[int] = None
+    ):
+        """Initialize the pool; worker processes start on first use.
+
+        Args:
+            max_workers: Worker processes, CPU count when ``None``; ``0``
+                runs jobs in a thread instead, for platforms or tests where
+                subprocesses are unavailable
+            min_shared_bytes: Arrays at least this large travel through
+                shared memory instead of pickling
+            max_pending: Jobs admitted at once per event loop, twice the
+                worker count by default; further callers wait
+        """
+        self.max_workers = (
+            os.cpu_count() or 1 if max_workers is None else max_workers
+        )
+        self.min_shared_bytes = min_shared_bytes
+        self.max_pending = max_pending or max(2 * self.max_workers, 1)
+        self._executor: Optional[Executor] = None
+        # Semaphores are bound to the loop they are first used on.
+        self._admission: (
+            "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, "
+            "asyncio.Semaphore]"
+        ) = weakref.WeakKeyDictionary()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.max_workers == 0:
+                self._executor = ThreadPoolExecutor(max_workers=1)
+            else:
+                # Workers must share the parent's resource tracker: one of
+                # their own would unlink attached blocks when they exit.
+                resource_tracker.ensure_running()
+                self._executor = ProcessPoolExecutor(self.max_workers)
+        return self._executor
+
+    def _transfer(
+        self,
+        value: Any,
+        blocks: List[shared_memory.SharedMemory]
+    ) -> Any:
+        if not isinstance(value, np.ndarray) or self.max_workers == 0:
+            return value
+        mapped = MappedArray.from_memmap(value)
+        if mapped is not None:
+            return mapped
+        if value.nbytes < self.min_shared_bytes:
+            return value
+        shared, block = SharedArray.create(value)
+        blocks.append(block)
+        return shared
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` in the pool and await its result.
+
+        ``fn`` must be picklable, i.e. a module-level function or a method
+        of a picklable object.
+        """
+        loop = asyncio.get_running_loop()
+        admission = self._admission.get(loop)
+        if admission is None:
+            admission = self._admission[loop] = asyncio.Semaphore(
+                self.max_pending
+            )
+        async with admission:
+            blocks: List[shared_memory.SharedMemory] = []
+            # Copying large arrays into shared memory is itself CPU work, so
+            # it happens off the event loop as well.
+            prepared = asyncio.ensure_future(
+                asyncio.to_thread(self._prepare, fn, args, kwargs, blocks)
+            )
+            try:
+                call = await asyncio.shield(prepared)
+            except asyncio.CancelledError:
+                # The copy cannot be interrupted; free it once it is done.
+                prepared.add_done_callback(lambda _: _release(blocks))
+                raise
+            except BaseException:
+                _release(blocks)
+                raise
+
+            pickled = bool(blocks)
+            try:
+                future = self._get_executor().submit(call)
+            except BaseException:
+                _release(blocks)
+                raise
+            try:
+                result = await asyncio.wrap_future(future)
+            finally:
+                # A cancelled caller must not unlink blocks a running worker
+                # may not have attached yet.
+                if future.cancel() or future.done():
+                    _release(blocks)
+                else:
+                    future.add_done_callback(lambda _: _release(blocks))
+            return pickle.loads(result) if pickled else result
+
+    def _prepare(
+        self,
+        fn: Callable[..., Any],
+        args: Tuple,
+        kwargs: Dict[str, Any],
+        blocks: List[shared_memory.SharedMemory]
+    ) -> Callable[[], Any]:
+        return functools.partial(
+            _invoke,
+            fn,
+            tuple(self._transfer(arg, blocks) for arg in args),
+            {key: self._transfer(value, blocks) for key, value in kwargs.items()},
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+_default_pool: Optional[ComputePool] = None
+
+
+def get_compute_pool() -> ComputePool:
+    """Get the process-wide compute pool configured from settings."""
+    global _default_pool
+    if _default_pool is None:
+        from ..config import get_settings
+
+        _default_pool = ComputePool(get_settings().compute_workers)
+    return _default_pool
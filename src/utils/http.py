@@ -0,0 +1,46 @@
+"""
+Helpers shared by the HTTP clients.
+"""
+
+import math
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+#: Longest server-requested retry delay honoured, in seconds
+MAX_RETRY_AFTER = 120.0
+
+
+def parse_retry_after(
+    value: Optional[str],
+    maximum: Optional[float] = MAX_RETRY_AFTER
+) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header.
+
+    The header holds either a number of seconds or an HTTP date; values
+    that are neither are ignored. Delays are capped at ``maximum`` so that
+    a misbehaving server cannot stall a client for hours.
+
+    Args:
+        value: Header value
+        maximum: Upper bound on the delay, ``None`` for no bound
+
+    Returns:
+        Non-negative delay in seconds, or ``None`` without a usable value
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    if math.isnan(seconds):
+        return None
+    seconds = max(seconds, 0.0)
+    return seconds if maximum is None else min(seconds, maximum)
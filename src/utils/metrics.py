@@ -0,0 +1,359 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms are registered by name on a
+``MetricsRegistry`` and labelled per call, e.g.
+``registry.counter("agent_requests_total", ...).inc(agent="x")``. The
+registry renders the Prometheus text format for scraping and a plain
+dictionary snapshot, including histogram quantile estimates, for in-process
+inspection. Values are positional-only, so labels may take any name.
+"""
+
+import bisect
+import math
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+#: Latency buckets in seconds, from sub-millisecond cache hits to slow
+#: language model calls
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    )
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Metric:
+    """Base class for labelled metrics."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        """Initialize the metric.
+
+        Args:
+            name: Metric name
+            help: Human-readable description
+            labelnames: Names of the labels every observation carries
+        """
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {list(self.labelnames)}, "
+                f"got {sorted(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _pairs(self, key: LabelValues) -> List[Tuple[str, str]]:
+        return list(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        """Render the metric in the Prometheus text format."""
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Current values as plain dictionaries."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, /, **labels: Any) -> None:
+        """Increase the counter of the given label set."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: Any) -> float:
+        """Current value of the given label set."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(
+                f"{self.name}{_format_labels(self._pairs(key))} "
+                f"{_format_value(value)}"
+            )
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            {"labels": dict(self._pairs(key)), "value": value}
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def inc(self, amount: float = 1.0, /, **labels: Any) -> None:
+        """Increase the gauge of the given label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, /, **labels: Any) -> None:
+        """Decrease the gauge of the given label set."""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, /, **labels: Any) -> None:
+        """Set the gauge of the given label set."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class _HistogramSeries:
+    """Bucket counts, sum and count of one label set."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, n_buckets: int):
+        self.counts = [0] * n_buckets
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """Initialize the histogram.
+
+        Args:
+            name: Metric name
+            help: Human-readable description
+            labelnames: Names of the labels every observation carries
+            buckets: Increasing upper bounds; ``+Inf`` is appended
+        """
+        super().__init__(name, help, labelnames)
+        bounds = sorted(float(b) for b in buckets if not math.isinf(b))
+        self.buckets = tuple(bounds) + (math.inf,)
+        self._series: Dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, /, **labels: Any) -> None:
+        """Record an observation for the given label set."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(
+                    len(self.buckets)
+                )
+            series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+
+    def quantile(self, q: float, **labels: Any) -> Optional[float]:
+        """Estimate a quantile by interpolating within its bucket."""
+        series = self._series.get(self._key(labels))
+        return None if series is None else self._quantile(series, q)
+
+    def _quantile(self, series: _HistogramSeries, q: float) -> Optional[float]:
+        if series.count == 0:
+            return None
+        rank = q * series.count
+        cumulative = 0
+        for index, count in enumerate(series.counts):
+            if cumulative + count >= rank and count:
+                upper = self.buckets[index]
+                lower = self.buckets[index - 1] if index else 0.0
+                if math.isinf(upper):
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return None
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(
+                (key, list(s.counts), s.sum, s.count)
+                for key, s in self._series.items()
+            )
+        for key, counts, total, count in items:
+            pairs = self._pairs(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(pairs + [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(pairs)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = sorted(self._series.items())
+        return [
+            {
+                "labels": dict(self._pairs(key)),
+                "count": series.count,
+                "sum": series.sum,
+                "mean": series.sum / series.count if series.count else None,
+                "p50": self._quantile(series, 0.5),
+                "p95": self._quantile(series, 0.95),
+                "p99": self._quantile(series, 0.99),
+            }
+            for key, series in items
+        ]
+
+
+class MetricsRegistry:
+    """Named collection of metrics."""
+
+    def __init__(self, namespace: str = ""):
+        """Initialize the registry.
+
+        Args:
+            namespace: Optional prefix joined to every metric name with ``_``
+        """
+        self.namespace = namespace
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(
+        self,
+        cls: Type[Metric],
+        name: str,
+        help: str,
+        labelnames: Sequence[str],
+        **kwargs: Any
+    ) -> Any:
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        metric = self._metrics.get(full_name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(full_name)
+                if metric is None:
+                    metric = cls(full_name, help, labelnames, **kwargs)
+                    self._metrics[full_name] = metric
+        if type(metric) is not cls or metric.labelnames != tuple(labelnames):
+            raise ValueError(
+                f"Metric {full_name} is already registered as "
+                f"{metric.type_name} with labels {list(metric.labelnames)}"
+            )
+        return metric
+
+    def counter(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = ()
+    ) -> Counter:
+        """Get or register a counter."""
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        """Get or register a gauge."""
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or register a histogram."""
+        return self._get_or_create(
+            Histogram, name, help, labelnames, buckets=buckets
+        )
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current values of every metric keyed by name."""
+        return {
+            name: {
+                "type": metric.type_name,
+                "help": metric.help,
+                "values": metric.snapshot(),
+            }
+            for name, metric in sorted(self._metrics.items())
+        }
+
+    def clear(self) -> None:
+        """Remove every registered metric."""
+        with self._lock:
+            self._metrics.clear()
+
+
+_default_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> Optional[MetricsRegistry]:
+    """Get the process-wide registry, or ``None`` when metrics are disabled."""
+    global _default_registry
+    if _default_registry is None:
+        from ..config import get_settings
+
+        if not get_settings().enable_metrics:
+            return None
+        _default_registry = MetricsRegistry()
+    return _default_registry
@@ -0,0 +1,409 @@
+"""
+Rate limiting and admission control for language-model-backed agents.
+
+Requests spend a token from a global bucket and, optionally, from a bucket
+of their tenant. When no token is available they wait in a bounded queue
+ordered by priority, interactive before batch. Requests are shed with a
+fast rejection when the queue is full or their expected wait exceeds the
+allowed maximum, so overload turns into early ``429``-style answers instead
+of unbounded coroutines piling up behind the upstream model.
+"""
+
+import asyncio
+import bisect
+import itertools
+import time
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Union
+
+from .metrics import MetricsRegistry
+
+DEFAULT_TENANT = "default"
+
+
+class Priority(IntEnum):
+    """Request priority; lower values are served first."""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+    @classmethod
+    def parse(cls, value: Union["Priority", int, str, None]) -> "Priority":
+        """Accept a priority, its value or its case-insensitive name."""
+        if value is None:
+            return cls.INTERACTIVE
+        if isinstance(value, str):
+            try:
+                return cls[value.upper()]
+            except KeyError:
+                raise ValueError(f"Unknown priority: {value!r}") from None
+        return cls(value)
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when a request is shed instead of admitted.
+
+    Attributes:
+        retry_after: Suggested delay in seconds before retrying
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate."""
+
+    def __init__(self, rate: float, capacity: float):
+        """Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens, i.e. the allowed burst
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+
+    def try_acquire(
+        self,
+        tokens: float = 1.0,
+        now: Optional[float] = None
+    ) -> bool:
+        """Take ``tokens`` if available."""
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def wait_time(self, tokens: float = 1.0, now: Optional[float] = None) -> float:
+        """Seconds until ``tokens`` will be available."""
+        self._refill(time.monotonic() if now is None else now)
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+    @property
+    def full(self) -> bool:
+        """Whether the bucket has refilled completely."""
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class _Waiter:
+    """Queued request waiting for a token."""
+
+    __slots__ = ("priority", "seq", "tenant", "future", "enqueued")
+
+    def __init__(
+        self,
+        priority: Priority,
+        seq: int,
+        tenant: str,
+        future: "asyncio.Future[float]"
+    ):
+        self.priority = priority
+        self.seq = seq
+        self.tenant = tenant
+        self.future = future
+        self.enqueued = time.monotonic()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdmissionController:
+    """Shared admission control with global and per-tenant token buckets."""
+
+    #: Idle tenant buckets are pruned once this many exist
+    MAX_TENANTS = 10000
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        tenant_rate: Optional[float] = None,
+        tenant_burst: Optional[float] = None,
+        max_queue: int = 100,
+        max_wait: float = 30.0,
+        batch_queue_share: float = 0.5,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """Initialize the controller.
+
+        Args:
+            rate: Requests admitted per second across all tenants
+            burst: Global bucket capacity, one second of ``rate`` (at least
+                one request) by default
+            tenant_rate: Requests per second for each tenant, unlimited
+                when ``None``
+            tenant_burst: Tenant bucket capacity
+            max_queue: Requests allowed to wait at once
+            max_wait: Longest wait in seconds before a request is shed
+            batch_queue_share: Fraction of the queue batch requests may
+                occupy, keeping room for interactive requests
+            metrics: Registry receiving queue depth and outcome metrics
+        """
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.batch_queue_limit = int(max_queue * batch_queue_share)
+        self.tenant_rate = tenant_rate
+        self.tenant_burst = tenant_burst or max(tenant_rate or 1.0, 1.0)
+        self.metrics = metrics
+        self._global = TokenBucket(rate, burst or max(rate, 1.0))
+        self._tenants: Dict[str, TokenBucket] = {}
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional["asyncio.Task[None]"] = None
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Any,
+        metrics: Optional[MetricsRegistry] = None
+    ) -> "AdmissionController":
+        """Create the controller configured in application settings."""
+        tenant_limit = settings.tenant_rate_limit_per_minute
+        return cls(
+            rate=settings.rate_limit_per_minute / 60,
+            burst=settings.rate_limit_burst,
+            tenant_rate=tenant_limit / 60 if tenant_limit else None,
+            max_queue=settings.admission_queue_size,
+            max_wait=settings.admission_max_wait,
+            metrics=metrics,
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests currently waiting."""
+        return len(self._waiters)
+
+    def _tenant_bucket(self, tenant: str) -> Optional[TokenBucket]:
+        if self.tenant_rate is None:
+            return None
+        bucket = self._tenants.get(tenant)
+        if bucket is None:
+            if len(self._tenants) >= self.MAX_TENANTS:
+                self._tenants = {
+                    name: b for name, b in self._tenants.items() if not b.full
+                }
+            bucket = TokenBucket(self.tenant_rate, self.tenant_burst)
+            self._tenants[tenant] = bucket
+        return bucket
+
+    def _try_take(self, tenant: str, now: float) -> bool:
+        if self._global.wait_time(1.0, now) > 0:
+            return False
+        bucket = self._tenant_bucket(tenant)
+        if bucket is not None and not bucket.try_acquire(1.0, now):
+            return False
+        return self._global.try_acquire(1.0, now)
+
+    def _expected_wait(self, priority: Priority, tenant: str, now: float) -> float:
+        ahead = sum(1 for w in self._waiters if w.priority <= priority)
+        expected = self._global.wait_time(ahead + 1.0, now)
+        bucket = self._tenant_bucket(tenant)
+        if bucket is not None:
+            queued = sum(1 for w in self._waiters if w.tenant == tenant)
+            expected = max(expected, bucket.wait_time(queued + 1.0, now))
+        return expected
+
+    def _record(self, outcome: str, priority: Priority) -> None:
+        if self.metrics is not None:
+            self.metrics.counter(
+                "admission_requests_total",
+                "Admission decisions by outcome and priority",
+                ["outcome", "priority"]
+            ).inc(outcome=outcome, priority=priority.name.lower())
+
+    def _record_depth(self) -> None:
+        if self.metrics is None:
+            return
+        gauge = self.metrics.gauge(
+            "admission_queue_depth",
+            "Requests waiting for admission by priority",
+            ["priority"]
+        )
+        for priority in Priority:
+            gauge.set(
+                sum(1 for w in self._waiters if w.priority == priority),
+                priority=priority.name.lower(),
+            )
+
+    def _shed(
+        self,
+        reason: str,
+        priority: Priority,
+        retry_after: float
+    ) -> RateLimitExceeded:
+        self._record("shed", priority)
+        return RateLimitExceeded(
+            f"Request rejected: {reason}", round(retry_after, 3)
+        )
+
+    async def acquire(
+        self,
+        tenant: str = DEFAULT_TENANT,
+        priority: Union[Priority, int, str, None] = Priority.INTERACTIVE,
+        timeout: Optional[float] = None
+    ) -> float:
+        """Wait until the request may proceed.
+
+        Args:
+            tenant: Tenant the request is accounted to
+            priority: Request priority, ``"interactive"`` or ``"batch"``
+            timeout: Longest acceptable wait, ``max_wait`` by default
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: When the request is shed
+            ValueError: On an unknown priority
+        """
+        priority = Priority.parse(priority)
+        max_wait = self.max_wait if timeout is None else min(timeout, self.max_wait)
+        now = time.monotonic()
+        if not self._waiters and self._try_take(tenant, now):
+            self._record("admitted", priority)
+            return 0.0
+
+        limit = (
+            self.max_queue if priority == Priority.INTERACTIVE
+            else self.batch_queue_limit
+        )
+        if len(self._waiters) >= limit:
+            raise self._shed(
+                "admission queue is full", priority,
+                self._global.wait_time(len(self._waiters) + 1.0, now)
+            )
+        expected = self._expected_wait(priority, tenant, now)
+        if expected > max_wait:
+            raise self._shed(
+                f"expected wait {expected:.1f}s exceeds {max_wait:.1f}s",
+                priority, expected
+            )
+
+        waiter = self._enqueue(priority, tenant)
+        try:
+            waited = await asyncio.wait_for(
+                asyncio.shield(waiter.future), max_wait
+            )
+        except asyncio.TimeoutError:
+            raise self._shed(
+                "timed out waiting for admission", priority,
+                self._expected_wait(priority, tenant, time.monotonic())
+            ) from None
+        finally:
+            if not waiter.future.done():
+                waiter.future.cancel()
+                self._remove(waiter)
+        self._record("queued", priority)
+        if self.metrics is not None:
+            self.metrics.histogram(
+                "admission_wait_seconds",
+                "Time requests spent queued before admission",
+                ["priority"]
+            ).observe(waited, priority=priority.name.lower())
+        return waited
+
+    def _enqueue(self, priority: Priority, tenant: str) -> _Waiter:
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is not None and (
+            self._dispatcher.done() or self._dispatcher.get_loop() is not loop
+        ):
+            self._dispatcher = None
+        if self._dispatcher is None:
+            # Futures of another (closed) event loop can never be granted.
+            self._waiters = [
+                w for w in self._waiters if w.future.get_loop() is loop
+            ]
+            self._wakeup = asyncio.Event()
+            self._dispatcher = loop.create_task(self._dispatch(self._wakeup))
+
+        waiter = _Waiter(priority, next(self._seq), tenant, loop.create_future())
+        bisect.insort(self._waiters, waiter)
+        self._record_depth()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return waiter
+
+    def _remove(self, waiter: _Waiter) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        self._record_depth()
+
+    async def _dispatch(self, wakeup: asyncio.Event) -> None:
+        """Grant tokens to waiters in priority order as they refill."""
+        while self._waiters:
+            now = time.monotonic()
+            delay: Optional[float] = None
+            granted = []
+            for waiter in self._waiters:
+                if waiter.future.done():
+                    granted.append(waiter)
+                    continue
+                global_wait = self._global.wait_time(1.0, now)
+                if global_wait > 0:
+                    delay = global_wait
+                    break
+                bucket = self._tenant_bucket(waiter.tenant)
+                if bucket is not None and not bucket.try_acquire(1.0, now):
+                    # Skip tenants over their limit without blocking others.
+                    tenant_wait = bucket.wait_time(1.0, now)
+                    delay = tenant_wait if delay is None else min(
+                        delay, tenant_wait
+                    )
+                    continue
+                self._global.try_acquire(1.0, now)
+                waiter.future.set_result(now - waiter.enqueued)
+                granted.append(waiter)
+
+            if granted:
+                for waiter in granted:
+                    self._waiters.remove(waiter)
+                self._record_depth()
+            if not self._waiters:
+                break
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+        self._dispatcher = None
+
+
+_default_controller: Optional[AdmissionController] = None
+_default_controller_built = False
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Get the process-wide admission controller shared by all agents.
+
+    Returns ``None`` when rate limiting is disabled in settings.
+    """
+    global _default_controller, _default_controller_built
+    if not _default_controller_built:
+        from ..config import get_settings
+        from .metrics import get_metrics
+
+        settings = get_settings()
+        if settings.enable_rate_limiting:
+            _default_controller = AdmissionController.from_settings(
+                settings, get_metrics()
+            )
+        _default_controller_built = True
+    return _default_controller
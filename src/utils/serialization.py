@@ -0,0 +1,263 @@
+"""
+Encoding of agent results at the API boundary.
+
+Agent results carry NumPy arrays and nested result objects by reference;
+they are converted to JSON or MessagePack only when they leave the process.
+``orjson`` encodes contiguous arrays natively and is used when installed,
+otherwise the standard library encoder converts arrays with ``tolist``.
+MessagePack keeps arrays binary: each is packed as its raw buffer with its
+dtype and shape, without a per-element conversion. Caches use the typed
+MessagePack variant, which also records the class of every result object so
+that decoding rebuilds the same types.
+"""
+
+import json
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Optional
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+#: Result classes by name, for decoding typed MessagePack; filled in by
+#: ``register_result_type``
+RESULT_TYPES: Dict[str, Any] = {}
+
+_orjson: Any = None
+_orjson_loaded = False
+
+
+def register_result_type(cls: Any) -> Any:
+    """Make a result class restorable from typed MessagePack.
+
+    Classes need a ``fields`` tuple naming their values and a
+    ``from_mapping`` class method rebuilding an instance from them.
+    """
+    RESULT_TYPES[cls.__name__] = cls
+    return cls
+
+
+def _load_orjson() -> Any:
+    global _orjson, _orjson_loaded
+    if not _orjson_loaded:
+        _orjson_loaded = True
+        try:
+            import orjson
+
+            _orjson = orjson
+        except ImportError:
+            _orjson = None
+    return _orjson
+
+
+def _msgpack() -> Any:
+    try:
+        import msgpack
+    except ImportError as e:
+        raise ImportError(
+            "MessagePack encoding requires msgpack (pip install msgpack)"
+        ) from e
+    return msgpack
+
+
+def _is_array(obj: Any) -> bool:
+    """Whether ``obj`` is an array with at least one dimension.
+
+    NumPy scalars and zero-dimensional arrays are encoded as plain values.
+    """
+    return (
+        hasattr(obj, "__array_interface__")
+        and hasattr(obj, "flags")
+        and getattr(obj, "ndim", 0) > 0
+    )
+
+
+def _json_default(obj: Any) -> Any:
+    """Encode values the JSON encoders do not know about."""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if hasattr(obj, "tolist"):
+        # Arrays orjson cannot encode natively (non-contiguous, object or
+        # complex dtypes) and NumPy scalars.
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode a result as UTF-8 JSON.
+
+    Args:
+        obj: Result, possibly holding result objects and NumPy arrays
+
+    Returns:
+        JSON document
+    """
+    orjson = _load_orjson()
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=_json_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        obj, default=_json_default, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Decode a JSON document produced by ``dumps``."""
+    orjson = _load_orjson()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if _is_array(obj):
+        if obj.dtype.hasobject:
+            return obj.tolist()
+        if not obj.flags.c_contiguous:
+            obj = obj.copy(order="C")
+        return {
+            "__ndarray__": True,
+            "dtype": obj.dtype.str,
+            "shape": list(obj.shape),
+            "data": memoryview(obj).cast("B"),
+        }
+    return _json_default(obj)
+
+
+def _typed_default(obj: Any) -> Any:
+    cls = RESULT_TYPES.get(type(obj).__name__)
+    if cls is not None and type(obj) is cls:
+        encoded = {key: obj[key] for key in cls.fields}
+        encoded["__result__"] = cls.__name__
+        return encoded
+    return _msgpack_default(obj)
+
+
+def packb(obj: Any, typed: bool = False) -> bytes:
+    """Encode a result as MessagePack, keeping arrays binary.
+
+    Arrays become maps with ``__ndarray__``, ``dtype`` (NumPy type string),
+    ``shape`` and the raw C-ordered ``data`` buffer; ``unpackb`` restores
+    them as arrays.
+
+    Args:
+        obj: Result, possibly holding result objects and NumPy arrays
+        typed: Tag registered result objects with their class name under
+            ``__result__``, so ``unpackb(..., typed=True)`` rebuilds them
+
+    Returns:
+        MessagePack document
+
+    Raises:
+        ImportError: If ``msgpack`` is not installed
+    """
+    default = _typed_default if typed else _msgpack_default
+    return _msgpack().packb(obj, default=default, use_bin_type=True)
+
+
+def _restore_array(obj: Dict[Any, Any]) -> Any:
+    if obj.get("__ndarray__") is True:
+        import numpy as np
+
+        return np.frombuffer(obj["data"], dtype=obj["dtype"]).reshape(
+            obj["shape"]
+        )
+    return obj
+
+
+def _restore_typed(obj: Dict[Any, Any]) -> Any:
+    name = obj.get("__result__")
+    cls = RESULT_TYPES.get(name) if isinstance(name, str) else None
+    if cls is not None:
+        return cls.from_mapping(obj)
+    return _restore_array(obj)
+
+
+def unpackb(data: bytes, typed: bool = False) -> Any:
+    """Decode a MessagePack document produced by ``packb``.
+
+    Arrays are read-only views of ``data``, not copies.
+
+    Args:
+        data: MessagePack document
+        typed: Rebuild result objects tagged by ``packb(..., typed=True)``
+    """
+    return _msgpack().unpackb(
+        data,
+        object_hook=_restore_typed if typed else _restore_array,
+        raw=False,
+        strict_map_key=False,
+    )
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """Pick the response media type for an ``Accept`` header.
+
+    MessagePack is chosen only when requested and ``msgpack`` is installed.
+    """
+    if accept and MSGPACK_MEDIA_TYPE in accept:
+        try:
+            _msgpack()
+        except ImportError:
+            return JSON_MEDIA_TYPE
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def encode(obj: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    """Encode a result in the given media type."""
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return packb(obj)
+    return dumps(obj)
+
+
+def approx_nbytes(obj: Any) -> int:
+    """Approximate memory held by a result, counting shared objects once.
+
+    Containers and result objects count their own size and their items'.
+    An array counts the whole buffer it views, since a view keeps that
+    buffer alive; arrays viewing the same buffer count it once, so results
+    sharing arrays by reference are not double-counted.
+
+    Args:
+        obj: Result, possibly holding result objects and NumPy arrays
+
+    Returns:
+        Size in bytes
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if _is_array(current):
+            root = current
+            while _is_array(root.base):
+                root = root.base
+            if root is not current:
+                # A view holds only its header; the buffer is its root's.
+                total += sys.getsizeof(current)
+                if id(root) in seen:
+                    continue
+                seen.add(id(root))
+            total += sys.getsizeof(root)
+            if not root.flags.owndata:
+                # Buffers of memory maps and foreign objects
+                total += root.nbytes
+            continue
+        total += sys.getsizeof(current)
+        if isinstance(current, Mapping):
+            for key, value in current.items():
+                stack.append(key)
+                stack.append(value)
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+    return total
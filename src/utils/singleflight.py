@@ -0,0 +1,84 @@
+"""
+Request coalescing for concurrent identical calls.
+
+While a call for a given key is in flight, further callers with the same key
+await the same underlying future instead of starting their own execution.
+"""
+
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters describing request coalescing."""
+
+    calls: int = 0
+    executions: int = 0
+    coalesced: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the counters as a plain dictionary."""
+        return asdict(self)
+
+
+class SingleFlight:
+    """Deduplicate in-flight calls that share a key."""
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._waiters: Dict[str, int] = {}
+        self.stats = SingleFlightStats()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct keys currently executing."""
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn`` once per key among concurrent callers.
+        
+        The shared execution is shielded from caller cancellation, so one
+        caller giving up does not cancel the result the others await. It is
+        cancelled once every caller has given up, and the last caller returns
+        only after the execution has finished unwinding.
+        
+        Args:
+            key: Identity of the request
+            fn: Zero-argument coroutine function performing the call
+            
+        Returns:
+            Result of the shared execution
+        """
+        self.stats.calls += 1
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._forget(key, done))
+            self.stats.executions += 1
+        else:
+            self.stats.coalesced += 1
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if self._waiters[key] == 1 and not future.done():
+                future.cancel()
+                await asyncio.wait([future])
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def _forget(self, key: str, future: "asyncio.Future[Any]") -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Mark the exception retrieved when every caller has gone away.
+            future.exception()
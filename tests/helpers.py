@@ -0,0 +1,69 @@
+"""Agents and executors shared by the unit tests."""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+
+from src.agents.base_agent import BaseAgent
+from src.utils.cache import LRUCache
+from src.utils.metrics import MetricsRegistry
+from src.utils.rate_limit import RateLimitExceeded
+
+
+class RecordingAdmission:
+    """Admission stub recording every acquisition."""
+
+    def __init__(self, shed: bool = False):
+        self.calls: List[Any] = []
+        self.shed = shed
+
+    async def acquire(self, tenant="default", priority=None, timeout=None):
+        self.calls.append((tenant, priority))
+        if self.shed:
+            raise RateLimitExceeded("Request rejected: test", 1.0)
+        return 0.0
+
+
+class StubExecutor:
+    """Executor echoing its input after an optional delay.
+
+    Attributes:
+        calls: Inputs of every ``arun`` call, in order
+    """
+
+    def __init__(
+        self,
+        delay: float = 0.0,
+        respond: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    ):
+        self.delay = delay
+        self.respond = respond or (lambda data: {"echo": data.get("value")})
+        self.calls: List[Dict[str, Any]] = []
+
+    async def arun(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls.append(input_data)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.respond(input_data)
+
+
+class StubAgent(BaseAgent):
+    """Agent around a stub executor with an isolated cache and metrics."""
+
+    rate_limited = False
+
+    def __init__(
+        self,
+        executor: Optional[Any] = None,
+        name: str = "StubAgent",
+        **kwargs: Any
+    ):
+        self._stub = executor if executor is not None else StubExecutor()
+        kwargs.setdefault("cache", LRUCache())
+        kwargs.setdefault("metrics", MetricsRegistry())
+        super().__init__(None, [], name, **kwargs)
+
+    def _create_executor(self) -> Any:
+        return self._stub
+
+    def _format_output(self, result: Any) -> Dict[str, Any]:
+        return {"status": "success", "agent": self.name, **result}
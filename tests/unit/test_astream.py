@@ -0,0 +1,55 @@
+"""Tests for streamed agent runs."""
+
+import pytest
+
+from tests.helpers import StubAgent, StubExecutor
+
+
+class StreamingExecutor(StubExecutor):
+    """Stub executor streaming two partial events before its result."""
+
+    async def astream(self, input_data):
+        self.calls.append(input_data)
+        yield "partial", {"step": 1}
+        yield "partial", {"step": 2}
+        yield "final", {"echo": input_data.get("value")}
+
+
+async def _events(agent, input_data):
+    return [event async for event in agent.astream(input_data)]
+
+
+@pytest.mark.asyncio
+async def test_partial_events_precede_the_result():
+    agent = StubAgent(StreamingExecutor())
+
+    events = await _events(agent, {"value": 1})
+
+    assert [event["event"] for event in events] == [
+        "partial", "partial", "result"
+    ]
+    assert events[0]["data"] == {"step": 1}
+    assert events[-1]["data"]["echo"] == 1
+    assert all(event["agent"] == "StubAgent" for event in events)
+
+
+@pytest.mark.asyncio
+async def test_cached_results_stream_only_the_result():
+    executor = StreamingExecutor()
+    agent = StubAgent(executor)
+
+    await _events(agent, {"value": 1})
+    events = await _events(agent, {"value": 1})
+
+    assert [event["event"] for event in events] == ["result"]
+    assert len(executor.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_executors_without_astream_yield_the_result():
+    agent = StubAgent(StubExecutor())
+
+    events = await _events(agent, {"value": 2})
+
+    assert [event["event"] for event in events] == ["result"]
+    assert events[0]["data"]["echo"] == 2
@@ -0,0 +1,142 @@
+"""Tests for agent result caches."""
+
+import time
+
+import numpy as np
+import pytest
+
+from src.agents.results import AnalysisResult, CoordinatorResult
+from src.utils.cache import LRUCache, RedisCache, TieredCache, make_cache_key
+
+
+class FakeRedis:
+    """In-memory stand-in for the ``redis.asyncio`` client subset used."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("redis unavailable")
+
+    async def get(self, key):
+        self._check()
+        expires_at = self.expiry.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None):
+        self._check()
+        self.data[key] = value
+        self.expiry[key] = time.monotonic() + px / 1000 if px else None
+
+    async def delete(self, key):
+        self._check()
+        self.data.pop(key, None)
+
+    async def scan_iter(self, match="*"):
+        self._check()
+        prefix = match.rstrip("*")
+        for key in list(self.data):
+            if key.startswith(prefix):
+                yield key
+
+
+def _result() -> CoordinatorResult:
+    analysis = AnalysisResult(
+        "analysis",
+        analysis_type="band_power",
+        results={"channel_band_power": np.arange(6.0).reshape(3, 2)},
+    )
+    return CoordinatorResult(
+        "coordinator",
+        workflow=["analysis"],
+        results={"analysis": analysis},
+        agents_used=["analysis"],
+    )
+
+
+def test_cache_key_ignores_key_order_and_tracks_array_content():
+    a = np.zeros(10_000)
+    b = a.copy()
+    b[5_000] = 1.0
+
+    assert make_cache_key("agent", {"x": 1, "y": 2}) == make_cache_key(
+        "agent", {"y": 2, "x": 1}
+    )
+    assert make_cache_key("agent", {"data": a}) != make_cache_key(
+        "agent", {"data": b}
+    )
+
+
+def test_cache_key_rejects_values_without_canonical_encoding():
+    with pytest.raises(TypeError):
+        make_cache_key("agent", {"when": object()})
+
+
+@pytest.mark.asyncio
+async def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.get("a")
+    await cache.set("c", 3)
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == 1
+    assert cache.stats.evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_restores_result_types():
+    pytest.importorskip("msgpack")
+    cache = RedisCache(FakeRedis())
+    await cache.set("key", _result())
+
+    hit = await cache.get("key")
+
+    assert isinstance(hit, CoordinatorResult)
+    analysis = hit["results"]["analysis"]
+    assert isinstance(analysis, AnalysisResult)
+    np.testing.assert_array_equal(
+        analysis["results"]["channel_band_power"],
+        np.arange(6.0).reshape(3, 2),
+    )
+
+
+@pytest.mark.asyncio
+async def test_redis_cache_keeps_sub_second_ttls():
+    pytest.importorskip("msgpack")
+    client = FakeRedis()
+    cache = RedisCache(client, ttl=0.25, prefix="test:")
+    await cache.set("key", {"value": 1})
+
+    assert client.expiry["test:key"] is not None
+    assert await cache.get("key") == {"value": 1}
+
+
+@pytest.mark.asyncio
+async def test_redis_errors_are_misses():
+    pytest.importorskip("msgpack")
+    client = FakeRedis()
+    cache = RedisCache(client)
+    client.fail = True
+
+    await cache.set("key", {"value": 1})
+    assert await cache.get("key") is None
+    assert cache.stats.errors == 2
+
+
+@pytest.mark.asyncio
+async def test_tiered_cache_fills_local_tier_from_remote():
+    pytest.importorskip("msgpack")
+    local = LRUCache()
+    remote = RedisCache(FakeRedis())
+    await remote.set("key", {"value": 1})
+    cache = TieredCache(local, remote)
+
+    assert await cache.get("key") == {"value": 1}
+    assert await local.get("key") == {"value": 1}
@@ -0,0 +1,93 @@
+"""Tests for the catalog client and Retry-After parsing."""
+
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from src.services import catalog
+from src.services.catalog import CatalogClient
+from src.utils.http import MAX_RETRY_AFTER, parse_retry_after
+
+
+def test_parse_retry_after_accepts_seconds_and_dates():
+    assert parse_retry_after("1.5") == 1.5
+    assert parse_retry_after(formatdate(0, usegmt=True)) == 0.0
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_parse_retry_after_caps_the_delay():
+    assert parse_retry_after("86400") == MAX_RETRY_AFTER
+    assert parse_retry_after("86400", maximum=10.0) == 10.0
+    assert parse_retry_after("86400", maximum=None) == 86400.0
+
+
+def _transport(requests, etag='"v1"'):
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304)
+        return httpx.Response(
+            200, json={"datasets": [{"id": "ds001"}]}, headers={"ETag": etag}
+        )
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_validators_persist_across_clients(tmp_path):
+    requests = []
+    url = "https://catalog.test/datasets"
+
+    async with CatalogClient(
+        transport=_transport(requests), cache_dir=tmp_path
+    ) as client:
+        first = await client.get_json(url, {"page": 1})
+    async with CatalogClient(
+        transport=_transport(requests), cache_dir=tmp_path
+    ) as client:
+        second = await client.get_json(url, {"page": 1})
+
+    assert first == second == {"datasets": [{"id": "ds001"}]}
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+
+
+@pytest.mark.asyncio
+async def test_unreadable_cache_entries_are_refetched(tmp_path):
+    requests = []
+    url = "https://catalog.test/datasets"
+    client = CatalogClient(transport=_transport(requests), cache_dir=tmp_path)
+    path = client._cache_path((url, "[]"))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("{not json")
+
+    body = await client.get_json(url)
+    await client.close()
+
+    assert body == {"datasets": [{"id": "ds001"}]}
+    assert "If-None-Match" not in requests[0].headers
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honoured_up_to_the_cap(monkeypatch):
+    delays = []
+    responses = iter([
+        httpx.Response(503, headers={"Retry-After": "86400"}),
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(200, json=[{"id": "ds001"}]),
+    ])
+
+    async def no_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(catalog.asyncio, "sleep", no_sleep)
+    async with CatalogClient(
+        transport=httpx.MockTransport(lambda request: next(responses))
+    ) as client:
+        body = await client.get_json("https://catalog.test/datasets")
+
+    assert body == [{"id": "ds001"}]
+    assert delays == [MAX_RETRY_AFTER, 2.0]
@@ -0,0 +1,25 @@
+"""Tests for passing arrays to compute pool workers."""
+
+import numpy as np
+
+from src.utils.compute import MappedArray
+
+
+def test_memmaps_are_described_and_reattached(tmp_path):
+    path = tmp_path / "data.npy"
+    np.save(path, np.asfortranarray(np.arange(12.0).reshape(3, 4)))
+    array = np.load(path, mmap_mode="r")
+
+    mapped = MappedArray.from_memmap(array)
+
+    assert mapped is not None and mapped.order == "F"
+    np.testing.assert_array_equal(mapped.attach(), array)
+
+
+def test_views_and_plain_arrays_are_not_described(tmp_path):
+    path = tmp_path / "data.npy"
+    np.save(path, np.zeros((3, 4)))
+    array = np.load(path, mmap_mode="r")
+
+    assert MappedArray.from_memmap(array[1:]) is None
+    assert MappedArray.from_memmap(np.zeros(3)) is None
@@ -0,0 +1,101 @@
+"""Tests for the dataset index and the filters the data query agent sends it."""
+
+import pytest
+
+from src.agents.data_query_agent import DatasetSearchExecutor, _coerce_filters
+from src.services.dataset_index import DatasetIndex
+from src.services.llm_gateway import FakeBackend, LLMGateway
+from src.utils.cache import LRUCache
+from src.utils.metrics import MetricsRegistry
+
+
+def _index() -> DatasetIndex:
+    index = DatasetIndex()
+    index.upsert_catalog({"openneuro": [
+        {"id": "ds001", "name": "Motor imagery EEG", "modality": "EEG",
+         "n_subjects": 20, "sampling_rate": 512, "tasks": ["motor imagery"]},
+        {"id": "ds002", "name": "Resting state MEG", "modality": "MEG",
+         "n_subjects": 8, "sampling_rate": 1000, "tasks": ["rest"]},
+        {"id": "ds003", "name": "P300 speller EEG", "modality": "EEG",
+         "n_subjects": 12, "sampling_rate": 256, "tasks": ["p300", "rest"]},
+    ]})
+    return index
+
+
+def _ids(results):
+    return [dataset["id"] for dataset in results]
+
+
+def test_filter_only_search_orders_by_subject_count():
+    index = _index()
+
+    assert _ids(index.search(modality="EEG")) == ["ds001", "ds003"]
+    assert _ids(index.search(min_subjects=10, max_subjects=15)) == ["ds003"]
+    assert _ids(index.search(min_sampling_rate=600)) == ["ds002"]
+
+
+def test_tasks_accepts_a_single_task_or_a_list():
+    index = _index()
+
+    assert _ids(index.search(tasks="motor imagery")) == ["ds001"]
+    assert _ids(index.search(tasks=["motor imagery"])) == ["ds001"]
+    assert _ids(index.search(tasks=["p300", "rest"])) == ["ds003"]
+
+
+def test_keyword_search_falls_back_to_any_keyword():
+    index = _index()
+
+    assert _ids(index.search(text="speller")) == ["ds003"]
+    assert set(_ids(index.search(text="speller imagery"))) == {"ds001", "ds003"}
+
+
+def test_coerce_filters_converts_and_drops_bad_values():
+    filters = _coerce_filters({
+        "min_subjects": "10",
+        "max_subjects": 15.0,
+        "min_sampling_rate": "fast",
+        "tasks": "motor imagery",
+        "modality": ["EEG", None, ""],
+        "limit": 3,
+        "text": None,
+    })
+
+    assert filters == {
+        "min_subjects": 10,
+        "max_subjects": 15,
+        "tasks": ["motor imagery"],
+        "modality": ["EEG"],
+    }
+
+
+def _executor(answer: str) -> DatasetSearchExecutor:
+    llm = LLMGateway(
+        FakeBackend(responder=lambda request: answer),
+        model="fake",
+        cache=LRUCache(),
+        metrics=MetricsRegistry(),
+    )
+    return DatasetSearchExecutor(_index(), llm)
+
+
+@pytest.mark.asyncio
+async def test_translated_filters_are_coerced_before_searching():
+    executor = _executor(
+        '{"min_subjects": "10", "tasks": "motor imagery",'
+        ' "min_sampling_rate": "abc"}'
+    )
+
+    result = await executor.arun({"query": "motor imagery, 10+ subjects"})
+
+    assert result["filters"] == {"min_subjects": 10, "tasks": ["motor imagery"]}
+    assert _ids(result["datasets"]) == ["ds001"]
+
+
+@pytest.mark.asyncio
+async def test_non_object_translation_falls_back_to_keywords():
+    executor = _executor('["EEG"]')
+
+    result = await executor.arun({"query": "speller"})
+
+    assert result["filters"] == {"text": "speller"}
+    assert _ids(result["datasets"]) == ["ds003"]
@@ -0,0 +1,133 @@
+"""Tests for request deadlines and hedged executions."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.agents.base_agent import HEDGE_MIN_SAMPLES
+from tests.helpers import StubAgent, StubExecutor
+
+
+class SlowFirstExecutor(StubExecutor):
+    """Stub executor whose first call hangs and later calls return at once."""
+
+    async def arun(self, input_data):
+        self.calls.append(input_data)
+        if len(self.calls) == 1:
+            await asyncio.sleep(1.0)
+            return {"echo": "first"}
+        return {"echo": "hedge"}
+
+
+async def _stream(agent, input_data):
+    return [event async for event in agent.astream(input_data)]
+
+
+@pytest.mark.asyncio
+async def test_slow_runs_time_out():
+    agent = StubAgent(StubExecutor(delay=1.0))
+
+    output = await agent.run({"value": 1, "timeout": 0.05})
+
+    assert output["status"] == "timeout"
+
+
+@pytest.mark.asyncio
+async def test_expired_deadlines_are_not_executed():
+    executor = StubExecutor()
+    agent = StubAgent(executor)
+
+    output = await agent.run({"value": 1, "deadline": time.time() - 1})
+
+    assert output["status"] == "timeout"
+    assert executor.calls == []
+
+
+@pytest.mark.asyncio
+async def test_deadline_reaches_the_executor_in_place_of_timeout():
+    executor = StubExecutor()
+    agent = StubAgent(executor)
+
+    before = time.time()
+    await agent.run({"value": 1, "timeout": 30})
+
+    (call,) = executor.calls
+    assert "timeout" not in call
+    assert before + 29 < call["deadline"] <= time.time() + 30
+
+
+@pytest.mark.asyncio
+async def test_invalid_timeouts_fail_the_request():
+    output = await StubAgent().run({"value": 1, "timeout": "soon"})
+
+    assert output["status"] == "failed"
+    assert "timeout" in output["error"]
+
+
+@pytest.mark.asyncio
+async def test_streams_without_executor_stream_honour_deadlines():
+    executor = StubExecutor(delay=1.0)
+    agent = StubAgent(executor)
+
+    expired = await _stream(agent, {"value": 1, "deadline": time.time() - 1})
+    slow = await _stream(agent, {"value": 2, "timeout": 0.05})
+
+    assert expired[0]["data"]["status"] == "timeout"
+    assert slow[0]["data"]["status"] == "timeout"
+    assert [call["value"] for call in executor.calls] == [2]
+
+
+@pytest.mark.asyncio
+async def test_streams_without_executor_stream_are_coalesced():
+    executor = StubExecutor(delay=0.05)
+    agent = StubAgent(executor)
+
+    events, output = await asyncio.gather(
+        _stream(agent, {"value": 1}), agent.run({"value": 1})
+    )
+
+    assert events[0]["data"]["echo"] == output["echo"] == 1
+    assert len(executor.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_are_hedged():
+    executor = SlowFirstExecutor()
+    agent = StubAgent(executor)
+    agent.hedge = True
+    agent._latencies.extend([0.01] * HEDGE_MIN_SAMPLES)
+
+    started = time.perf_counter()
+    output = await agent.run({"value": 1})
+
+    assert output["echo"] == "hedge"
+    assert time.perf_counter() - started < 0.5
+    assert len(executor.calls) == 2
+    hedges = agent.metrics.counter(
+        "agent_hedged_requests_total", "", ["agent", "outcome"]
+    )
+    assert hedges.get(agent="StubAgent", outcome="sent") == 1
+    assert hedges.get(agent="StubAgent", outcome="won") == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_without_enough_latency_samples():
+    executor = StubExecutor(delay=0.05)
+    agent = StubAgent(executor)
+    agent.hedge = True
+
+    await agent.run({"value": 1})
+
+    assert len(executor.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_the_deadline_is_closer_than_the_p95():
+    executor = StubExecutor(delay=0.05)
+    agent = StubAgent(executor)
+    agent._latencies.extend([1.0] * HEDGE_MIN_SAMPLES)
+
+    await agent.run({"value": 1, "hedge": True, "timeout": 0.5})
+
+    assert len(executor.calls) == 1
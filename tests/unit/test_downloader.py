@@ -0,0 +1,188 @@
+"""Tests for resumable, verified file downloads."""
+
+import hashlib
+from typing import AsyncIterator, List
+
+import httpx
+import pytest
+
+from src.services import downloader as downloader_module
+from src.services.downloader import (
+    ChecksumMismatch,
+    DownloadError,
+    FileDownloader,
+    RemoteFile,
+)
+from src.utils.http import MAX_RETRY_AFTER
+
+CONTENT = bytes(range(256)) * 64
+URL = "https://example.org/data/sub-01_eeg.edf"
+
+
+class _Disconnecting(httpx.AsyncByteStream):
+    """Body that sends part of the data, then drops the connection."""
+
+    def __init__(self, data: bytes, cut: int):
+        self.data = data
+        self.cut = cut
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        yield self.data[:self.cut]
+        raise httpx.ReadError("connection reset")
+
+
+class StubServer:
+    """Serves one file with ETag validation and byte ranges.
+
+    Attributes:
+        requests: Headers of every request received
+        disconnect_after: Cut the next full response after this many bytes
+    """
+
+    def __init__(self, content: bytes, etag: str = '"v1"'):
+        self.content = content
+        self.etag = etag
+        self.requests: List[httpx.Headers] = []
+        self.disconnect_after = None
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request.headers)
+        headers = {"ETag": self.etag}
+        range_header = request.headers.get("Range")
+        if_range = request.headers.get("If-Range")
+        if range_header and (if_range is None or if_range == self.etag):
+            start = int(range_header[len("bytes="):].rstrip("-"))
+            headers["Content-Range"] = (
+                f"bytes {start}-{len(self.content) - 1}/{len(self.content)}"
+            )
+            return httpx.Response(
+                206, headers=headers, content=self.content[start:]
+            )
+        if self.disconnect_after is not None:
+            cut, self.disconnect_after = self.disconnect_after, None
+            return httpx.Response(
+                200,
+                headers=headers,
+                stream=_Disconnecting(self.content, cut),
+            )
+        return httpx.Response(200, headers=headers, content=self.content)
+
+
+def _remote(content: bytes = CONTENT, **kwargs) -> RemoteFile:
+    kwargs.setdefault("checksum", hashlib.sha256(content).hexdigest())
+    return RemoteFile(
+        url=URL, path="sub-01_eeg.edf", size=len(content), **kwargs
+    )
+
+
+def _downloader(server: StubServer, **kwargs) -> FileDownloader:
+    kwargs.setdefault("max_retries", 2)
+    return FileDownloader(
+        backoff=0.0,
+        chunk_size=1024,
+        transport=httpx.MockTransport(server),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_download_resumes_after_disconnect(tmp_path):
+    server = StubServer(CONTENT)
+    server.disconnect_after = 4096
+    async with _downloader(server) as downloader:
+        path = await downloader.download_file(
+            _remote(), tmp_path / "sub-01_eeg.edf"
+        )
+
+    assert path.read_bytes() == CONTENT
+    assert len(server.requests) == 2
+    assert server.requests[1]["Range"] == "bytes=4096-"
+    assert server.requests[1]["If-Range"] == '"v1"'
+    assert not list(tmp_path.glob("*.part*"))
+
+
+@pytest.mark.asyncio
+async def test_changed_file_restarts_instead_of_splicing(tmp_path):
+    target = tmp_path / "sub-01_eeg.edf"
+    partial = target.with_name(target.name + ".part")
+    partial.write_bytes(b"stale bytes of the old version")
+    partial.with_name(partial.name + ".json").write_text(
+        '{"validator": "\\"v0\\""}'
+    )
+    server = StubServer(CONTENT, etag='"v1"')
+    async with _downloader(server) as downloader:
+        await downloader.download_file(_remote(), target)
+
+    assert server.requests[0]["If-Range"] == '"v0"'
+    assert target.read_bytes() == CONTENT
+
+
+@pytest.mark.asyncio
+async def test_checksum_mismatch_is_retried_then_reported(tmp_path):
+    server = StubServer(CONTENT)
+    remote = _remote(checksum=hashlib.sha256(b"other").hexdigest())
+    target = tmp_path / "sub-01_eeg.edf"
+    async with _downloader(server, max_retries=1) as downloader:
+        with pytest.raises(DownloadError) as excinfo:
+            await downloader.download_file(remote, target)
+
+    assert isinstance(excinfo.value.__cause__, ChecksumMismatch)
+    # Corrupt data is discarded, so every attempt starts from scratch.
+    assert all("Range" not in headers for headers in server.requests)
+    assert len(server.requests) == 2
+    assert not target.exists()
+    assert not list(tmp_path.glob("*.part*"))
+
+
+@pytest.mark.asyncio
+async def test_download_skips_complete_files(tmp_path):
+    (tmp_path / "sub-01_eeg.edf").write_bytes(CONTENT)
+    server = StubServer(CONTENT)
+    async with _downloader(server) as downloader:
+        paths = await downloader.download([_remote()], tmp_path)
+
+    assert paths == [tmp_path / "sub-01_eeg.edf"]
+    assert server.requests == []
+
+
+@pytest.mark.asyncio
+async def test_complete_partial_file_is_finalized_on_416(tmp_path):
+    target = tmp_path / "sub-01_eeg.edf"
+    partial = target.with_name(target.name + ".part")
+    partial.write_bytes(CONTENT)
+    partial.with_name(partial.name + ".json").write_text(
+        '{"validator": "\\"v1\\""}'
+    )
+    transport = httpx.MockTransport(lambda request: httpx.Response(416))
+    async with FileDownloader(transport=transport) as downloader:
+        await downloader.download_file(_remote(), target)
+
+    assert target.read_bytes() == CONTENT
+    assert not list(tmp_path.glob("*.part*"))
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_honoured_up_to_the_cap(tmp_path, monkeypatch):
+    delays = []
+    server = StubServer(CONTENT)
+    responses = iter([
+        httpx.Response(503, headers={"Retry-After": "86400"}),
+        httpx.Response(429, headers={"Retry-After": "1.5"}),
+    ])
+
+    def handler(request):
+        return next(responses, None) or server(request)
+
+    async def no_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(downloader_module.asyncio, "sleep", no_sleep)
+    async with FileDownloader(
+        max_retries=2, transport=httpx.MockTransport(handler)
+    ) as downloader:
+        path = await downloader.download_file(
+            _remote(), tmp_path / "sub-01_eeg.edf"
+        )
+
+    assert path.read_bytes() == CONTENT
+    assert delays == [MAX_RETRY_AFTER, 1.5]
@@ -0,0 +1,59 @@
+"""Tests for batched spectral features and the band-power tool."""
+
+import numpy as np
+import pytest
+
+from src.agents.tools import BandPowerTool
+from src.processing.features import band_powers
+
+RATE = 250
+
+
+def _sine(freq, seconds=4.0, n_channels=3):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return np.tile(np.sin(2 * np.pi * freq * t), (n_channels, 1))
+
+
+def test_power_concentrates_in_the_band_of_the_signal():
+    powers, names = band_powers(_sine(10)[None], RATE, relative=True)
+
+    assert powers.shape == (1, 3, len(names))
+    assert names[int(powers[0, 0].argmax())] == "alpha"
+    assert powers[0, 0, names.index("alpha")] > 0.9
+
+
+def test_chunked_batches_match_a_single_pass():
+    epochs = np.random.default_rng(0).normal(size=(7, 2, RATE))
+
+    whole, _ = band_powers(epochs, RATE, batch_size=None)
+    chunked, _ = band_powers(epochs, RATE, batch_size=3)
+
+    np.testing.assert_allclose(chunked, whole)
+
+
+def test_peak_frequency_is_returned_with_the_powers():
+    powers, names, peaks = band_powers(
+        _sine(10)[None], RATE, peak_band=(8.0, 12.0)
+    )
+
+    assert peaks.shape == powers.shape[:-1]
+    assert np.allclose(peaks, 10.0, atol=0.5)
+
+
+def test_tool_splits_continuous_recordings_into_epochs():
+    result = BandPowerTool().run(_sine(10), RATE, epoch_seconds=1.0)
+
+    assert result["n_epochs"] == 4
+    assert result["channel_band_power"].shape == (3, len(result["bands"]))
+    assert result["peak_alpha_frequency"] == pytest.approx(10.0, abs=0.5)
+
+
+@pytest.mark.parametrize("epoch_seconds", [10.0, 0.001])
+def test_tool_rejects_epochs_that_do_not_fit(epoch_seconds):
+    with pytest.raises(ValueError, match="epoch_seconds"):
+        BandPowerTool().run(_sine(10), RATE, epoch_seconds=epoch_seconds)
+
+
+def test_tool_rejects_other_shapes():
+    with pytest.raises(ValueError, match="n_epochs"):
+        BandPowerTool().run(np.zeros(RATE), RATE)
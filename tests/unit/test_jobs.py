@@ -0,0 +1,173 @@
+"""Tests for the persistent job queue and its workers."""
+
+import threading
+
+import pytest
+
+from src.services.jobs import (
+    CANCELLED,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    JobQueue,
+    JobWorker,
+)
+from tests.helpers import StubAgent, StubExecutor
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.db")
+    yield queue
+    queue.close()
+
+
+def test_claim_takes_the_highest_priority_job_first(queue):
+    batch = queue.submit("StubAgent", {"value": 1}, priority=1)
+    interactive = queue.submit("StubAgent", {"value": 2}, priority=0)
+
+    first = queue.claim("w1")
+    second = queue.claim("w1")
+
+    assert (first.id, second.id) == (interactive.id, batch.id)
+    assert first.status == RUNNING and first.attempts == 1
+    assert queue.claim("w1") is None
+
+
+def test_concurrent_claims_never_share_a_job(tmp_path, queue):
+    for value in range(40):
+        queue.submit("StubAgent", {"value": value})
+    claimed = []
+
+    def work(worker):
+        # Every worker has its own connection, like worker processes.
+        own = JobQueue(queue.path)
+        while True:
+            job = own.claim(worker)
+            if job is None:
+                break
+            claimed.append(job.id)
+        own.close()
+
+    threads = [
+        threading.Thread(target=work, args=(f"w{i}",)) for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(claimed) == len(set(claimed)) == 40
+
+
+def test_failures_requeue_until_attempts_are_used_up(queue):
+    job = queue.submit("StubAgent", {"value": 1}, max_attempts=2)
+
+    queue.claim("w1")
+    assert queue.fail(job.id, "w1", "boom")
+    assert queue.get(job.id).status == QUEUED
+
+    queue.claim("w1")
+    assert queue.fail(job.id, "w1", "boom again")
+    failed = queue.get(job.id)
+    assert failed.status == FAILED
+    assert failed.error == "boom again"
+
+
+def test_stale_jobs_are_requeued(queue):
+    job = queue.submit("StubAgent", {"value": 1})
+    queue.claim("w1")
+
+    assert queue.requeue_stale(stale_seconds=60) == 0
+    assert queue.requeue_stale(stale_seconds=-1) == 1
+    assert queue.get(job.id).status == QUEUED
+    # The worker that lost the job can no longer report on it.
+    assert not queue.heartbeat(job.id, "w1")
+    assert not queue.complete(job.id, "w1", {"status": "success"})
+
+
+def test_release_returns_the_attempt(queue):
+    job = queue.submit("StubAgent", {"value": 1})
+    queue.claim("w1")
+
+    assert queue.release(job.id, "w1")
+    released = queue.get(job.id)
+    assert released.status == QUEUED
+    assert released.attempts == 0
+    assert released.worker is None
+
+
+def test_cancelled_jobs_lose_their_worker(queue):
+    job = queue.submit("StubAgent", {"value": 1})
+    queue.claim("w1")
+
+    assert queue.cancel(job.id)
+    assert queue.get(job.id).status == CANCELLED
+    assert not queue.heartbeat(job.id, "w1")
+    assert not queue.cancel(job.id)
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_single_jobs_at_batch_priority(queue):
+    executor = StubExecutor()
+    agent = StubAgent(executor)
+    job = queue.submit("StubAgent", {"value": 7})
+
+    assert await JobWorker(queue, {"StubAgent": agent}).run_once()
+
+    finished = queue.get(job.id)
+    assert finished.status == SUCCEEDED
+    assert finished.result["echo"] == 7
+    assert executor.calls[0]["priority"] == "batch"
+
+
+@pytest.mark.asyncio
+async def test_batch_jobs_resume_from_their_checkpoint(queue):
+    executor = StubExecutor()
+    agent = StubAgent(executor)
+    job = queue.submit(
+        "StubAgent", inputs=[{"value": i} for i in range(5)]
+    )
+    # A previous attempt finished the first two inputs before stopping.
+    queue.claim("w0")
+    done = [{"status": "success", "echo": i} for i in range(2)]
+    queue.checkpoint(job.id, "w0", {"results": done}, 0.4)
+    queue.release(job.id, "w0")
+
+    worker = JobWorker(queue, {"StubAgent": agent}, batch_chunk=2)
+    assert await worker.run_once()
+
+    finished = queue.get(job.id)
+    assert finished.status == SUCCEEDED
+    assert [r["echo"] for r in finished.result["results"]] == list(range(5))
+    assert sorted(call["value"] for call in executor.calls) == [2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_unknown_agents_fail_the_job(queue):
+    job = queue.submit("Missing", {"value": 1}, max_attempts=1)
+
+    await JobWorker(queue, {}).run_once()
+
+    assert queue.get(job.id).status == FAILED
+
+
+def test_job_routes_look_up_and_cancel_jobs(queue, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from src.api.main import app
+    from src.services import jobs
+
+    monkeypatch.setattr(jobs, "_default_queue", queue)
+    job = queue.submit("StubAgent", {"value": 1})
+    client = TestClient(app)
+
+    assert client.get(f"/api/v1/jobs/{job.id}").json()["payload"] == {
+        "input": {"value": 1}
+    }
+    assert client.delete(f"/api/v1/jobs/{job.id}").json()["status"] == (
+        CANCELLED
+    )
+    assert client.delete(f"/api/v1/jobs/{job.id}").status_code == 409
+    assert client.get("/api/v1/jobs/unknown").status_code == 404
@@ -0,0 +1,171 @@
+"""Tests for the shared language model gateway."""
+
+import asyncio
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from src.services import llm_gateway
+from src.services.llm_gateway import (
+    AnthropicBackend,
+    FakeBackend,
+    LLMError,
+    LLMGateway,
+    LLMRequest,
+)
+from src.utils.cache import LRUCache
+from src.utils.metrics import MetricsRegistry
+
+
+def _request(text: str = "Summarize the recording", **kwargs) -> LLMRequest:
+    return LLMRequest(messages=[{"role": "user", "content": text}], **kwargs)
+
+
+def _gateway(backend, **kwargs) -> LLMGateway:
+    return LLMGateway(
+        backend, model="fake-model", metrics=MetricsRegistry(), **kwargs
+    )
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Skip retry backoff and record the requested delays."""
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(llm_gateway.asyncio, "sleep", sleep)
+    return delays
+
+
+@pytest.mark.asyncio
+async def test_deterministic_completions_are_cached():
+    backend = FakeBackend()
+    gateway = _gateway(backend, cache=LRUCache())
+
+    first = await gateway.complete(_request())
+    second = await gateway.complete(_request())
+
+    assert second.content == first.content
+    assert second.cached and not first.cached
+    assert backend.calls == 1
+    assert gateway.stats()["requests"] == {
+        "success": 1, "cached": 1, "error": 0
+    }
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_are_coalesced():
+    backend = FakeBackend(latency=0.01)
+    gateway = _gateway(backend)
+
+    responses = await asyncio.gather(
+        *(gateway.complete(_request()) for _ in range(5))
+    )
+
+    assert len({response.content for response in responses}) == 1
+    assert backend.calls == 1
+    assert gateway.stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_sampled_requests_are_neither_cached_nor_coalesced():
+    draws = iter(range(100))
+    backend = FakeBackend(responder=lambda request: str(next(draws)))
+    gateway = _gateway(backend, cache=LRUCache())
+
+    responses = await asyncio.gather(
+        *(gateway.complete(_request(temperature=0.7)) for _ in range(3))
+    )
+    again = await gateway.complete(_request(temperature=0.7))
+
+    assert {response.content for response in responses} == {"0", "1", "2"}
+    assert again.content == "3" and not again.cached
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_a_batch():
+    backend = FakeBackend()
+    gateway = _gateway(backend, max_batch_size=8)
+
+    await asyncio.gather(
+        *(gateway.complete(_request(f"question {i}")) for i in range(8))
+    )
+
+    assert backend.batch_sizes == [8]
+
+
+@pytest.mark.asyncio
+async def test_system_prompt_is_written_once_then_read_from_cache():
+    gateway = _gateway(FakeBackend())
+    system = "You are a BCI research assistant. " * 20
+
+    first = await gateway.complete(_request("a", system=system))
+    second = await gateway.complete(_request("b", system=system))
+
+    assert first.usage.cache_write_tokens > 0
+    assert first.usage.cache_read_tokens == 0
+    assert second.usage.cache_read_tokens == first.usage.cache_write_tokens
+
+
+@pytest.mark.asyncio
+async def test_anthropic_backend_retries_transport_errors(no_sleep):
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connection refused")
+        if len(attempts) == 2:
+            return httpx.Response(
+                529,
+                headers={"retry-after": formatdate(0, usegmt=True)},
+                text="overloaded",
+            )
+        return httpx.Response(200, json={
+            "content": [{"type": "text", "text": "done"}],
+            "model": "claude",
+            "usage": {"input_tokens": 3, "output_tokens": 1},
+        })
+
+    backend = AnthropicBackend(
+        "key", transport=httpx.MockTransport(handler), max_retries=3
+    )
+    response = await backend.complete(_request(model="claude"))
+    await backend.aclose()
+
+    assert response.content == "done"
+    assert len(attempts) == 3
+    # An HTTP-date in the past means retry now.
+    assert no_sleep == [1, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_anthropic_backend_wraps_exhausted_timeouts(no_sleep):
+    def handler(request):
+        raise httpx.ReadTimeout("timed out")
+
+    backend = AnthropicBackend(
+        "key", transport=httpx.MockTransport(handler), max_retries=1
+    )
+    with pytest.raises(LLMError):
+        await backend.complete(_request(model="claude"))
+    await backend.aclose()
+
+
+@pytest.mark.asyncio
+async def test_anthropic_backend_does_not_retry_client_errors(no_sleep):
+    def handler(request):
+        return httpx.Response(400, text="bad request")
+
+    backend = AnthropicBackend(
+        "key", transport=httpx.MockTransport(handler), max_retries=3
+    )
+    with pytest.raises(LLMError) as excinfo:
+        await backend.complete(_request(model="claude"))
+    await backend.aclose()
+
+    assert excinfo.value.status == 400
+    assert no_sleep == []
@@ -0,0 +1,78 @@
+"""Tests for the metrics registry and agent instrumentation."""
+
+import pytest
+
+from src.utils.metrics import MetricsRegistry
+from tests.helpers import StubAgent, StubExecutor
+
+
+def test_counters_and_gauges_accept_any_label_name():
+    registry = MetricsRegistry()
+    counter = registry.counter("orders_total", "Orders", ["amount"])
+    gauge = registry.gauge("queue_depth", "Depth", ["value"])
+
+    counter.inc(amount="large")
+    counter.inc(2, amount="large")
+    gauge.inc(3, value="x")
+    gauge.dec(value="x")
+
+    assert counter.get(amount="large") == 3
+    assert gauge.get(value="x") == 2
+    with pytest.raises(ValueError):
+        counter.inc(-1, amount="large")
+    with pytest.raises(ValueError):
+        counter.inc(kind="missing")
+
+
+def test_reregistering_with_other_labels_fails():
+    registry = MetricsRegistry(namespace="bci")
+    counter = registry.counter("runs_total", "Runs", ["agent"])
+
+    assert counter.name == "bci_runs_total"
+    assert registry.counter("runs_total", "Runs", ["agent"]) is counter
+    with pytest.raises(ValueError):
+        registry.counter("runs_total", "Runs", ["status"])
+    with pytest.raises(ValueError):
+        registry.gauge("runs_total", "Runs", ["agent"])
+
+
+def test_histogram_renders_cumulative_buckets_and_quantiles():
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "latency_seconds", "Latency", ["agent"], buckets=[0.1, 1.0]
+    )
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, agent="a")
+
+    text = registry.render()
+
+    assert '# TYPE latency_seconds histogram' in text
+    assert 'latency_seconds_bucket{agent="a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{agent="a",le="1"} 3' in text
+    assert 'latency_seconds_bucket{agent="a",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{agent="a"} 4' in text
+    assert 0.1 < histogram.quantile(0.5, agent="a") <= 1.0
+
+
+@pytest.mark.asyncio
+async def test_agent_runs_record_status_latency_and_in_flight():
+    registry = MetricsRegistry()
+    agent = StubAgent(StubExecutor(), metrics=registry)
+
+    await agent.run({"value": 1})
+    await agent.run({"value": 1})
+
+    requests = registry.counter(
+        "agent_requests_total", "", ["agent", "status"]
+    )
+    cache = registry.counter(
+        "agent_cache_requests_total", "", ["agent", "result"]
+    )
+    assert requests.get(agent="StubAgent", status="success") == 2
+    assert cache.get(agent="StubAgent", result="miss") == 1
+    assert cache.get(agent="StubAgent", result="hit") == 1
+    assert registry.gauge(
+        "agent_in_flight", "", ["agent"]
+    ).get(agent="StubAgent") == 0
+    snapshot = registry.snapshot()["agent_run_duration_seconds"]
+    assert snapshot["values"][0]["count"] == 2
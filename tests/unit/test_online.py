@@ -0,0 +1,107 @@
+"""Tests for online decoding of streamed blocks."""
+
+import numpy as np
+import pytest
+from scipy import signal
+
+from src.processing.features import design_bandpass
+from src.processing.online import (
+    LatencyTracker,
+    LinearDecoder,
+    OnlineBandPower,
+    OnlineDecoder,
+    RingBuffer,
+    SimulatedStream,
+    StatefulFilter,
+    run_online,
+)
+
+RATE = 250
+
+
+def _blocks(data, size):
+    return [data[:, start:start + size] for start in range(0, data.shape[1], size)]
+
+
+def test_ring_buffer_keeps_the_latest_samples_contiguous():
+    ring = RingBuffer(2, 5)
+    data = np.arange(2 * 12, dtype=float).reshape(2, 12)
+
+    for block in _blocks(data, 3):
+        ring.write(block)
+
+    assert ring.total == 12 and ring.size == 5
+    np.testing.assert_array_equal(ring.latest(), data[:, -5:])
+    np.testing.assert_array_equal(ring.latest(2), data[:, -2:])
+    with pytest.raises(ValueError):
+        ring.latest(6)
+
+
+def test_blockwise_filtering_matches_one_pass():
+    sos = np.array(design_bandpass(float(RATE), 1.0, 40.0))
+    data = np.random.default_rng(0).normal(size=(3, 1000)) + 5.0
+    band_filter = StatefulFilter(sos, 3)
+
+    blockwise = np.hstack([band_filter.process(b) for b in _blocks(data, 32)])
+
+    zi = signal.sosfilt_zi(sos)[:, np.newaxis, :] * data[np.newaxis, :, :1]
+    whole, _ = signal.sosfilt(sos, data, axis=-1, zi=zi)
+    np.testing.assert_allclose(blockwise, whole, atol=1e-9)
+
+
+def test_running_band_power_matches_the_window_mean():
+    data = np.random.default_rng(1).normal(size=(2, 1200))
+    bands = {"alpha": (8.0, 12.0), "beta": (13.0, 30.0)}
+    tracker = OnlineBandPower(RATE, 2, window=RATE, bands=bands)
+    reference = [
+        StatefulFilter(design_bandpass(float(RATE), low, high, 4), 2)
+        for low, high in bands.values()
+    ]
+
+    squared = []
+    for block in _blocks(data, 25):
+        tracker.update(block)
+        squared.append([f.process(block) ** 2 for f in reference])
+
+    window = np.concatenate(squared, axis=-1)[..., -RATE:]
+    assert tracker.ready
+    np.testing.assert_allclose(
+        tracker.features(), np.log(window.mean(axis=-1)), rtol=1e-9
+    )
+
+
+def test_oversized_blocks_are_rejected():
+    tracker = OnlineBandPower(RATE, 2, window=100, max_block_size=50)
+
+    with pytest.raises(ValueError, match="max_block_size"):
+        tracker.update(np.zeros((2, 60)))
+
+
+def test_decoder_emits_once_per_step_after_a_full_window():
+    classify = LinearDecoder(np.ones((2, 5 * 4)), labels=["rest", "move"])
+    decoder = OnlineDecoder(
+        RATE, 4, classify, window_seconds=1.0, step_seconds=0.2
+    )
+    stream = SimulatedStream(4, RATE, block_size=25, realtime=False, seed=0)
+    outputs = []
+
+    stats = run_online(stream, decoder, duration=3.0, on_output=outputs.append)
+
+    assert len(outputs) == 11
+    assert outputs[0].samples == RATE
+    assert {output.prediction for output in outputs} <= {"rest", "move"}
+    assert stats["samples"] == 3 * RATE
+    assert stats["latency"]["count"] == len(outputs)
+
+
+def test_latency_tracker_summarizes_in_milliseconds():
+    tracker = LatencyTracker(capacity=3, budget=0.01)
+
+    for value in (0.001, 0.002, 0.003, 0.02):
+        tracker.record(value)
+
+    summary = tracker.summary()
+    assert summary["count"] == 4
+    assert summary["over_budget"] == 1
+    assert summary["max_ms"] == 20.0
+    assert summary["p50_ms"] == 3.0
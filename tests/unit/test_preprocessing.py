@@ -0,0 +1,110 @@
+"""Tests for the cached preprocessing pipeline."""
+
+import numpy as np
+import pytest
+
+from src.processing.preprocessing import (
+    BandpassFilter,
+    Epoch,
+    PreprocessingPipeline,
+    Rereference,
+    Resample,
+    Signal,
+    build_stages,
+)
+
+RATE = 100
+
+
+@pytest.fixture
+def recording():
+    return np.random.default_rng(0).normal(size=(3, 4 * RATE))
+
+
+def _pipeline(tmp_path, *stages):
+    return PreprocessingPipeline(list(stages), tmp_path / "cache")
+
+
+def test_stage_params_identify_the_stage():
+    assert BandpassFilter(1, 40).params() == {"low": 1, "high": 40, "order": 4}
+
+
+def test_unknown_stages_and_parameters_are_rejected():
+    with pytest.raises(ValueError, match="Unknown preprocessing stage"):
+        build_stages([{"stage": "wavelet"}])
+    with pytest.raises(ValueError, match="Invalid parameters"):
+        build_stages([{"stage": "bandpass", "cutoff": 3}])
+
+
+def test_second_run_is_served_from_the_cache(tmp_path, recording):
+    stages = [{"stage": "bandpass", "low": 1, "high": 30}, {"stage": "rereference"}]
+
+    first = _pipeline(tmp_path, *stages).run(recording, RATE)
+    second = _pipeline(tmp_path, *stages).run(recording, RATE)
+
+    assert first.computed == ["bandpass", "rereference"]
+    assert second.computed == [] and second.reused == first.computed
+    np.testing.assert_array_equal(second.data, first.data)
+
+
+def test_changing_a_stage_recomputes_only_downstream(tmp_path, recording):
+    bandpass = {"stage": "bandpass", "low": 1, "high": 30}
+    _pipeline(tmp_path, bandpass, {"stage": "resample", "sampling_rate": 50}).run(
+        recording, RATE
+    )
+
+    result = _pipeline(
+        tmp_path, bandpass, {"stage": "resample", "sampling_rate": 25}
+    ).run(recording, RATE)
+
+    assert result.reused == ["bandpass"]
+    assert result.computed == ["resample"]
+    assert result.sampling_rate == 25
+    assert result.data.shape == (3, 100)
+
+
+def test_source_overrides_change_the_cache_key(tmp_path, recording):
+    pipeline = _pipeline(tmp_path, {"stage": "rereference"})
+    pipeline.run(recording, RATE)
+
+    result = pipeline.run(recording, RATE * 2)
+
+    assert result.computed == ["rereference"]
+
+
+def test_prune_removes_least_recently_used_outputs(tmp_path, recording):
+    pipeline = _pipeline(tmp_path, {"stage": "rereference"})
+    pipeline.run(recording, RATE)
+    pipeline.run(recording[::-1].copy(), RATE)
+
+    removed = pipeline.prune(0, keep=[])
+
+    assert removed == 2
+    assert pipeline.entries() == []
+
+
+def test_epoch_tiles_the_recording():
+    signal_in = Signal(np.zeros((2, 250)), RATE, ["a", "b"])
+
+    epochs = Epoch(length=1.0, step=0.5).apply(signal_in)
+
+    assert epochs.data.shape == (4, 2, RATE)
+
+
+def test_rereference_to_named_channels():
+    signal_in = Signal(np.array([[1.0, 2.0], [3.0, 5.0]]), RATE, ["a", "b"])
+
+    output = Rereference(["b"]).apply(signal_in)
+
+    np.testing.assert_array_equal(output.data[1], [0.0, 0.0])
+    with pytest.raises(ValueError, match="Unknown reference"):
+        Rereference(["z"]).apply(signal_in)
+
+
+def test_resample_updates_the_rate():
+    signal_in = Signal(np.zeros((1, 200)), RATE, ["a"])
+
+    output = Resample(sampling_rate=50).apply(signal_in)
+
+    assert output.sampling_rate == 50
+    assert output.data.shape == (1, 100)
@@ -0,0 +1,81 @@
+"""Tests for vectorized signal-quality assessment."""
+
+import numpy as np
+import pytest
+
+from src.agents.analysis_agent import SignalAnalysisExecutor
+from src.processing.quality import (
+    assess_signal_quality,
+    assess_signal_quality_batch,
+)
+
+RATE = 250
+
+
+@pytest.fixture
+def recording():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(6, 4 * RATE))
+    data[1] = 0.0
+    data[2] += 20 * np.sin(2 * np.pi * 50 * np.arange(4 * RATE) / RATE)
+    return data
+
+
+def test_flat_and_noisy_channels_are_flagged(recording):
+    report = assess_signal_quality(recording, RATE, line_freq=50)
+
+    assert report.bad_channels == [1, 2]
+    assert report.reasons["flat"][1]
+    assert report.reasons["line_noise"][2]
+    assert 0.0 < report.quality_score < 1.0
+
+
+def test_window_size_does_not_change_the_report(recording):
+    whole = assess_signal_quality(recording, RATE)
+    windowed = assess_signal_quality(recording, RATE, window_seconds=1.0)
+
+    np.testing.assert_allclose(windowed.variance, whole.variance)
+    np.testing.assert_array_equal(windowed.bad_mask, whole.bad_mask)
+
+
+def test_channel_selection_limits_the_report(recording):
+    report = assess_signal_quality(recording, RATE, channels=[0, 2])
+
+    assert report.n_channels == 2
+    assert report.bad_channels == [1]
+
+
+def test_epochs_are_assessed_end_to_end(recording):
+    epochs = np.stack(np.split(recording, 4, axis=-1))
+
+    report = assess_signal_quality(epochs, RATE)
+
+    assert report.n_samples == recording.shape[-1]
+    assert report.bad_channels == [1, 2]
+
+
+def test_other_dimensions_are_rejected():
+    with pytest.raises(ValueError, match="n_epochs"):
+        assess_signal_quality(np.zeros(10), RATE)
+
+
+def test_batch_reports_match_single_reports(recording):
+    batch = assess_signal_quality_batch(
+        np.stack([recording, recording[::-1]]), RATE
+    )
+
+    assert batch[0].bad_channels == [1, 2]
+    assert batch[1].bad_channels == [3, 4]
+
+
+@pytest.mark.asyncio
+async def test_executor_accepts_inline_epochs(recording):
+    epochs = np.stack(np.split(recording, 4, axis=-1))
+
+    result = await SignalAnalysisExecutor().arun({
+        "data": epochs.tolist(),
+        "sampling_rate": RATE,
+        "channel_names": [f"E{i}" for i in range(6)],
+    })
+
+    assert result["results"]["bad_channel_names"] == ["E1", "E2"]
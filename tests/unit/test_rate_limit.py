@@ -0,0 +1,135 @@
+"""Tests for token buckets and admission control."""
+
+import asyncio
+
+import pytest
+
+from src.agents.data_query_agent import DatasetSearchExecutor
+from src.agents.planning_agent import PlanningAgent
+from src.services.dataset_index import DatasetIndex
+from src.services.llm_gateway import FakeBackend, LLMGateway
+from src.utils.cache import LRUCache
+from src.utils.metrics import MetricsRegistry
+from src.utils.rate_limit import (
+    AdmissionController,
+    Priority,
+    RateLimitExceeded,
+    TokenBucket,
+)
+from tests.helpers import RecordingAdmission
+
+
+def _index() -> DatasetIndex:
+    index = DatasetIndex()
+    index.upsert_catalog({"openneuro": [
+        {"id": "ds001", "name": "Motor imagery EEG", "modality": "EEG",
+         "n_subjects": 20, "tasks": ["motor imagery"]},
+        {"id": "ds002", "name": "Resting state MEG", "modality": "MEG",
+         "n_subjects": 8, "tasks": ["rest"]},
+    ]})
+    return index
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=2.0, capacity=2)
+    assert bucket.try_acquire(2.0, now=bucket.updated)
+    assert not bucket.try_acquire(1.0, now=bucket.updated)
+    assert bucket.wait_time(1.0, now=bucket.updated) == pytest.approx(0.5)
+    assert bucket.try_acquire(1.0, now=bucket.updated + 0.5)
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_are_admitted_before_batch():
+    controller = AdmissionController(rate=50.0, burst=1)
+    await controller.acquire()
+    order = []
+
+    async def request(name, priority):
+        await controller.acquire(priority=priority)
+        order.append(name)
+
+    batch = asyncio.ensure_future(request("batch", Priority.BATCH))
+    await asyncio.sleep(0)
+    interactive = asyncio.ensure_future(request("interactive", "interactive"))
+    await asyncio.gather(batch, interactive)
+
+    assert order == ["interactive", "batch"]
+
+
+@pytest.mark.asyncio
+async def test_requests_are_shed_when_the_queue_is_full():
+    controller = AdmissionController(rate=1.0, burst=1, max_queue=1)
+    await controller.acquire()
+    waiting = asyncio.ensure_future(controller.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        await controller.acquire()
+    assert excinfo.value.retry_after > 0
+    waiting.cancel()
+
+
+@pytest.mark.asyncio
+async def test_requests_are_shed_when_the_wait_is_too_long():
+    controller = AdmissionController(rate=0.1, burst=1, max_wait=1.0)
+    await controller.acquire()
+
+    with pytest.raises(RateLimitExceeded):
+        await controller.acquire()
+    assert controller.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_agents_without_model_calls_are_not_throttled():
+    controller = AdmissionController(rate=0.01, burst=1, max_wait=0.1)
+    agent = PlanningAgent(
+        None, [], cache=LRUCache(), metrics=MetricsRegistry(),
+        admission=controller,
+    )
+
+    outputs = await asyncio.gather(*(
+        agent.run({"task": f"plan study {i}"}) for i in range(40)
+    ))
+
+    assert {output["status"] for output in outputs} == {"success"}
+
+
+@pytest.mark.asyncio
+async def test_structured_searches_do_not_take_admission():
+    admission = RecordingAdmission()
+    llm = LLMGateway(FakeBackend(), model="fake", metrics=MetricsRegistry())
+    executor = DatasetSearchExecutor(_index(), llm, admission=admission)
+
+    result = await executor.arun({"filters": {"modality": ["EEG"]}})
+
+    assert [d["id"] for d in result["datasets"]] == ["ds001"]
+    assert admission.calls == []
+
+
+@pytest.mark.asyncio
+async def test_free_text_searches_admit_only_the_translation():
+    admission = RecordingAdmission()
+    llm = LLMGateway(
+        FakeBackend(responder=lambda request: '{"modality": ["MEG"]}'),
+        model="fake",
+        metrics=MetricsRegistry(),
+    )
+    executor = DatasetSearchExecutor(_index(), llm, admission=admission)
+
+    result = await executor.arun({
+        "query": "resting state", "tenant": "lab", "priority": "batch"
+    })
+
+    assert [d["id"] for d in result["datasets"]] == ["ds002"]
+    assert admission.calls == [("lab", "batch")]
+
+
+@pytest.mark.asyncio
+async def test_shed_translations_propagate():
+    llm = LLMGateway(FakeBackend(), model="fake", metrics=MetricsRegistry())
+    executor = DatasetSearchExecutor(
+        _index(), llm, admission=RecordingAdmission(shed=True)
+    )
+
+    with pytest.raises(RateLimitExceeded):
+        await executor.arun({"query": "motor imagery"})
@@ -0,0 +1,89 @@
+"""Tests for agent result objects and their encodings."""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.agents.results import AnalysisResult, DataQueryResult
+from src.utils.serialization import (
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    approx_nbytes,
+    dumps,
+    encode,
+    negotiate,
+    packb,
+    unpackb,
+)
+
+
+def _analysis(values=None):
+    values = np.arange(6.0).reshape(2, 3) if values is None else values
+    return AnalysisResult(
+        "AnalysisAgent", "band_power", {"powers": values}, ["Filter first"]
+    )
+
+
+def test_results_are_slotted_mappings():
+    result = DataQueryResult("DataQueryAgent", [{"id": "ds1"}], "motor")
+
+    assert list(result) == [
+        "status", "agent", "datasets", "query", "filters", "total_results"
+    ]
+    assert result["total_results"] == 1
+    assert result.get("missing") is None
+    assert "datasets" in result and "missing" not in result
+    assert not hasattr(result, "__dict__")
+    with pytest.raises(KeyError):
+        result["missing"]
+
+
+def test_json_encodes_arrays_as_lists():
+    decoded = json.loads(dumps({"nodes": {"a": _analysis()}}))
+
+    assert decoded["nodes"]["a"]["results"]["powers"] == [
+        [0.0, 1.0, 2.0], [3.0, 4.0, 5.0]
+    ]
+    assert decoded["nodes"]["a"]["analysis_type"] == "band_power"
+
+
+def test_msgpack_keeps_arrays_binary():
+    pytest.importorskip("msgpack")
+    values = np.arange(12.0).reshape(3, 4)[:, ::2]
+
+    decoded = unpackb(packb(_analysis(values)))
+
+    np.testing.assert_array_equal(decoded["results"]["powers"], values)
+    assert decoded["results"]["powers"].dtype == np.float64
+
+
+def test_typed_msgpack_rebuilds_result_objects():
+    pytest.importorskip("msgpack")
+
+    decoded = unpackb(packb(_analysis(), typed=True), typed=True)
+
+    assert isinstance(decoded, AnalysisResult)
+    assert decoded.recommendations == ["Filter first"]
+    np.testing.assert_array_equal(
+        decoded.results["powers"], _analysis().results["powers"]
+    )
+
+
+def test_negotiation_prefers_json_unless_msgpack_is_asked_for():
+    pytest.importorskip("msgpack")
+
+    assert negotiate(None) == JSON_MEDIA_TYPE
+    assert negotiate("application/json") == JSON_MEDIA_TYPE
+    assert negotiate(f"{MSGPACK_MEDIA_TYPE}, */*") == MSGPACK_MEDIA_TYPE
+    assert encode({"a": 1}) == dumps({"a": 1})
+
+
+def test_shared_arrays_are_counted_once():
+    values = np.zeros(1000)
+    one = approx_nbytes(_analysis(values))
+
+    both = approx_nbytes([_analysis(values), _analysis(values[:10])])
+
+    assert one >= values.nbytes
+    assert both < 2 * values.nbytes
@@ -0,0 +1,129 @@
+"""Tests for coordinator task routing and speculative execution."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.agents.coordinator_agent import CoordinatorAgent, WorkflowExecutor
+from src.agents.router import TaskRouter
+from src.agents.workflow import WorkflowEngine
+from src.utils.metrics import MetricsRegistry
+from tests.helpers import StubAgent, StubExecutor
+
+RULES = {"A": ["analy", "signal"], "B": ["dataset"], "C": ["plan"]}
+
+
+class RoutingModel:
+    """Language model answering with a fixed agent list after a delay."""
+
+    def __init__(self, answer: str, delay: float = 0.0):
+        self.answer = answer
+        self.delay = delay
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(content=self.answer)
+
+
+def _agents(delay: float = 0.0):
+    return [StubAgent(StubExecutor(delay), name=name) for name in "ABC"]
+
+
+def _executor(agents, llm=None):
+    return WorkflowExecutor(
+        WorkflowEngine(agents),
+        TaskRouter(agents, llm, rules=RULES),
+        MetricsRegistry(),
+    )
+
+
+def test_keyword_rules_pick_agents_by_matches():
+    router = TaskRouter(_agents(), rules=RULES)
+
+    decision = router.classify("Analyze the signal of this dataset")
+
+    assert decision.method == "rules"
+    assert decision.agents == ["A", "B"]
+    assert decision.confident
+
+
+def test_unmatched_tasks_stay_pending_with_candidates():
+    router = TaskRouter(_agents(), rules=RULES, max_candidates=2)
+
+    decision = router.classify("Something else entirely")
+
+    assert not decision.confident
+    assert decision.candidates == ["A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_model_settles_ambiguous_tasks():
+    model = RoutingModel('I pick ["C", "Unknown", "C"]')
+    router = TaskRouter(_agents(), model, rules=RULES)
+
+    decision = await router.route("Something else entirely")
+
+    assert decision.method == "llm"
+    assert decision.agents == ["C"]
+
+
+@pytest.mark.asyncio
+async def test_unusable_model_answers_fall_back_to_every_agent():
+    router = TaskRouter(_agents(), RoutingModel("no idea"), rules=RULES)
+
+    decision = await router.route("Something else entirely")
+
+    assert decision.method == "fallback"
+    assert decision.agents == ["A", "B", "C"]
+
+
+@pytest.mark.asyncio
+async def test_rule_matches_do_not_consult_the_model():
+    model = RoutingModel('["C"]')
+    agents = _agents()
+
+    result = await _executor(agents, model).arun({"task": "find a dataset"})
+
+    assert model.calls == 0
+    assert result["agents_used"] == ["B"]
+    assert result["results"]["routing"]["method"] == "rules"
+    assert agents[0]._stub.calls == [] and agents[2]._stub.calls == []
+
+
+@pytest.mark.asyncio
+async def test_speculative_losers_are_cancelled():
+    agents = _agents(delay=0.2)
+    executor = _executor(agents, RoutingModel('["B"]', delay=0.05))
+
+    started = asyncio.get_running_loop().time()
+    result = await executor.arun({"task": "Something else entirely"})
+    elapsed = asyncio.get_running_loop().time() - started
+
+    routing = result["results"]["routing"]
+    assert routing["speculative"] == ["A", "B"]
+    assert routing["cancelled"] == ["A"]
+    assert result["agents_used"] == ["B"]
+    # B started before the model answered, so the delays overlap.
+    assert elapsed < 0.24
+    counter = executor.metrics.counter(
+        "coordinator_speculative_runs_total", "", ["outcome"]
+    )
+    assert counter.get(outcome="kept") == 1
+    assert counter.get(outcome="cancelled") == 1
+
+
+@pytest.mark.asyncio
+async def test_completed_agents_are_not_run_again():
+    agents = _agents()
+    coordinator = CoordinatorAgent(None, [], agents=agents)
+
+    result = await coordinator.run({
+        "task": "Something else entirely",
+        "completed": {"A": {"status": "success", "echo": "saved"}},
+    })
+
+    assert agents[0]._stub.calls == []
+    assert result["results"]["nodes"]["A"]["echo"] == "saved"
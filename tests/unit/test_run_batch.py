@@ -0,0 +1,76 @@
+"""Tests for BaseAgent.run_batch."""
+
+import pytest
+
+from src.utils.rate_limit import Priority
+from tests.helpers import RecordingAdmission, StubAgent, StubExecutor
+
+
+class BatchExecutor(StubExecutor):
+    """Stub executor with an ``abatch`` method failing odd values."""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    async def abatch(self, inputs):
+        self.batches.append([data["value"] for data in inputs])
+        return [
+            ValueError("odd") if data["value"] % 2
+            else {"echo": data["value"]}
+            for data in inputs
+        ]
+
+
+@pytest.mark.asyncio
+async def test_identical_inputs_execute_once_and_are_cached():
+    executor = StubExecutor()
+    agent = StubAgent(executor)
+
+    first = await agent.run_batch([{"value": 1}, {"value": 1}, {"value": 2}])
+    second = await agent.run_batch([{"value": 2}])
+
+    assert [output["echo"] for output in first] == [1, 1, 2]
+    assert second[0]["echo"] == 2
+    assert [data["value"] for data in executor.calls] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_individual_executions_default_to_batch_priority():
+    admission = RecordingAdmission()
+    agent = StubAgent(admission=admission)
+    agent.rate_limited = True
+
+    await agent.run_batch([
+        {"value": 1}, {"value": 2, "priority": "interactive"}
+    ])
+
+    assert len(admission.calls) == 2
+    assert ("default", Priority.BATCH) in admission.calls
+    assert ("default", "interactive") in admission.calls
+
+
+@pytest.mark.asyncio
+async def test_individual_executions_respect_deadlines():
+    agent = StubAgent(StubExecutor(delay=1.0))
+
+    outputs = await agent.run_batch([
+        {"value": 1, "timeout": 0.05}, {"value": 2, "timeout": "soon"}
+    ])
+
+    assert [output["status"] for output in outputs] == ["timeout", "failed"]
+
+
+@pytest.mark.asyncio
+async def test_abatch_chunks_isolate_failing_items():
+    executor = BatchExecutor()
+    agent = StubAgent(executor)
+    agent.max_batch_size = 2
+
+    outputs = await agent.run_batch([{"value": v} for v in (0, 1, 2)])
+
+    assert sorted(executor.batches) == [[0, 1], [2]]
+    assert [output["status"] for output in outputs] == [
+        "success", "failed", "success"
+    ]
+    assert outputs[1]["error"] == "odd"
@@ -0,0 +1,43 @@
+"""Tests for the memory-mapped vector index."""
+
+import numpy as np
+
+from src.services.semantic_search import VectorIndex
+
+
+def _vectors(*rows):
+    return np.asarray(rows, dtype=np.float32)
+
+
+def test_upserted_vectors_are_searchable_and_persisted(tmp_path):
+    index = VectorIndex(tmp_path, "model")
+    index.upsert(["a", "b"], ["alpha", "beta"], _vectors([1, 0], [0, 1]))
+    index.save()
+
+    reopened = VectorIndex(tmp_path, "model")
+
+    assert len(reopened) == 2
+    assert reopened.search(_vectors([1, 0.1]), k=1)[0][0] == "a"
+    assert reopened.search(_vectors([1, 0]), candidates=["b"])[0][0] == "b"
+
+
+def test_removed_rows_are_compacted(tmp_path):
+    index = VectorIndex(tmp_path, "model")
+    index.upsert(
+        ["a", "b", "c"], ["x", "y", "z"], _vectors([1, 0], [0, 1], [1, 1])
+    )
+
+    index.remove(["b"])
+
+    assert index.ids == ["a", "c"]
+    assert [hit for hit, _ in index.search(_vectors([0, 1]))] == ["c", "a"]
+    assert len(list(tmp_path.glob("vectors*.npy"))) == 1
+
+
+def test_index_for_another_model_starts_empty(tmp_path):
+    index = VectorIndex(tmp_path, "model")
+    index.upsert(["a"], ["x"], _vectors([1, 0]))
+    index.save()
+
+    assert len(VectorIndex(tmp_path, "other")) == 0
+    assert VectorIndex(tmp_path, "other").search(_vectors([1, 0])) == []
@@ -0,0 +1,100 @@
+"""Tests for request coalescing."""
+
+import asyncio
+from typing import Optional
+
+import pytest
+
+from src.utils.singleflight import SingleFlight
+
+
+class Counter:
+    """Coroutine function counting its executions."""
+
+    def __init__(self, delay: float = 0.05, error: Optional[Exception] = None):
+        self.delay = delay
+        self.error = error
+        self.executions = 0
+        self.cancelled = False
+
+    async def __call__(self):
+        self.executions += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.executions
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    fn = Counter()
+
+    results = await asyncio.gather(*(flight.do("key", fn) for _ in range(5)))
+
+    assert results == [1] * 5
+    assert fn.executions == 1
+    assert flight.stats.to_dict() == {
+        "calls": 5, "executions": 1, "coalesced": 4
+    }
+    assert flight.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_distinct_keys_and_later_calls_execute_again():
+    flight = SingleFlight()
+    fn = Counter(delay=0)
+
+    await asyncio.gather(flight.do("a", fn), flight.do("b", fn))
+    await flight.do("a", fn)
+
+    assert fn.executions == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    flight = SingleFlight()
+    fn = Counter(error=RuntimeError("boom"))
+
+    results = await asyncio.gather(
+        flight.do("key", fn), flight.do("key", fn), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert fn.executions == 1
+
+
+@pytest.mark.asyncio
+async def test_one_caller_cancelling_does_not_cancel_the_others():
+    flight = SingleFlight()
+    fn = Counter(delay=0.1)
+    first = asyncio.ensure_future(flight.do("key", fn))
+    second = asyncio.ensure_future(flight.do("key", fn))
+    await asyncio.sleep(0.01)
+
+    first.cancel()
+
+    assert await second == 1
+    assert first.cancelled()
+    assert not fn.cancelled
+
+
+@pytest.mark.asyncio
+async def test_execution_is_cancelled_when_every_caller_gives_up():
+    flight = SingleFlight()
+    fn = Counter(delay=1.0)
+    callers = [
+        asyncio.ensure_future(flight.do("key", fn)) for _ in range(2)
+    ]
+    await asyncio.sleep(0.01)
+
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+
+    assert fn.cancelled
+    assert flight.in_flight == 0
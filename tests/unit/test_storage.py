@@ -0,0 +1,123 @@
+"""Tests for HDF5 recording storage and analyses fed from it."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("h5py")
+
+from src.agents.analysis_agent import SignalAnalysisExecutor
+from src.processing.quality import assess_signal_quality
+from src.processing.storage import (
+    HDF5RecordingReader,
+    read_recording,
+    write_recording,
+)
+from src.utils.compute import ComputePool
+
+RATE = 250.0
+
+
+def _recording(n_channels: int = 4, seconds: float = 30.0) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    n_samples = int(seconds * RATE)
+    data = rng.normal(0.0, 10.0, (n_channels, n_samples))
+    data[1] += 40 * np.sin(2 * np.pi * 50 * np.arange(n_samples) / RATE)
+    return data
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 1e-4), ("int16", 0.1)])
+def test_round_trip(tmp_path, dtype, tolerance):
+    data = _recording()
+    path = write_recording(
+        tmp_path / "recording.h5", data, RATE, dtype, chunk_seconds=1.0
+    )
+
+    with HDF5RecordingReader(path) as reader:
+        assert reader.storage_dtype == dtype
+        np.testing.assert_allclose(reader.read(), data, atol=tolerance)
+        np.testing.assert_allclose(
+            reader.read(250, 300, [3, 0]), data[[3, 0], 250:300],
+            atol=tolerance,
+        )
+        epochs = reader.read_epochs([900, 100], 50, channels=slice(0, 2))
+        np.testing.assert_allclose(epochs[0], data[:2, 900:950], atol=tolerance)
+        np.testing.assert_allclose(epochs[1], data[:2, 100:150], atol=tolerance)
+        with pytest.raises(ValueError):
+            reader.read_epochs([data.shape[1] - 10], 50)
+
+
+def test_windows_cover_a_sample_range(tmp_path):
+    data = _recording()
+    path = write_recording(tmp_path / "recording.h5", data, RATE)
+
+    with HDF5RecordingReader(path) as reader:
+        windows = list(
+            reader.windows(300, drop_last=False, first=500, last=1200)
+        )
+
+    assert [(w.start, w.stop) for w in windows] == [
+        (500, 800), (800, 1100), (1100, 1200)
+    ]
+    np.testing.assert_allclose(windows[-1].data, data[:, 1100:1200], atol=1e-4)
+
+
+@pytest.mark.parametrize("layout", ["h5", "npy"])
+def test_read_recording_time_range_and_channels(tmp_path, layout):
+    data = _recording()
+    if layout == "h5":
+        path = write_recording(tmp_path / "recording.h5", data, RATE)
+    else:
+        path = tmp_path / "recording.npy"
+        np.save(path, data)
+
+    samples, rate, names = read_recording(
+        path, 2.0, 3.5, [2, 0], sampling_rate=RATE
+    )
+
+    assert rate == RATE
+    assert samples.shape == (2, 375)
+    np.testing.assert_allclose(samples, data[[2, 0], 500:875], atol=1e-4)
+    if layout == "h5":
+        assert list(names) == ["Ch03", "Ch01"]
+
+
+@pytest.mark.asyncio
+async def test_signal_quality_streams_hdf5_windows(tmp_path, monkeypatch):
+    data = _recording(seconds=180.0)
+    path = write_recording(tmp_path / "recording.h5", data, RATE)
+    reads = []
+    read = HDF5RecordingReader.read
+
+    def recording_read(self, start=0, stop=None, channels=None):
+        result = read(self, start, stop, channels)
+        reads.append(result.shape[1])
+        return result
+
+    monkeypatch.setattr(HDF5RecordingReader, "read", recording_read)
+    executor = SignalAnalysisExecutor(pool=ComputePool(max_workers=0))
+
+    result = await executor.arun({"data_path": str(path), "line_freq": 50})
+
+    expected = assess_signal_quality(data.astype(np.float32), RATE)
+    assert max(reads) == int(60 * RATE)
+    assert result["results"]["bad_channel_names"] == [
+        f"Ch{i + 1:02d}" for i in expected.bad_channels
+    ]
+    assert "Ch02" in result["results"]["bad_channel_names"]
+
+
+@pytest.mark.asyncio
+async def test_signal_quality_of_an_hdf5_time_range(tmp_path):
+    data = _recording(seconds=60.0)
+    path = write_recording(tmp_path / "recording.h5", data, RATE)
+    executor = SignalAnalysisExecutor(pool=ComputePool(max_workers=0))
+
+    result = await executor.arun({
+        "data_path": str(path), "start": 10.0, "stop": 20.0,
+        "channels": [0, 1],
+    })
+
+    assert result["results"]["n_samples"] == 2500
+    assert result["results"]["good_channels"] + (
+        result["results"]["bad_channels"]
+    ) == 2
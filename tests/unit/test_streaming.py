@@ -0,0 +1,96 @@
+"""Tests for windowed access to memory-mapped recordings."""
+
+import json
+
+import numpy as np
+import pytest
+
+from src.processing.streaming import (
+    RecordingReader,
+    RecordingWriter,
+    iter_windows,
+    window_view,
+)
+
+
+@pytest.fixture
+def data():
+    return np.arange(4 * 10, dtype=float).reshape(4, 10)
+
+
+def test_iter_windows_steps_by_window_minus_overlap(data):
+    windows = list(iter_windows(data, 4, overlap=2))
+
+    assert [(w.index, w.start, w.stop) for w in windows] == [
+        (0, 0, 4), (1, 2, 6), (2, 4, 8), (3, 6, 10)
+    ]
+    np.testing.assert_array_equal(windows[1].data, data[:, 2:6])
+
+
+def test_iter_windows_keeps_a_short_trailing_window_on_request(data):
+    kept = list(iter_windows(data, 4, drop_last=False))
+    dropped = list(iter_windows(data, 4))
+
+    assert [(w.start, w.stop) for w in kept] == [(0, 4), (4, 8), (8, 10)]
+    assert [(w.start, w.stop) for w in dropped] == [(0, 4), (4, 8)]
+
+
+def test_evenly_spaced_channels_yield_views(data):
+    (window,) = iter_windows(data, 10, channels=[0, 2])
+
+    assert np.shares_memory(window.data, data)
+    np.testing.assert_array_equal(window.data, data[[0, 2]])
+
+
+def test_irregular_channels_copy_the_selection(data):
+    (window,) = iter_windows(data, 10, channels=[3, 0, 1])
+
+    assert not np.shares_memory(window.data, data)
+    np.testing.assert_array_equal(window.data, data[[3, 0, 1]])
+
+
+def test_out_of_range_channels_raise(data):
+    with pytest.raises(IndexError):
+        list(iter_windows(data, 5, channels=[2, 4]))
+
+
+@pytest.mark.parametrize("window_size, overlap", [(0, 0), (4, 4), (4, -1)])
+def test_invalid_window_parameters_raise(data, window_size, overlap):
+    with pytest.raises(ValueError):
+        list(iter_windows(data, window_size, overlap))
+
+
+def test_window_view_matches_iter_windows(data):
+    view = window_view(data, 4, overlap=1)
+
+    expected = [w.data for w in iter_windows(data, 4, overlap=1)]
+    assert view.shape == (3, 4, 4)
+    assert np.shares_memory(view, data)
+    np.testing.assert_array_equal(view, np.stack(expected))
+
+
+def test_written_recordings_read_back_in_windows(tmp_path, data):
+    with RecordingWriter(tmp_path / "eeg_data.npy", 4, 10) as writer:
+        writer.write(data[:, :6])
+        writer.write(data[:, 6:])
+        with pytest.raises(ValueError):
+            writer.write(data[:, :1])
+    (tmp_path / "metadata.json").write_text(json.dumps({
+        "sampling_rate": 5, "channels": ["C3", "Cz", "C4", "Pz"]
+    }))
+
+    reader = RecordingReader.from_directory(tmp_path)
+    windows = list(reader.windows(window_seconds=1.0, overlap_seconds=0.4))
+
+    assert reader.channel_names[0] == "C3"
+    assert [(w.start, w.stop) for w in windows] == [(0, 5), (3, 8)]
+    np.testing.assert_array_equal(reader.read(2, 4, channels=[1]), data[1:2, 2:4])
+
+
+def test_reader_needs_a_sampling_rate_for_seconds(tmp_path, data):
+    np.save(tmp_path / "eeg_data.npy", data)
+
+    reader = RecordingReader(tmp_path / "eeg_data.npy")
+
+    with pytest.raises(ValueError, match="Sampling rate"):
+        list(reader.windows(window_seconds=1.0))
@@ -0,0 +1,156 @@
+"""Tests for the dependency-aware workflow engine."""
+
+import time
+
+import pytest
+
+from src.agents.workflow import WorkflowEngine, WorkflowError
+from tests.helpers import StubAgent, StubExecutor
+
+
+class FailingExecutor(StubExecutor):
+    """Stub executor whose runs always raise."""
+
+    async def arun(self, input_data):
+        self.calls.append(input_data)
+        raise RuntimeError("boom")
+
+
+def _engine(**executors):
+    agents = [
+        StubAgent(executor, name=name) for name, executor in executors.items()
+    ]
+    return WorkflowEngine(agents, max_concurrency=4)
+
+
+def test_validate_orders_nodes_after_their_dependencies():
+    engine = _engine(A=StubExecutor())
+
+    ordered = engine.validate([
+        {"id": "c", "agent": "A", "depends_on": ["a", "b"]},
+        {"id": "b", "agent": "A", "depends_on": ["a"]},
+        {"id": "a", "agent": "A"},
+    ])
+
+    assert [node.id for node in ordered] == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("nodes, message", [
+    ([{"id": "a", "agent": "A"}, {"id": "a", "agent": "A"}], "Duplicate"),
+    ([{"id": "a", "agent": "Missing"}], "unknown agent"),
+    ([{"id": "a", "agent": "A", "depends_on": ["z"]}], "unknown node"),
+    ([
+        {"id": "a", "agent": "A", "depends_on": ["b"]},
+        {"id": "b", "agent": "A", "depends_on": ["a"]},
+    ], "cycle"),
+    ([{"agent": "A"}], "missing field"),
+])
+def test_validate_rejects_malformed_workflows(nodes, message):
+    engine = _engine(A=StubExecutor())
+
+    with pytest.raises(WorkflowError, match=message):
+        engine.validate(nodes)
+
+
+@pytest.mark.asyncio
+async def test_independent_nodes_run_concurrently():
+    engine = _engine(A=StubExecutor(delay=0.2), B=StubExecutor(delay=0.2))
+
+    started = time.perf_counter()
+    results = await engine.run([
+        {"id": "a", "agent": "A"},
+        {"id": "b", "agent": "B"},
+    ])
+
+    assert time.perf_counter() - started < 0.35
+    assert {result.status for result in results.values()} == {"success"}
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_serializes_nodes():
+    engine = _engine(A=StubExecutor(delay=0.1))
+
+    started = time.perf_counter()
+    await engine.run([
+        {"id": name, "agent": "A", "input": {"value": name}} for name in "abc"
+    ], max_concurrency=1)
+
+    assert time.perf_counter() - started >= 0.3
+
+
+@pytest.mark.asyncio
+async def test_nodes_receive_context_and_upstream_outputs():
+    downstream = StubExecutor()
+    engine = _engine(A=StubExecutor(), B=downstream)
+
+    await engine.run([
+        {"id": "a", "agent": "A", "input": {"value": 1}},
+        {"id": "b", "agent": "B", "input": {"value": 2}, "depends_on": ["a"]},
+    ], context={"value": 0, "shared": True})
+
+    (call,) = downstream.calls
+    assert call["value"] == 2 and call["shared"] is True
+    assert call["upstream"]["a"]["echo"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_node_skips_its_dependents_transitively():
+    downstream = StubExecutor()
+    engine = _engine(A=FailingExecutor(), B=downstream)
+
+    results = await engine.run([
+        {"id": "a", "agent": "A"},
+        {"id": "b", "agent": "B", "depends_on": ["a"]},
+        {"id": "c", "agent": "B", "depends_on": ["b"]},
+    ])
+
+    assert results["a"].status == "failed"
+    assert results["b"].status == "skipped"
+    assert results["c"].status == "skipped"
+    assert downstream.calls == []
+
+
+@pytest.mark.asyncio
+async def test_completed_nodes_are_not_executed_again():
+    upstream = StubExecutor()
+    engine = _engine(A=upstream, B=StubExecutor())
+
+    results = await engine.run([
+        {"id": "a", "agent": "A"},
+        {"id": "b", "agent": "B", "depends_on": ["a"]},
+    ], completed={"a": {"status": "success", "echo": "saved"}})
+
+    assert upstream.calls == []
+    assert results["a"].output["echo"] == "saved"
+    assert results["b"].status == "success"
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_times_out_unstarted_nodes():
+    executor = StubExecutor()
+    engine = _engine(A=executor)
+
+    results = await engine.run([
+        {"id": "a", "agent": "A"},
+        {"id": "b", "agent": "A", "depends_on": ["a"]},
+    ], deadline=time.time() - 1)
+
+    assert results["a"].status == "timeout"
+    assert results["b"].status == "skipped"
+    assert executor.calls == []
+
+
+@pytest.mark.asyncio
+async def test_deadline_is_shared_along_the_critical_path():
+    executor = StubExecutor()
+    engine = _engine(A=executor)
+    deadline = time.time() + 10
+
+    await engine.run([
+        {"id": "a", "agent": "A"},
+        {"id": "b", "agent": "A", "depends_on": ["a"]},
+    ], deadline=deadline)
+
+    first, second = executor.calls
+    assert first["deadline"] < deadline - 4
+    assert second["deadline"] == pytest.approx(deadline, abs=0.5)